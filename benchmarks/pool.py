@@ -0,0 +1,67 @@
+"""
+LLM 백엔드 풀 처리량 벤치마크
+
+키(백엔드)마다 분당 요청 한도가 있는 로컬 백엔드를 1개, 2개, 4개... 로 늘려가며
+같은 부하를 걸어 풀 전체 처리량이 키 수에 비례해 늘어나는지 확인합니다.
+API 키와 네트워크 없이 실행됩니다.
+
+사용법:
+    python benchmarks/pool.py
+    python benchmarks/pool.py --backends 1 2 4 8 --rpm 600 --latency-ms 50 --duration 5
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 저장소 루트를 import 경로에 추가
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services.llm_backends import BackendPool, LocalBackend  # noqa: E402
+
+SYSTEM = "# 트렌딩 콘텐츠 아이디어\n- [인기 있는 콘텐츠 아이디어 3-5개]"
+
+def measure(backend_count: int, rpm: float, latency_ms: float, workers: int, duration: float) -> float:
+    """주어진 시간 동안 완료된 요청 수로 초당 처리량 계산"""
+    pool = BackendPool([LocalBackend(i, latency_ms=latency_ms, rpm=rpm) for i in range(backend_count)])
+    # 시작 시점의 버스트 한도를 소진한 뒤부터 측정
+    for backend in pool.backends:
+        backend._tokens = 0.0
+    deadline = time.monotonic() + duration
+    completed = [0]
+    lock = threading.Lock()
+
+    def worker(index: int):
+        while time.monotonic() < deadline:
+            pool.complete('local', SYSTEM, f"콘텐츠 주제/키워드: 요청 {index}", 500)
+            with lock:
+                completed[0] += 1
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for index in range(workers):
+            executor.submit(worker, index)
+    return completed[0] / (time.monotonic() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description='LLM 백엔드 풀 처리량 벤치마크')
+    parser.add_argument('--backends', type=int, nargs='+', default=[1, 2, 4, 8], help='측정할 백엔드 수 목록')
+    parser.add_argument('--rpm', type=float, default=600, help='백엔드당 분당 요청 한도')
+    parser.add_argument('--latency-ms', type=float, default=50, help='로컬 백엔드 응답 지연')
+    parser.add_argument('--workers', type=int, default=64, help='동시 요청 스레드 수')
+    parser.add_argument('--duration', type=float, default=5, help='측정 시간(초)')
+    args = parser.parse_args()
+
+    base = None
+    print(f"{'backends':>8} {'req/s':>10} {'scale':>8}")
+    for count in args.backends:
+        throughput = measure(count, args.rpm, args.latency_ms, args.workers, args.duration)
+        base = base or throughput / count
+        print(f"{count:>8} {throughput:>10.1f} {throughput / base:>8.2f}")
+
+if __name__ == '__main__':
+    main()
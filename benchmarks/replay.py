@@ -0,0 +1,138 @@
+"""
+프롬프트 변형 오프라인 재실행
+
+저장된 입력(답변 조합) 세트를 프롬프트 변형마다 같은 백엔드로 다시 실행하여
+변형별 소요 시간, 입력/출력 토큰 수, 파싱 성공률을 비교합니다.
+메모를 끄고 실행하므로 같은 입력이 여러 번 있어도 매번 LLM을 호출합니다.
+
+입력 세트:
+- 기본: benchmarks/replay_inputs.jsonl (한 줄에 답변 조합 JSON 하나)
+- --inputs 파일.jsonl: 직접 준비한 입력 세트
+- --from-db N: analyses 테이블의 최근 입력 N개 (DATABASE_URL 필요)
+
+백엔드:
+- local: 네트워크 없이 결정적 응답 (프롬프트 길이에 따른 토큰 수 비교용)
+- anthropic: 설정된 키 풀 (ANTHROPIC_API_KEYS, LLM_KEY_RPM 등)
+
+사용법:
+    python benchmarks/replay.py
+    python benchmarks/replay.py --variants v1 v2-compact --backend anthropic --concurrency 4
+    python benchmarks/replay.py --from-db 200 --backend anthropic --output replay.jsonl
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+# 저장소 루트를 import 경로에 추가
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services.langchain_service import LangChainService, StageMemo  # noqa: E402
+from services.llm_backends import BackendPool, LocalBackend, build_pool  # noqa: E402
+from services.prompt_variants import PromptExperiment, available_variants  # noqa: E402
+
+INPUTS_PATH = os.path.join(ROOT, 'benchmarks', 'replay_inputs.jsonl')
+
+def load_inputs(path: str) -> list:
+    """JSONL 입력 세트 로드"""
+    with open(path, encoding='utf-8') as f:
+        inputs = [json.loads(line) for line in f if line.strip()]
+    if not inputs:
+        raise SystemExit(f"입력 세트가 비어 있습니다: {path}")
+    return inputs
+
+def build_service(variants: list, backend: str) -> LangChainService:
+    """변형 전체를 로드하고 메모를 끈 분석 서비스 생성"""
+    pool = BackendPool([LocalBackend()]) if backend == 'local' else build_pool()
+    service = LangChainService(pool=pool, experiment=PromptExperiment(','.join(variants)))
+    service.summary_memo = StageMemo(0)
+    service.analysis_memo = StageMemo(0)
+    return service
+
+async def replay(service: LangChainService, variants: list, inputs: list, concurrency: int) -> list:
+    """변형 × 입력 조합을 동시 실행 수 제한 안에서 실행"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(variant_id: str, index: int, data: dict) -> dict:
+        async with semaphore:
+            started = time.monotonic()
+            result = await service.generate_content_ideas(data, variant_id=variant_id)
+            latency_ms = (time.monotonic() - started) * 1000
+        usage = (result or {}).get('llm_usage') or {}
+        return {
+            'variant': variant_id,
+            'input': index,
+            'ok': result is not None,
+            'parse_ok': bool(result and result['parse_ok']),
+            'latency_ms': round(latency_ms, 1),
+            'input_tokens': usage.get('input_tokens', 0),
+            'output_tokens': usage.get('output_tokens', 0)
+        }
+
+    # 변형을 번갈아 배치하여 시간대별 백엔드 상태 차이가 한 변형에 몰리지 않도록 함
+    return await asyncio.gather(*(
+        run_one(variant_id, index, data)
+        for index, data in enumerate(inputs)
+        for variant_id in variants
+    ))
+
+def summarize(records: list, variants: list) -> None:
+    """변형별 결과 표 출력 (첫 변형 대비 비율 포함)"""
+    print(f"{'variant':<14} {'runs':>5} {'errors':>6} {'parse_ok':>8} {'p50 ms':>9} {'p95 ms':>9} {'in tok':>8} {'out tok':>8} {'tokens vs base':>15}")
+    base_tokens = None
+    for variant_id in variants:
+        rows = [record for record in records if record['variant'] == variant_id]
+        done = [record for record in rows if record['ok']]
+        latencies = sorted(record['latency_ms'] for record in done)
+        p50 = statistics.median(latencies) if latencies else 0.0
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+        input_tokens = statistics.mean(record['input_tokens'] for record in done) if done else 0.0
+        output_tokens = statistics.mean(record['output_tokens'] for record in done) if done else 0.0
+        parse_ok = sum(record['parse_ok'] for record in rows) / len(rows) if rows else 0.0
+        total_tokens = input_tokens + output_tokens
+        base_tokens = base_tokens or total_tokens
+        ratio = total_tokens / base_tokens if base_tokens else 0.0
+        print(
+            f"{variant_id:<14} {len(rows):>5} {len(rows) - len(done):>6} {parse_ok:>8.0%} {p50:>9.0f} {p95:>9.0f}"
+            f" {input_tokens:>8.0f} {output_tokens:>8.0f} {ratio:>15.2f}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description='프롬프트 변형 오프라인 재실행')
+    parser.add_argument('--variants', nargs='+', help='비교할 변형 id (기본: prompts/의 모든 변형)')
+    parser.add_argument('--inputs', default=INPUTS_PATH, help='입력 세트 JSONL 파일')
+    parser.add_argument('--from-db', type=int, metavar='N', help='analyses 테이블의 최근 입력 N개 사용')
+    parser.add_argument('--backend', choices=('local', 'anthropic'), default='local', help='실행할 백엔드')
+    parser.add_argument('--concurrency', type=int, default=4, help='동시 실행 수')
+    parser.add_argument('--output', help='실행별 기록을 저장할 JSONL 파일')
+    parser.add_argument('--verbose', action='store_true', help='분석 서비스 로그 출력')
+    args = parser.parse_args()
+
+    if args.from_db:
+        import database
+        inputs = database.get_recent_inputs(args.from_db)
+    else:
+        inputs = load_inputs(args.inputs)
+    variants = args.variants or available_variants()
+    service = build_service(variants, args.backend)
+
+    print(f"입력 {len(inputs)}개 × 변형 {len(variants)}개 | 백엔드 {args.backend} | 동시 실행 {args.concurrency}")
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        records = asyncio.run(replay(service, variants, inputs, args.concurrency))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    summarize(records, variants)
+
+if __name__ == '__main__':
+    main()
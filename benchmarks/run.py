@@ -0,0 +1,182 @@
+"""
+파싱/렌더링 마이크로 벤치마크
+
+기록된 1단계/2단계 응답 코퍼스(benchmarks/corpus)를 사용하여
+요청마다 반복되는 CPU 작업을 측정합니다. API 키와 네트워크 없이 실행됩니다.
+
+측정 항목:
+- parse: 2단계 응답 파싱 (services.result_parser.parse_analysis)
+- render: 결과 메시지 렌더링 (ElonStyleMessageFormatter.format_analysis_result)
+- parse+render: 위 두 단계를 이어서 실행
+
+각 항목은 코퍼스 전체를 한 번 처리하는 것을 1 op으로 보고
+ops/sec, 결과로 남는 할당 블록 수/크기, 실행 중 최대 메모리 사용량을 보고합니다.
+
+사용법:
+    python benchmarks/run.py                               # 측정 결과 출력
+    python benchmarks/run.py --save benchmarks/baseline.json
+    python benchmarks/run.py --compare benchmarks/baseline.json --threshold 0.1
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# 저장소 루트를 import 경로에 추가
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bot.messages import ElonStyleMessageFormatter as Elon  # noqa: E402
+from services.result_parser import parse_analysis  # noqa: E402
+
+CORPUS_DIR = os.path.join(ROOT, 'benchmarks', 'corpus')
+
+def load_corpus(path: str = CORPUS_DIR) -> list:
+    """기록된 응답 코퍼스 로드"""
+    cases = []
+    for filename in sorted(glob.glob(os.path.join(path, '*.json'))):
+        with open(filename, encoding='utf-8') as f:
+            cases.append(json.load(f))
+    if not cases:
+        raise SystemExit(f"코퍼스가 비어 있습니다: {path}")
+    return cases
+
+def build_benchmarks(cases: list) -> dict:
+    """벤치마크 이름 -> 코퍼스 전체를 처리하는 함수"""
+    analyses = [case['analysis'] for case in cases]
+    results = [
+        {'ideas': case['summary'], **parse_analysis(case['analysis']), 'trending_hashtags': ['fyp', 'viral']}
+        for case in cases
+    ]
+
+    def parse():
+        return [parse_analysis(analysis) for analysis in analyses]
+
+    def render():
+        return [Elon.format_analysis_result(result) for result in results]
+
+    def parse_and_render():
+        return [
+            Elon.format_analysis_result({'ideas': case['summary'], **parse_analysis(case['analysis'])})
+            for case in cases
+        ]
+
+    return {'parse': parse, 'render': render, 'parse+render': parse_and_render}
+
+def measure_speed(func, repeat: int, min_time: float) -> float:
+    """가장 빠른 반복 기준 ops/sec"""
+    # 한 번의 측정이 min_time 이상 걸리도록 반복 횟수 보정
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        number *= 2
+
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - started) / number)
+    return 1.0 / best
+
+def measure_memory(func) -> dict:
+    """1 op 실행 시 결과로 남는 할당과 최대 메모리 사용량"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        output = func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    stats = after.compare_to(before, 'filename')
+    blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    size = sum(stat.size_diff for stat in stats if stat.size_diff > 0)
+    del output
+    return {'alloc_blocks': blocks, 'alloc_kib': round(size / 1024, 1), 'peak_kib': round((peak - base) / 1024, 1)}
+
+def run(repeat: int, min_time: float) -> dict:
+    """모든 벤치마크 실행"""
+    cases = load_corpus()
+    results = {}
+    for name, func in build_benchmarks(cases).items():
+        for _ in range(10):
+            func()  # 워밍업
+        results[name] = {'ops_per_sec': round(measure_speed(func, repeat, min_time), 1), **measure_memory(func)}
+    return {'cases': len(cases), 'python': sys.version.split()[0], 'results': results}
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """기준선 대비 threshold 이상 나빠진 항목 목록"""
+    regressions = []
+    for name, now in current['results'].items():
+        base = baseline['results'].get(name)
+        if not base:
+            continue
+        if now['ops_per_sec'] < base['ops_per_sec'] * (1 - threshold):
+            regressions.append(f"{name}: ops/sec {base['ops_per_sec']} -> {now['ops_per_sec']}")
+        for key in ('alloc_blocks', 'peak_kib'):
+            if base[key] and now[key] > base[key] * (1 + threshold):
+                regressions.append(f"{name}: {key} {base[key]} -> {now[key]}")
+    return regressions
+
+def print_table(report: dict, baseline: dict = None) -> None:
+    """측정 결과 표 출력"""
+    print(f"코퍼스 {report['cases']}건, Python {report['python']}")
+    print(f"{'benchmark':<14}{'ops/sec':>12}{'alloc blocks':>14}{'alloc KiB':>12}{'peak KiB':>11}{'vs base':>10}")
+    for name, item in report['results'].items():
+        delta = ''
+        if baseline and name in baseline['results']:
+            base = baseline['results'][name]['ops_per_sec']
+            delta = f"{(item['ops_per_sec'] / base - 1) * 100:+.1f}%"
+        print(
+            f"{name:<14}{item['ops_per_sec']:>12}{item['alloc_blocks']:>14}"
+            f"{item['alloc_kib']:>12}{item['peak_kib']:>11}{delta:>10}"
+        )
+
+def main() -> int:
+    """명령행 진입점"""
+    parser = argparse.ArgumentParser(description='파싱/렌더링 마이크로 벤치마크')
+    parser.add_argument('--repeat', type=int, default=5, help='측정 반복 횟수 (최솟값 사용)')
+    parser.add_argument('--min-time', type=float, default=0.2, help='측정 1회의 최소 시간(초)')
+    parser.add_argument('--save', metavar='PATH', help='결과를 기준선 파일로 저장')
+    parser.add_argument('--compare', metavar='PATH', help='기준선 파일과 비교')
+    parser.add_argument('--threshold', type=float, default=0.1, help='허용 성능 저하 비율 (기본 0.1 = 10%%)')
+    args = parser.parse_args()
+
+    report = run(args.repeat, args.min_time)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print_table(report, baseline)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n기준선 저장: {args.save}")
+
+    if baseline:
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print("\n성능 저하 감지:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\n기준선 대비 {args.threshold:.0%} 이상 저하된 항목 없음")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
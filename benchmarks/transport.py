@@ -0,0 +1,172 @@
+"""
+텔레그램 전송 설정 벤치마크
+
+로컬 가짜 Bot API 서버를 띄우고, getUpdates 롱폴링이 도는 동안 sendMessage를 높은 동시성으로 보내
+전송 설정에 따라 메시지 전송 지연과 연결 풀 대기 시간이 어떻게 달라지는지 측정합니다.
+텔레그램 토큰과 네트워크 없이 실행됩니다.
+
+시나리오:
+- shared: 롱폴링과 메시지 전송이 작은 연결 풀 하나를 같이 사용 (PTB 기본 시간 제한)
+- split-N: 봇 API 호출(연결 N개)과 getUpdates가 각자 연결 풀 사용 (나머지는 TELEGRAM_* 설정값)
+
+httpx 연결 풀은 요청을 배정할 때마다 모든 연결을 훑으므로 연결 수가 너무 많으면 CPU를 더 쓰고 오히려 느려집니다.
+가짜 서버는 별도 프로세스에서 실행되지만, CPU가 적은 환경에서는 동시성을 낮춰 측정하세요.
+
+사용법:
+    python benchmarks/transport.py
+    python benchmarks/transport.py --pool 16 32 64 --concurrency 128 --sends 1024 --server-ms 300
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+from aiohttp import web
+
+# 저장소 루트를 import 경로에 추가
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from telegram import Bot  # noqa: E402
+from telegram.error import TelegramError  # noqa: E402
+
+from bot.transport import TelegramRequest  # noqa: E402
+from config import TELEGRAM_POOL_SIZE  # noqa: E402
+
+TOKEN = '123456:bench'
+
+def build_fake_server(server_ms: float) -> web.Application:
+    """getMe / getUpdates(롱폴링) / sendMessage만 흉내 내는 가짜 Bot API 서버"""
+    async def handle(request: web.Request) -> web.Response:
+        method = request.match_info['method']
+        params = await request.post()
+        if method == 'getMe':
+            result = {'id': 1, 'is_bot': True, 'first_name': 'bench', 'username': 'bench_bot'}
+        elif method == 'getUpdates':
+            # 새 업데이트가 없으면 timeout 동안 연결을 붙잡고 있다가 빈 목록 반환
+            await asyncio.sleep(float(params.get('timeout', 0)))
+            result = []
+        else:
+            await asyncio.sleep(server_ms / 1000)
+            result = {
+                'message_id': 1,
+                'date': int(time.time()),
+                'chat': {'id': int(params.get('chat_id', 1)), 'type': 'private'},
+                'text': params.get('text', '')
+            }
+        return web.json_response({'ok': True, 'result': result})
+
+    app = web.Application()
+    app.router.add_post(f'/bot{TOKEN}/{{method}}', handle)
+    return app
+
+def build_requests(scenario: str, args) -> tuple:
+    """시나리오별 (봇 API 요청 객체, getUpdates 요청 객체)"""
+    if scenario == 'shared':
+        shared = TelegramRequest(
+            'shared', connection_pool_size=args.shared_pool,
+            read_timeout=5.0, write_timeout=5.0, connect_timeout=5.0, pool_timeout=1.0
+        )
+        return shared, shared
+    pool_size = int(scenario.split('-', 1)[1])
+    return TelegramRequest(scenario, connection_pool_size=pool_size), TelegramRequest('updates', connection_pool_size=1)
+
+async def run_scenario(scenario: str, base_url: str, args) -> dict:
+    """롱폴링을 돌리면서 sendMessage 지연 측정"""
+    request, updates_request = build_requests(scenario, args)
+    bot = Bot(TOKEN, base_url=base_url, request=request, get_updates_request=updates_request)
+    latencies = []
+    errors = 0
+    stop = asyncio.Event()
+
+    async def poll():
+        while not stop.is_set():
+            try:
+                await bot.get_updates(timeout=args.poll_seconds)
+            except TelegramError:
+                pass
+
+    async def sender(count: int):
+        nonlocal errors
+        for _ in range(count):
+            started = time.monotonic()
+            try:
+                await bot.send_message(1, '벤치마크')
+                latencies.append((time.monotonic() - started) * 1000)
+            except TelegramError:
+                errors += 1
+
+    async with bot:
+        pollers = [asyncio.create_task(poll()) for _ in range(args.pollers)]
+        await asyncio.sleep(0.1)
+        started = time.monotonic()
+        per_sender = max(1, args.sends // args.concurrency)
+        await asyncio.gather(*(sender(per_sender) for _ in range(args.concurrency)))
+        elapsed = time.monotonic() - started
+        stop.set()
+        for task in pollers:
+            task.cancel()
+        await asyncio.gather(*pollers, return_exceptions=True)
+
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))] if latencies else 0.0  # noqa: E731
+    return {
+        'scenario': scenario,
+        'sent': len(latencies),
+        'errors': errors,
+        'throughput': len(latencies) / elapsed,
+        'p50': statistics.median(latencies) if latencies else 0.0,
+        'p95': pick(0.95),
+        'p99': pick(0.99),
+        'pool_wait_p95': request.stats.snapshot()['wait_p95_ms']
+    }
+
+def serve(port_queue, server_ms: float) -> None:
+    """가짜 서버를 별도 프로세스에서 실행 (측정 대상 이벤트 루프와 CPU를 나누지 않도록)"""
+    async def start():
+        runner = web.AppRunner(build_fake_server(server_ms), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0, backlog=4096)
+        await site.start()
+        port_queue.put(site._server.sockets[0].getsockname()[1])
+        await asyncio.Event().wait()
+
+    asyncio.run(start())
+
+async def run(args, base_url: str) -> list:
+    """시나리오를 차례로 실행"""
+    scenarios = (['shared'] if not args.no_shared else []) + [f"split-{size}" for size in args.pool]
+    return [await run_scenario(scenario, base_url, args) for scenario in scenarios]
+
+def main():
+    parser = argparse.ArgumentParser(description='텔레그램 전송 설정 벤치마크')
+    parser.add_argument('--no-shared', action='store_true', help='shared 시나리오 생략')
+    parser.add_argument('--concurrency', type=int, default=128, help='동시에 메시지를 보내는 작업 수')
+    parser.add_argument('--sends', type=int, default=1024, help='전체 sendMessage 수')
+    parser.add_argument('--pool', type=int, nargs='+', default=[TELEGRAM_POOL_SIZE, 256], help='split: 봇 API 연결 풀 크기 목록')
+    parser.add_argument('--shared-pool', type=int, default=8, help='shared: 공용 연결 풀 크기')
+    parser.add_argument('--pollers', type=int, default=1, help='동시에 도는 getUpdates 롱폴링 수')
+    parser.add_argument('--poll-seconds', type=int, default=2, help='getUpdates 롱폴링 대기 시간')
+    parser.add_argument('--server-ms', type=float, default=300, help='가짜 서버의 sendMessage 처리 시간')
+    args = parser.parse_args()
+
+    port_queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(port_queue, args.server_ms), daemon=True)
+    server.start()
+    try:
+        results = asyncio.run(run(args, f"http://127.0.0.1:{port_queue.get(timeout=10)}/bot"))
+    finally:
+        server.terminate()
+    print(f"{'scenario':<10} {'sent':>6} {'errors':>6} {'msg/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'pool wait p95':>14}")
+    for row in results:
+        print(
+            f"{row['scenario']:<10} {row['sent']:>6} {row['errors']:>6} {row['throughput']:>8.0f}"
+            f" {row['p50']:>8.0f} {row['p95']:>8.0f} {row['p99']:>8.0f} {row['pool_wait_p95']:>14.1f}"
+        )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+관리자 명령어 모듈
+
+이 모듈은 운영자용 명령어를 처리합니다.
+ADMIN_IDS에 등록된 사용자만 사용할 수 있습니다.
+"""
+
+import asyncio
+from telegram import Update
+from telegram.ext import ContextTypes
+from config import ADMIN_IDS
+from database import get_rollup_stats, get_variant_stats
+from bot.conversations import (
+    analysis_scheduler,
+    langchain_service,
+    request_coalescer,
+    result_cache,
+    user_states
+)
+from bot.transport import transport_stats
+from services.hashtags import hashtag_index
+from services.topic_index import topic_index
+from services.memory import memory_report
+
+def is_admin(update: Update) -> bool:
+    """관리자 여부 확인"""
+    return update.effective_user is not None and update.effective_user.id in ADMIN_IDS
+
+def _format_ranking(title: str, rows) -> list:
+    """순위 목록 포맷팅"""
+    lines = ["", title]
+    for i, row in enumerate(rows, 1):
+        lines.append(f"{i}. {row['label'] or '(없음)'} | {row['requests']}건")
+    return lines
+
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """사용량 통계 명령어 핸들러 (/stats [일수])"""
+    if not is_admin(update):
+        return
+
+    days = 7
+    if context.args and context.args[0].isdigit():
+        days = max(1, min(int(context.args[0]), 365))
+
+    try:
+        stats = await asyncio.to_thread(get_rollup_stats, days)
+    except Exception as e:
+        print(f"통계 조회 실패: {e}")
+        await update.message.reply_text("⚠️ 통계를 조회하지 못했습니다.")
+        return
+
+    lines = [f"📊 최근 {days}일 사용량"]
+    lines.extend(_format_ranking("🗂 카테고리", stats['content_category']))
+    lines.extend(_format_ranking("📱 플랫폼", stats['platform']))
+    lines.extend(_format_ranking("🪝 후킹포인트", stats['hook_point']))
+
+    lines.extend(["", "📅 일별 요청 / 평균 / 최대 소요 시간"])
+    for row in stats['daily']:
+        avg = f"{row['avg_latency_ms'] / 1000:.1f}s" if row['avg_latency_ms'] is not None else '-'
+        lines.append(f"{row['day']:%m-%d} | {row['requests']}건 | {avg} | {row['max_latency_ms'] / 1000:.1f}s")
+
+    # 현재 프로세스의 실행 상태
+    scheduler = analysis_scheduler.snapshot()
+    coalescer = request_coalescer.stats
+    lines.extend([
+        "",
+        "⚙️ 실행 상태",
+        f"스케줄러: 실행 {scheduler['running']} | 대기 {scheduler['queued']} | 평균 {scheduler['avg_service_time']}s",
+        f"거절: 과부하 {scheduler['overloaded']} | 빈도 {scheduler['rate_limited']} | 일일 {scheduler['daily_quota']}",
+        f"병합: 실행 {coalescer['leaders']} | 합류 {coalescer['followers']} | 공유 {coalescer['shared_hits']}"
+    ])
+    limits = langchain_service.describe_limits()
+    for key, item in limits['output_tokens'].items():
+        if key.endswith('| * | *'):
+            lines.append(f"{key.split(' | ')[0]}: p99 {item['p99']} → max_tokens {item['max_tokens']}")
+    memo = limits['memo']
+    lines.append(
+        f"메모 적중: 1단계 {memo['summary']['hits']}/{memo['summary']['hits'] + memo['summary']['misses']}"
+        f" | 2단계 {memo['analysis']['hits']}/{memo['analysis']['hits'] + memo['analysis']['misses']}"
+    )
+    for backend in limits['backends']:
+        state = f"제외 {backend['ejected_for']}s" if backend['ejected_for'] else f"진행 {backend['in_flight']}"
+        lines.append(
+            f"{backend['name']}: {state} | 요청 {backend['requests']} | 오류 {backend['errors']} | 남은 한도 {backend['remaining_ratio']:.0%}"
+        )
+    for stats in transport_stats.values():
+        pool = stats.snapshot()
+        lines.append(
+            f"텔레그램 {pool['name']}: 연결 {pool['in_flight']}/{pool['pool_size']} | 대기 {pool['waiting']}"
+            f" | 대기 p95 {pool['wait_p95_ms']}ms (최대 {pool['wait_max_ms']}ms) | 시간 초과 {pool['timeouts']}"
+        )
+
+    await update.message.reply_text("\n".join(lines))
+
+async def experiments_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """프롬프트 변형별 실험 결과 명령어 핸들러 (/experiments [일수])"""
+    if not is_admin(update):
+        return
+
+    days = 7
+    if context.args and context.args[0].isdigit():
+        days = max(1, min(int(context.args[0]), 365))
+
+    try:
+        rows = await asyncio.to_thread(get_variant_stats, days)
+    except Exception as e:
+        print(f"실험 결과 조회 실패: {e}")
+        await update.message.reply_text("⚠️ 실험 결과를 조회하지 못했습니다.")
+        return
+
+    weights = langchain_service.experiment.weights
+    lines = [
+        f"🧪 최근 {days}일 프롬프트 변형 비교",
+        f"배정 비율: {', '.join(f'{variant_id} {weight}' for variant_id, weight in weights.items())}",
+        "",
+        "변형 | 요청 | 평균/p95 소요 | 입력/출력 토큰 | 파싱 성공"
+    ]
+    for row in rows:
+        avg = f"{row['avg_latency_ms'] / 1000:.1f}s" if row['avg_latency_ms'] is not None else '-'
+        p95 = f"{row['p95_latency_ms'] / 1000:.1f}s" if row['p95_latency_ms'] is not None else '-'
+        tokens = (
+            f"{row['avg_input_tokens']:.0f}/{row['avg_output_tokens']:.0f}"
+            if row['llm_runs'] else '-'
+        )
+        parse_ok = f"{row['parse_ok_rate']:.0%}" if row['parse_ok_rate'] is not None else '-'
+        lines.append(f"{row['variant']} | {row['requests']}건 | {avg}/{p95} | {tokens} | {parse_ok}")
+    if not rows:
+        lines.append("(기록 없음)")
+
+    await update.message.reply_text("\n".join(lines))
+
+async def memory_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """구성 요소별 메모리 사용량 명령어 핸들러 (/memory)"""
+    if not is_admin(update):
+        return
+
+    components = {
+        'user_states': user_states,
+        'result_cache': result_cache,
+        'hashtag_index': hashtag_index,
+        'topic_index': topic_index,
+        'token_stats': langchain_service.token_stats,
+        'scheduler': analysis_scheduler,
+        'coalescer': request_coalescer,
+        'ptb_user_data': context.application.user_data,
+        'ptb_chat_data': context.application.chat_data
+    }
+    report = memory_report(components)
+
+    lines = ["🧠 구성 요소별 메모리 사용량 (추정)"]
+    for name, size in report.items():
+        lines.append(f"{name}: {size / 1024:.1f} KiB")
+    lines.extend([
+        "",
+        f"사용자 상태: {len(user_states)}명 (만료 {user_states.stats['expired']} | 한도 초과 {user_states.stats['evicted']})",
+        f"진행 중인 대화: {user_states.active_count()}명",
+        f"결과 캐시: {len(result_cache)}건",
+        f"주제 인덱스: {len(topic_index)}건"
+    ])
+    await update.message.reply_text("\n".join(lines))
@@ -6,17 +6,50 @@
 """
 
 import asyncio
+import functools
+import time
+import warnings
+from typing import Optional
 from telegram import Update, ReplyKeyboardMarkup, ReplyKeyboardRemove, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
+    CallbackQueryHandler,
     ContextTypes,
     ConversationHandler,
     CommandHandler,
     MessageHandler,
+    TypeHandler,
     filters
 )
+from telegram.warnings import PTBUserWarning
 from bot.messages import ElonStyleMessageFormatter as Elon
 from services.langchain_service import LangChainService
-from database import init_db, save_analysis
+from services.request_coalescer import RequestCoalescer, make_request_key
+from services.scheduler import AdmissionRejected, FairScheduler
+from services.labels import (
+    AGE_OPTIONS,
+    CATEGORY_OPTIONS,
+    HOOK_OPTIONS,
+    INTEREST_OPTIONS,
+    PLATFORM_OPTIONS,
+    keyboard_rows
+)
+from services.user_state import AnswerRecord, ResultCache, UserStateStore
+from services.topic_index import topic_index
+from bot.inline import decode_start_parameter
+from services.job_journal import JobTracker
+from services.tracing import traced
+from config import CONVERSATION_TIMEOUT, JOURNAL_MAX_ATTEMPTS, JOURNAL_STALE_SECONDS
+from database import (
+    init_db,
+    save_analysis,
+    find_analysis_by_request,
+    claim_journal_entries,
+    delete_journal_entry,
+    get_abandoned_journal_entries
+)
+
+# 결과 메시지의 인라인 버튼은 사용자/채팅 단위로만 추적 (per_message 경고 무시)
+warnings.filterwarnings('ignore', message=r".*CallbackQueryHandler", category=PTBUserWarning)
 
 # 데이터베이스 초기화
 init_db()
@@ -24,6 +57,19 @@ init_db()
 # AI 분석 서비스 인스턴스
 langchain_service = LangChainService()
 
+# 동일 요청 병합기
+request_coalescer = RequestCoalescer()
+
+# 사용자 간 공평 분배 스케줄러
+analysis_scheduler = FairScheduler()
+
+# 사용자 상태 저장소 (유휴 TTL + LRU) 및 분석 결과 캐시
+user_states = UserStateStore()
+result_cache = ResultCache()
+
+# 진행 중인 분석 작업 추적기 (종료 시 저널 보존)
+analysis_jobs = JobTracker()
+
 # 대화 상태 정의
 (WAITING_START,
  CONTENT_CATEGORY,  # 콘텐츠 카테고리 선택
@@ -33,47 +79,24 @@ langchain_service = LangChainService()
  PLATFORM,         # 플랫폼 선택
  HOOK_POINT,       # 후킹포인트 선택
  ANALYZING,        # AI 분석 중
- HELP_MENU) = range(9)
+ HELP_MENU,
+ EDIT_VALUE) = range(10)  # 결과 후 답변 하나 다시 입력
 
 # 키보드 메뉴 정의
 # 콘텐츠 카테고리 선택 옵션
-CATEGORY_KEYBOARD = [
-    ['🎭 엔터테인먼트/예능', '🎓 교육/정보'],
-    ['💄 뷰티/패션', '✈️ 여행/레저'],
-    ['🍳 음식/요리', '🎮 게임/스포츠'],
-    ['🎵 음악/댄스', '📹 일상/브이로그'],
-    ['🐾 반려동물', '💻 테크/IT'],
-    ['💰 재테크/투자', '💪 건강/운동']
-]
+CATEGORY_KEYBOARD = keyboard_rows(CATEGORY_OPTIONS)
 
 # 타겟 연령대 선택 옵션
-AGE_KEYBOARD = [
-    ['👶 10대', '👩 20대'],
-    ['👨 30대', '👴 40대'],
-    ['👵 50대 이상']
-]
+AGE_KEYBOARD = keyboard_rows(AGE_OPTIONS)
 
 # 타겟 관심사 선택 옵션
-INTEREST_KEYBOARD = [
-    ['🎯 트렌드/유행 정보', '📚 실용적/생활 정보'],
-    ['📈 자기계발/성장', '🎨 취미/여가 활동'],
-    ['🛍️ 쇼핑/소비', '🧘 건강/웰빙'],
-    ['🎭 문화/예술', '👥 소셜/커뮤니티']
-]
+INTEREST_KEYBOARD = keyboard_rows(INTEREST_OPTIONS)
 
 # 플랫폼 선택 옵션
-PLATFORM_KEYBOARD = [
-    ['📱 TikTok', '📸 Instagram Reels'],
-    ['🎥 YouTube Shorts', '📺 기타']
-]
+PLATFORM_KEYBOARD = keyboard_rows(PLATFORM_OPTIONS)
 
 # 후킹포인트 선택 옵션
-HOOK_KEYBOARD = [
-    ['😱 충격적인 사실/반전', '🤔 궁금증 유발'],
-    ['💝 공감되는 상황', '💡 유용한 정보/팁'],
-    ['🎭 재미있는 연출', '👀 시선 끄는 액션'],
-    ['🌟 트렌디한 밈/챌린지', '💖 감동/힐링']
-]
+HOOK_KEYBOARD = keyboard_rows(HOOK_OPTIONS)
 
 # 도움말 메뉴 옵션
 HELP_KEYBOARD = [
@@ -90,8 +113,38 @@ START_KEYBOARD = [
     ['📚 가이드']
 ]
 
+# 결과 후 다시 답할 수 있는 항목 (버튼 레이블, 선택 키보드)
+EDIT_FIELDS = {
+    'content_category': ('🎯 카테고리', CATEGORY_KEYBOARD),
+    'content_topic': ('✍️ 주제', None),
+    'target_age': ('👥 연령대', AGE_KEYBOARD),
+    'target_interest': ('💫 관심사', INTEREST_KEYBOARD),
+    'platform': ('📱 플랫폼', PLATFORM_KEYBOARD),
+    'hook_point': ('🎣 후킹포인트', HOOK_KEYBOARD)
+}
+
+# 결과 메시지 아래 다시 실행 버튼
+RERUN_BUTTONS = [
+    InlineKeyboardButton("✏️ 답변 하나 바꾸기", callback_data='edit'),
+    InlineKeyboardButton("🔄 전략만 다시 만들기", callback_data='regen')
+]
+
+@traced('handler.start_conversation')
 async def start_conversation(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """대화 시작 핸들러"""
+    # 인라인 질의 딥링크(/start analyze_...)로 들어오면 바로 설문 시작
+    topic = decode_start_parameter(context.args[0]) if context.args else None
+    if topic is not None:
+        state = user_states.get(update.effective_user.id)
+        state.answers = AnswerRecord()
+        if topic:
+            state.answers.set('content_topic', topic)
+        await update.message.reply_text(
+            Elon.QUESTIONS['content_category'],
+            reply_markup=ReplyKeyboardMarkup(CATEGORY_KEYBOARD, resize_keyboard=True)
+        )
+        return CONTENT_CATEGORY
+    
     try:
         await update.message.reply_photo(
             photo=Elon.WELCOME_IMG_URL,
@@ -106,11 +159,13 @@ async def start_conversation(update: Update, context: ContextTypes.DEFAULT_TYPE)
         )
     return WAITING_START
 
+@traced('handler.handle_start_response')
 async def handle_start_response(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """시작 응답 처리 핸들러"""
     text = update.message.text
     
     if text == '✨ 시작하기':
+        user_states.get(update.effective_user.id).answers = AnswerRecord()
         reply_markup = ReplyKeyboardMarkup(CATEGORY_KEYBOARD, resize_keyboard=True)
         await update.message.reply_text(
             Elon.QUESTIONS['content_category'],
@@ -134,18 +189,30 @@ async def handle_start_response(update: Update, context: ContextTypes.DEFAULT_TY
         await update.message.reply_text("안내 메세지 👀")
         return WAITING_START
 
+@traced('handler.handle_content_category')
 async def handle_content_category(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """콘텐츠 카테고리 선택 처리 핸들러"""
-    context.user_data['content_category'] = update.message.text
-    await update.message.reply_text(
-        Elon.QUESTIONS['content_topic'],
-        reply_markup=ReplyKeyboardRemove()
-    )
+    answers = user_states.get(update.effective_user.id).answers
+    answers.set('content_category', update.message.text)
+    
+    # 인라인 딥링크로 들어온 주제가 있으면 버튼으로 제안
+    suggested_topic = answers.get('content_topic')
+    if suggested_topic:
+        await update.message.reply_text(
+            f"{Elon.QUESTIONS['content_topic']}\n{Elon.INLINE_SUGGESTED_TOPIC}",
+            reply_markup=ReplyKeyboardMarkup([[suggested_topic]], resize_keyboard=True, one_time_keyboard=True)
+        )
+    else:
+        await update.message.reply_text(
+            Elon.QUESTIONS['content_topic'],
+            reply_markup=ReplyKeyboardRemove()
+        )
     return CONTENT_TOPIC
 
+@traced('handler.handle_content_topic')
 async def handle_content_topic(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """콘텐츠 주제 입력 처리 핸들러"""
-    context.user_data['content_topic'] = update.message.text
+    user_states.get(update.effective_user.id).answers.set('content_topic', update.message.text)
     reply_markup = ReplyKeyboardMarkup(AGE_KEYBOARD, resize_keyboard=True)
     await update.message.reply_text(
         Elon.QUESTIONS['target_age'],
@@ -153,9 +220,10 @@ async def handle_content_topic(update: Update, context: ContextTypes.DEFAULT_TYP
     )
     return TARGET_AGE
 
+@traced('handler.handle_target_age')
 async def handle_target_age(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """타겟 연령대 선택 처리 핸들러"""
-    context.user_data['target_age'] = update.message.text
+    user_states.get(update.effective_user.id).answers.set('target_age', update.message.text)
     reply_markup = ReplyKeyboardMarkup(INTEREST_KEYBOARD, resize_keyboard=True)
     await update.message.reply_text(
         Elon.QUESTIONS['target_interest'],
@@ -163,9 +231,10 @@ async def handle_target_age(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
     return TARGET_INTEREST
 
+@traced('handler.handle_target_interest')
 async def handle_target_interest(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """타겟 관심사 선택 처리 핸들러"""
-    context.user_data['target_interest'] = update.message.text
+    user_states.get(update.effective_user.id).answers.set('target_interest', update.message.text)
     reply_markup = ReplyKeyboardMarkup(PLATFORM_KEYBOARD, resize_keyboard=True)
     await update.message.reply_text(
         Elon.QUESTIONS['platform'],
@@ -173,9 +242,10 @@ async def handle_target_interest(update: Update, context: ContextTypes.DEFAULT_T
     )
     return PLATFORM
 
+@traced('handler.handle_platform')
 async def handle_platform(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """플랫폼 선택 처리 핸들러"""
-    context.user_data['platform'] = update.message.text
+    user_states.get(update.effective_user.id).answers.set('platform', update.message.text)
     reply_markup = ReplyKeyboardMarkup(HOOK_KEYBOARD, resize_keyboard=True)
     await update.message.reply_text(
         Elon.QUESTIONS['hook_point'],
@@ -183,100 +253,345 @@ async def handle_platform(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
     return HOOK_POINT
 
+async def reply_admission_rejected(update: Update, rejected: AdmissionRejected, request_key: str):
+    """요청 거절 안내 및 캐시된 결과 제공"""
+    message = update.effective_message
+    if rejected.reason == 'daily_quota':
+        await message.reply_text(Elon.DAILY_QUOTA_EXCEEDED, reply_markup=ReplyKeyboardRemove())
+        return
+    if rejected.reason == 'rate_limited':
+        await message.reply_text(Elon.RATE_LIMITED, reply_markup=ReplyKeyboardRemove())
+        return
+
+    minutes = max(1, round(rejected.estimated_wait / 60))
+    await message.reply_text(
+        Elon.OVERLOADED.format(minutes=minutes),
+        reply_markup=ReplyKeyboardRemove()
+    )
+    # 같은 답변 조합으로 저장된 결과가 있을 때만 대신 보여줌
+    cached = await asyncio.to_thread(find_analysis_by_request, request_key)
+    if cached:
+        await message.reply_text(Elon.CACHED_RESULT_NOTICE)
+        await message.reply_text(Elon.format_analysis_result(cached))
+
+def make_coalesce_key(user_id, request_key: str, fresh_strategy: bool = False) -> str:
+    """요청 병합과 작업 저널에 쓰는 키 (전략 재생성 여부와 배정된 프롬프트 변형 포함)"""
+    # 전략 재생성은 같은 답변의 일반 분석과 병합되지 않도록 별도 키 사용
+    if fresh_strategy:
+        request_key = f"{request_key}:strategy"
+    # 실험 중에는 다른 변형에 배정된 사용자끼리 병합되지 않도록 키에 변형 포함
+    if langchain_service.experiment.active:
+        request_key = f"{request_key}:{langchain_service.experiment.assign(user_id)}"
+    return request_key
+
+async def run_analysis(user_id, coalesce_key: str, request_data: dict, summary: str = None, fresh_strategy: bool = False):
+    """AI 분석 실행 (동일 요청은 병합, 실행 순서는 스케줄러가 결정)"""
+    variant_id = langchain_service.experiment.assign(user_id)
+    return await request_coalescer.run(
+        coalesce_key,
+        lambda: analysis_scheduler.run(
+            user_id,
+            lambda: langchain_service.generate_content_ideas(
+                request_data,
+                summary=summary,
+                on_summary=functools.partial(analysis_jobs.record_stage1, coalesce_key),
+                fresh_strategy=fresh_strategy,
+                variant_id=variant_id
+            )
+        )
+    )
+
+async def deliver_result(bot, chat_id: int, user_id, request_data: dict, analysis_result: dict, latency_ms: int):
+    """분석 결과 저장 후 사용자에게 전송"""
+    # 병합된 요청은 결과를 함께 받으므로 토큰 수는 처음 저장하는 행에만 기록
+    usage = analysis_result.pop('llm_usage', None) or {}
+    experiment = {
+        'prompt_variant': analysis_result.get('prompt_variant'),
+        'parse_ok': analysis_result.get('parse_ok'),
+        **usage
+    }
+    
+    # 분석 결과 저장
+    analysis_id = None
+    try:
+        analysis_id = await asyncio.to_thread(
+            save_analysis,
+            telegram_id=user_id,
+            input_data=request_data,
+            result=analysis_result,
+            latency_ms=latency_ms,
+            experiment=experiment,
+            request_key=make_request_key(request_data)
+        )
+    except Exception as e:
+        print(f"데이터베이스 저장 오류: {e}")
+    
+    # 분석 결과 구조 보존
+    formatted_result = {
+        'ideas': analysis_result.get('ideas', ''),
+        'production_strategy': analysis_result.get('production_strategy', []),
+        'engagement_strategy': analysis_result.get('engagement_strategy', []),
+        'growth_strategy': analysis_result.get('growth_strategy', []),
+        'trending_hashtags': analysis_result.get('trending_hashtags', [])
+    }
+    
+    # 결과는 캐시에 두고 사용자 상태에는 id만 보관
+    # (재개된 분석도 답변을 바꿔 다시 실행할 수 있도록 답변을 함께 복원)
+    result_id = result_cache.put(formatted_result, analysis_id)
+    state = user_states.get(user_id)
+    state.analysis_id = result_id
+    state.answers = AnswerRecord.from_dict(request_data)
+    
+    # 인라인 질의에서 바로 찾을 수 있도록 주제 인덱스에 추가
+    topic_index.add(result_id, request_data, formatted_result)
+    
+    # 분석 결과 메시지 전송
+    formatted_message = Elon.format_analysis_result(formatted_result)
+    await bot.send_message(chat_id, formatted_message)
+    
+    # 분석 완료 후 인라인 키보드 생성
+    keyboard = [
+        [
+            InlineKeyboardButton("📱 틱톡 크리에이티브 센터", url="https://ads.tiktok.com/business/creativecenter/inspiration/popular/hashtag/pc/en")
+        ],
+        [
+            InlineKeyboardButton("🎬 아이디어 공유", url="https://t.me/share/url?url=https://t.me/shortform_script_bot&text=✨숏폼 콘텐츠 아이디어 어시스턴트✨"),
+            InlineKeyboardButton("💡 피드백", url="tg://resolve?domain=shortform_feedback")
+        ],
+        RERUN_BUTTONS,
+    ]
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    
+    await bot.send_message(
+        chat_id,
+        "분석이 완료되었습니다!",
+        reply_markup=reply_markup
+    )
+
+@traced('handler.handle_hook_point')
 async def handle_hook_point(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """후킹포인트 선택 처리 핸들러"""
-    context.user_data['hook_point'] = update.message.text
+    state = user_states.get(update.effective_user.id)
+    state.answers.set('hook_point', update.message.text)
+    return await analyze_and_reply(update, context, state.answers.to_dict())
+
+async def analyze_and_reply(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    request_data: dict,
+    summary: str = None,
+    fresh_strategy: bool = False
+):
+    """분석 요청 접수부터 결과 전송까지 (설문 완료, 답변 수정, 전략 재생성 공통)"""
+    user_id = update.effective_user.id
+    chat_id = update.effective_chat.id
+    message = update.effective_message
+    request_key = make_request_key(request_data)
+    coalesce_key = make_coalesce_key(user_id, request_key, fresh_strategy)
+    
+    # 배포/종료 중에는 새 분석을 받지 않음
+    if analysis_jobs.draining:
+        await message.reply_text(Elon.DRAINING, reply_markup=ReplyKeyboardRemove())
+        return ConversationHandler.END
+    
+    # 사용자 한도 및 대기열 상태 확인
+    try:
+        await analysis_scheduler.admit(user_id)
+    except AdmissionRejected as rejected:
+        await reply_admission_rejected(update, rejected, request_key)
+        return ConversationHandler.END
+    
+    # 작업 저널 기록 (종료 시 중단되면 재시작 후 이어서 실행)
+    job_id = await analysis_jobs.begin(chat_id, user_id, coalesce_key, request_data, stage1=summary)
     
     try:
         # 분석 시작 메시지 전송
-        await update.message.reply_text(
-            Elon.ANALYSIS_START,
+        await message.reply_text(
+            Elon.REGENERATE_START if fresh_strategy else Elon.ANALYSIS_START,
             reply_markup=ReplyKeyboardRemove()
         )
         
         # AI 분석 수행 및 결과 대기
-        analysis_result = await langchain_service.generate_content_ideas(context.user_data)
+        started_at = time.monotonic()
+        analysis_result = await run_analysis(
+            user_id, coalesce_key, request_data, summary=summary, fresh_strategy=fresh_strategy
+        )
         
-        if not analysis_result:
-            await update.message.reply_text(
-                "⚠️ 분석 중 오류가 발생했습니다. 다시 시도해주세요."
+        if analysis_result:
+            await deliver_result(
+                context.bot, chat_id, user_id, request_data, analysis_result,
+                int((time.monotonic() - started_at) * 1000)
             )
-            return ConversationHandler.END
-            
-        # 분석 결과 저장
-        try:
-            save_analysis(
-                telegram_id=update.effective_user.id,
-                input_data=context.user_data,
-                result=analysis_result
+        else:
+            await message.reply_text(
+                "⚠️ 분석 중 오류가 발생했습니다. 다시 시도해주세요."
             )
-        except Exception as e:
-            print(f"데이터베이스 저장 오류: {e}")
-        
-        # 분석 결과 구조 보존
-        formatted_result = {
-            'ideas': analysis_result.get('ideas', ''),
-            'production_strategy': analysis_result.get('production_strategy', []),
-            'engagement_strategy': analysis_result.get('engagement_strategy', []),
-            'growth_strategy': analysis_result.get('growth_strategy', []),
-            'trending_hashtags': analysis_result.get('trending_hashtags', [])
-        }
-        
-        # 디버깅 로그
-        print("\n=== Analysis Result Structure ===")
-        for key, value in formatted_result.items():
-            print(f"\n{key}:")
-            if isinstance(value, list):
-                for item in value:
-                    print(f"  {item}")
-            else:
-                print(f"  {value}")
-        
-        context.user_data['analysis_result'] = formatted_result
-        
-        # 분석 결과 메시지 전송
-        formatted_message = Elon.format_analysis_result(formatted_result)
-        await update.message.reply_text(formatted_message)
-        
-        # 분석 완료 후 인라인 키보드 생성
-        keyboard = [
-            [
-                InlineKeyboardButton("📱 틱톡 크리에이티브 센터", url="https://ads.tiktok.com/business/creativecenter/inspiration/popular/hashtag/pc/en")
-            ],
-            [
-                InlineKeyboardButton("🎬 아이디어 공유", url="https://t.me/share/url?url=https://t.me/shortform_script_bot&text=✨숏폼 콘텐츠 아이디어 어시스턴트✨"),
-                InlineKeyboardButton("💡 피드백", url="tg://resolve?domain=shortform_feedback")
-            ],
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(
-            "분석이 완료되었습니다!",
-            reply_markup=reply_markup
-        )
-        
-        return ConversationHandler.END
         
     except Exception as e:
         print(f"분석 중 오류 발생: {e}")
-        await update.message.reply_text(
+        await message.reply_text(
             "⚠️ 시스템 오류가 발생했습니다. 다시 시도해주세요."
         )
+    
+    # 취소(종료 시 중단)된 경우에는 여기까지 오지 않으므로 저널이 남음
+    await analysis_jobs.finish(job_id)
+    return ConversationHandler.END
+
+def _completed_answers(user_id) -> Optional[dict]:
+    """이전 분석의 답변 (만료되었거나 빠진 항목이 있으면 None)"""
+    state = user_states.peek(user_id)
+    if state is None:
+        return None
+    answers = state.answers.to_dict()
+    return answers if all(answers.values()) else None
+
+@traced('handler.handle_edit_menu')
+async def handle_edit_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """결과 후 '답변 하나 바꾸기': 바꿀 항목 버튼 표시"""
+    query = update.callback_query
+    await query.answer()
+    if _completed_answers(update.effective_user.id) is None:
+        await query.message.reply_text(Elon.ANSWERS_EXPIRED)
+        return ConversationHandler.END
+    
+    buttons = [
+        InlineKeyboardButton(label, callback_data=f"edit:{field}")
+        for field, (label, _) in EDIT_FIELDS.items()
+    ]
+    await query.message.reply_text(
+        Elon.EDIT_FIELD_PROMPT,
+        reply_markup=InlineKeyboardMarkup([buttons[i:i + 2] for i in range(0, len(buttons), 2)])
+    )
+    return ConversationHandler.END
+
+@traced('handler.handle_edit_field')
+async def handle_edit_field(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """바꿀 항목 선택: 이전 답변을 보여주고 새 답변 입력 대기"""
+    query = update.callback_query
+    await query.answer()
+    field = query.data.split(':', 1)[1]
+    answers = _completed_answers(update.effective_user.id)
+    if answers is None or field not in EDIT_FIELDS:
+        await query.message.reply_text(Elon.ANSWERS_EXPIRED)
+        return ConversationHandler.END
+    
+    user_states.get(update.effective_user.id).edit_field = field
+    _, keyboard = EDIT_FIELDS[field]
+    # 주제는 자유 입력이므로 이전 주제를 버튼으로 미리 채워 둠
+    keyboard = keyboard or [[answers[field]]]
+    await query.message.reply_text(
+        f"{Elon.QUESTIONS[field]}\n{Elon.EDIT_CURRENT_ANSWER.format(answer=answers[field])}",
+        reply_markup=ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True)
+    )
+    return EDIT_VALUE
+
+@traced('handler.handle_edit_value')
+async def handle_edit_value(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """새 답변으로 나머지 답변은 그대로 두고 다시 분석"""
+    state = user_states.get(update.effective_user.id)
+    field, state.edit_field = state.edit_field, None
+    if field is None or _completed_answers(update.effective_user.id) is None:
+        await update.message.reply_text(Elon.ANSWERS_EXPIRED, reply_markup=ReplyKeyboardRemove())
+        return ConversationHandler.END
+    
+    state.answers.set(field, update.message.text)
+    # 1단계 입력이 이전과 같으면 메모된 아이디어를 재사용
+    return await analyze_and_reply(update, context, state.answers.to_dict())
+
+@traced('handler.handle_regenerate_strategy')
+async def handle_regenerate_strategy(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """'전략만 다시 만들기': 아이디어(1단계)는 재사용하고 2단계만 새로 생성"""
+    query = update.callback_query
+    await query.answer()
+    request_data = _completed_answers(update.effective_user.id)
+    if request_data is None:
+        await query.message.reply_text(Elon.ANSWERS_EXPIRED)
         return ConversationHandler.END
+    
+    summary = langchain_service.memoized_summary(
+        request_data, langchain_service.experiment.assign(update.effective_user.id)
+    )
+    if summary is None:
+        # 메모에서 밀려났거나 다른 레플리카에서 만든 결과면 이전 결과의 아이디어 사용
+        state = user_states.peek(update.effective_user.id)
+        previous = await result_cache.get(state.analysis_id)
+        summary = (previous or {}).get('ideas')
+    
+    # 아이디어를 찾지 못하면 전체 분석으로 대신 실행
+    return await analyze_and_reply(update, context, request_data, summary=summary, fresh_strategy=True)
+
+@traced('journal.resume')
+async def _resume_analysis(bot, entry: dict):
+    """저널에 남은 작업을 마지막 완료 단계부터 이어서 실행"""
+    user_id = int(entry['telegram_id'])
+    request_data = entry['input_data']
+    job_id = await analysis_jobs.begin(
+        entry['chat_id'], user_id, entry['request_key'], request_data,
+        job_id=entry['job_id'], stage1=entry['stage1']
+    )
+    
+    try:
+        started_at = time.monotonic()
+        # 저널의 request_key는 변형까지 포함한 병합 키
+        analysis_result = await run_analysis(user_id, entry['request_key'], request_data, summary=entry['stage1'])
+        
+        if analysis_result:
+            await bot.send_message(entry['chat_id'], Elon.RESUMED_RESULT_NOTICE)
+            await deliver_result(
+                bot, entry['chat_id'], user_id, request_data, analysis_result,
+                int((time.monotonic() - started_at) * 1000)
+            )
+        else:
+            await bot.send_message(entry['chat_id'], "⚠️ 분석 중 오류가 발생했습니다. 다시 시도해주세요. /start")
+    except Exception as e:
+        print(f"중단된 분석 재개 실패: {e}")
+        analysis_jobs.release(job_id)
+        return
+    
+    await analysis_jobs.finish(job_id)
 
+async def resume_journaled_analyses(application) -> int:
+    """중단된 분석 작업을 저널에서 가져와 재개 (가져온 작업 수 반환)"""
+    if analysis_jobs.draining:
+        return 0
+    
+    # 재시도 한도를 넘긴 작업은 사용자에게 알린 뒤 포기
+    abandoned = await asyncio.to_thread(get_abandoned_journal_entries, JOURNAL_STALE_SECONDS, JOURNAL_MAX_ATTEMPTS)
+    for entry in abandoned:
+        try:
+            await application.bot.send_message(entry['chat_id'], Elon.RESUME_ABANDONED)
+        except Exception as e:
+            print(f"중단된 분석 포기 안내 실패: {e}")
+        await asyncio.to_thread(delete_journal_entry, entry['job_id'])
+        print(f"작업 재시도 한도 초과로 삭제: {entry['job_id']}")
+    
+    entries = await asyncio.to_thread(
+        claim_journal_entries, analysis_jobs.owner, JOURNAL_STALE_SECONDS, JOURNAL_MAX_ATTEMPTS
+    )
+    for entry in entries:
+        application.create_task(_resume_analysis(application.bot, entry))
+    return len(entries)
+
+@traced('handler.handle_analysis')
 async def handle_analysis(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """분석 결과 처리 핸들러"""
-    if 'analysis_result' not in context.user_data:
+    state = user_states.peek(update.effective_user.id)
+    analysis_result = None
+    if state is not None:
+        analysis_result = await result_cache.get(state.analysis_id)
+    
+    if not analysis_result:
         await update.message.reply_text(
             "❌ 분석 결과를 찾을 수 없습니다. 다시 시작해주세요."
         )
         return ConversationHandler.END
     
     await update.message.reply_text(
-        Elon.format_analysis_result(context.user_data['analysis_result'])
+        Elon.format_analysis_result(analysis_result)
     )
     return ConversationHandler.END
 
+@traced('handler.help_command')
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """도움말 명령어 핸들러"""
     help_text = (
@@ -290,6 +605,7 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(help_text, reply_markup=reply_markup)
     return HELP_MENU
 
+@traced('handler.handle_help_menu')
 async def handle_help_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """도움말 메뉴 처리 핸들러"""
     text = update.message.text
@@ -318,20 +634,49 @@ async def handle_help_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
     return HELP_MENU
 
+@traced('handler.handle_timeout')
+async def handle_timeout(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """대화 시간 초과 핸들러"""
+    user = update.effective_user if isinstance(update, Update) else None
+    if user is not None:
+        state = user_states.peek(user.id)
+        # 분석 결과가 없는 미완료 설문은 바로 정리
+        if state is not None and state.analysis_id is None:
+            user_states.discard(user.id)
+    if isinstance(update, Update) and update.effective_chat is not None:
+        await context.bot.send_message(
+            update.effective_chat.id,
+            "⏰ 입력 시간이 초과되었습니다. 다시 시작하려면 /start 를 입력하세요.",
+            reply_markup=ReplyKeyboardRemove()
+        )
+    return ConversationHandler.END
+
+@traced('handler.cancel')
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """취소 명령어 핸들러"""
+    state = user_states.peek(update.effective_user.id)
+    if state is not None and state.analysis_id is None:
+        user_states.discard(update.effective_user.id)
     await update.message.reply_text(
         "🛑 분석이 취소되었습니다. 새로 시작하려면 /start 를 입력하세요.",
         reply_markup=ReplyKeyboardRemove()
     )
     return ConversationHandler.END
 
+# 결과 메시지 버튼 핸들러 (설문 도중에 눌러도 동작하도록 fallbacks에도 등록)
+RERUN_HANDLERS = [
+    CallbackQueryHandler(handle_edit_menu, pattern=r'^edit$'),
+    CallbackQueryHandler(handle_edit_field, pattern=r'^edit:'),
+    CallbackQueryHandler(handle_regenerate_strategy, pattern=r'^regen$')
+]
+
 # 대화 핸들러 생성
 analysis_conversation = ConversationHandler(
     entry_points=[
         CommandHandler("start", start_conversation),
         CommandHandler("help", help_command),
-        CommandHandler("cancel", cancel)
+        CommandHandler("cancel", cancel),
+        *RERUN_HANDLERS
     ],
     
     states={
@@ -343,12 +688,18 @@ analysis_conversation = ConversationHandler(
         PLATFORM: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_platform)],
         HOOK_POINT: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_hook_point)],
         ANALYZING: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_analysis)],
-        HELP_MENU: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_help_menu)]
+        HELP_MENU: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_help_menu)],
+        EDIT_VALUE: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_edit_value)],
+        ConversationHandler.TIMEOUT: [TypeHandler(Update, handle_timeout)]
     },
     
     fallbacks=[
         CommandHandler("start", start_conversation), 
         CommandHandler("help", help_command),
-        CommandHandler("cancel", cancel)
-    ]
+        CommandHandler("cancel", cancel),
+        *RERUN_HANDLERS
+    ],
+    
+    # 방치된 설문은 일정 시간 후 종료하고 상태 정리
+    conversation_timeout=CONVERSATION_TIMEOUT
 )
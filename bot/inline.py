@@ -0,0 +1,71 @@
+"""
+인라인 질의 모듈
+
+이 모듈은 어느 채팅에서나 '@봇 주제'로 입력하면 이전에 생성된 분석 결과 중
+주제가 비슷한 것을 즉시 보여주고, 맞는 결과가 없으면 봇과의 대화(/start)로
+이어지는 딥링크 버튼을 제공합니다.
+"""
+
+import base64
+import binascii
+from typing import Optional
+from telegram import InlineQueryResultArticle, InlineQueryResultsButton, InputTextMessageContent, Update
+from telegram.ext import ContextTypes
+from bot.messages import ElonStyleMessageFormatter as Elon
+from config import INLINE_CACHE_TIME, INLINE_RESULTS_LIMIT
+from services.topic_index import topic_index
+from services.tracing import traced
+
+# /start 딥링크 파라미터 접두어 (텔레그램 제한: 영문/숫자/_/- 최대 64자)
+START_PARAMETER_PREFIX = 'analyze'
+_MAX_START_PARAMETER = 64
+
+def encode_start_parameter(topic: str = '') -> str:
+    """주제를 /start 딥링크 파라미터로 인코딩 (길면 앞부분만 사용)"""
+    topic = topic.strip()
+    while topic:
+        encoded = base64.urlsafe_b64encode(topic.encode()).decode().rstrip('=')
+        if len(START_PARAMETER_PREFIX) + 1 + len(encoded) <= _MAX_START_PARAMETER:
+            return f"{START_PARAMETER_PREFIX}_{encoded}"
+        topic = topic[:-1]
+    return START_PARAMETER_PREFIX
+
+def decode_start_parameter(parameter: str) -> Optional[str]:
+    """/start 딥링크 파라미터에서 주제 복원 (인라인 딥링크가 아니면 None, 주제 없으면 빈 문자열)"""
+    prefix, _, encoded = parameter.partition('_')
+    if prefix != START_PARAMETER_PREFIX:
+        return None
+    try:
+        return base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)).decode().strip()
+    except (binascii.Error, UnicodeDecodeError):
+        return ''
+
+@traced('handler.handle_inline_query')
+async def handle_inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """인라인 질의 핸들러 (색인된 결과만 조회하므로 LLM 호출 없음)"""
+    query = update.inline_query.query.strip()
+    entries = topic_index.search(query, INLINE_RESULTS_LIMIT)
+
+    results = []
+    for entry in entries:
+        start_link = f"https://t.me/{context.bot.username}?start={encode_start_parameter(entry.topic)}"
+        first_idea = next((line[2:].strip() for line in entry.ideas.split('\n') if line.startswith('- ')), '')
+        results.append(
+            InlineQueryResultArticle(
+                id=str(entry.result_id),
+                title=f"💡 {entry.topic}",
+                description=f"{entry.category} · {entry.platform}\n{first_idea}",
+                input_message_content=InputTextMessageContent(
+                    Elon.format_inline_result(entry.topic, entry.category, entry.platform, entry.ideas, start_link)
+                )
+            )
+        )
+
+    # 결과가 없으면 해당 주제로 바로 설문을 시작하는 딥링크 제공
+    if query and not results:
+        button_text = Elon.INLINE_GENERATE_BUTTON.format(topic=query[:20])
+    else:
+        button_text = Elon.INLINE_START_BUTTON
+    button = InlineQueryResultsButton(text=button_text, start_parameter=encode_start_parameter(query))
+
+    await update.inline_query.answer(results, cache_time=INLINE_CACHE_TIME, button=button)
@@ -60,6 +60,50 @@ class ElonStyleMessageFormatter:
 ⏱️ 잠시만 기다려주세요.
 """
 
+    # 요청 제한 메시지
+    RATE_LIMITED = """
+⏳ 요청이 너무 잦습니다.
+
+잠시 후 다시 시도해주세요. /start
+"""
+
+    DAILY_QUOTA_EXCEEDED = """
+📅 오늘 사용 가능한 분석 횟수를 모두 사용하셨습니다.
+
+내일 다시 이용해주세요!
+"""
+
+    OVERLOADED = """
+🚦 지금 요청이 많아 분석이 지연되고 있습니다.
+
+⏱️ 예상 대기 시간: 약 {minutes}분
+
+잠시 후 다시 시도해주세요. /start
+"""
+
+    CACHED_RESULT_NOTICE = "📦 같은 답변으로 최근에 생성된 분석 결과를 대신 보여드립니다:"
+
+    # 배포/재시작 관련 메시지
+    DRAINING = """
+🔧 잠시 서비스를 업데이트하고 있습니다.
+
+1분 정도 후에 다시 시도해주세요. /start
+"""
+
+    RESUMED_RESULT_NOTICE = "🔄 서비스 업데이트로 지연되었던 분석 결과를 보내드립니다."
+    RESUME_ABANDONED = "⚠️ 서비스 업데이트로 중단된 분석을 여러 번 다시 시도했지만 완료하지 못했습니다. /start 로 다시 요청해주세요."
+
+    # 결과 후 다시 실행 관련 메시지
+    EDIT_FIELD_PROMPT = "✏️ 어떤 답변을 바꿔볼까요? 나머지 답변은 그대로 사용합니다."
+    EDIT_CURRENT_ANSWER = "📝 이전 답변: {answer}"
+    REGENERATE_START = "🔄 같은 아이디어로 실행 전략만 새로 만들고 있어요. 잠시만 기다려주세요!"
+    ANSWERS_EXPIRED = "⌛ 이전 답변 정보가 만료되었습니다. /start 로 새로 시작해주세요."
+
+    # 인라인 질의 관련 메시지
+    INLINE_GENERATE_BUTTON = "🚀 '{topic}' 맞춤 분석 받기"
+    INLINE_START_BUTTON = "🚀 나만의 맞춤 분석 받기"
+    INLINE_SUGGESTED_TOPIC = "💡 인라인 검색에서 고른 주제를 아래 버튼으로 바로 입력할 수 있어요."
+
     # 질문 목록
     QUESTIONS = {
         # 콘텐츠 카테고리 선택
@@ -226,3 +270,21 @@ class ElonStyleMessageFormatter:
                 message_parts.append(f"{i}. #{tag}")
 
         return "\n".join(message_parts)
+
+    @staticmethod
+    def format_inline_result(topic: str, category: str, platform: str, ideas: str, start_link: str) -> str:
+        """
+        인라인 질의 결과로 보낼 아이디어 요약 메시지 포맷팅
+        """
+        message_parts = [f"✨ '{topic}' 숏폼 아이디어", f"🏷 {category} · {platform}"]
+
+        for line in ideas.split('\n'):
+            line = line.strip()
+            if line.startswith('# '):
+                message_parts.append(f"\n📍 {line[2:].strip().rstrip(':')}")
+            elif line.startswith('- '):
+                message_parts.append(f"• {line[2:].strip()}")
+
+        message_parts.extend(["", f"🚀 나에게 맞춘 전체 분석 받기: {start_link}"])
+        return "\n".join(message_parts)
+
@@ -0,0 +1,63 @@
+"""
+텔레그램 추적 연동 모듈
+
+이 모듈은 python-telegram-bot의 확장 지점에 추적을 연결합니다.
+
+- TracingUpdateProcessor: 업데이트마다 루트 스팬을 열고 그 안에서 핸들러를 실행
+- TracedHTTPXRequest: 업데이트 처리 중의 봇 API 호출(sendMessage 등)마다 자식 스팬 기록
+  (열린 트레이스 밖의 호출과 getUpdates 롱폴링은 기록하지 않음)
+"""
+
+from typing import Any, Awaitable, Tuple
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+from telegram.request import HTTPXRequest
+
+from services.tracing import hash_user_id, tracer
+
+class TracingUpdateProcessor(BaseUpdateProcessor):
+    """업데이트 하나를 하나의 트레이스로 처리하는 업데이트 처리기"""
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        """루트 스팬 안에서 업데이트 처리"""
+        if not tracer.enabled:
+            await coroutine
+            return
+
+        attributes = {}
+        if isinstance(update, Update):
+            attributes['update.id'] = update.update_id
+            if update.effective_user is not None:
+                attributes['user.id_hash'] = hash_user_id(update.effective_user.id)
+            if update.message is not None and update.message.text and update.message.text.startswith('/'):
+                attributes['update.command'] = update.message.text.split()[0]
+
+        with tracer.start_trace('telegram.update', **attributes):
+            await coroutine
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+class TracedHTTPXRequest(HTTPXRequest):
+    """봇 API 호출을 스팬으로 기록하는 HTTP 요청 클래스"""
+
+    def __init__(self, *args, traced: bool = True, **kwargs):
+        """요청 객체 초기화 (traced=False면 스팬을 기록하지 않음)"""
+        self.traced = traced
+        super().__init__(*args, **kwargs)
+
+    async def do_request(self, url: str, method: str, *args, **kwargs) -> Tuple[int, bytes]:
+        """API 호출 (열린 트레이스가 있을 때만 메서드 이름과 응답 코드를 자식 스팬에 기록)"""
+        if not self.traced or not tracer.has_active_span():
+            return await super().do_request(url, method, *args, **kwargs)
+
+        with tracer.span(f"telegram.{url.rsplit('/', 1)[-1]}") as span:
+            status, payload = await super().do_request(url, method, *args, **kwargs)
+            span.set_attribute('http.status_code', status)
+            if status >= 400:
+                span.set_error(f"HTTP {status}")
+            return status, payload
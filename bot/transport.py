@@ -0,0 +1,151 @@
+"""
+텔레그램 HTTP 전송 모듈
+
+이 모듈은 봇 API 호출(sendMessage 등)과 getUpdates 롱폴링이 서로 다른 연결 풀을 쓰도록
+요청 객체를 따로 만들고, 풀 크기/유휴 연결 유지/시간 제한을 설정에서 가져옵니다.
+h2 패키지가 설치되어 있으면 HTTP/2를 사용합니다.
+
+요청마다 빈 연결을 기다린 시간을 기록하여 /stats에서 풀 대기 상태를 확인할 수 있습니다.
+"""
+
+import asyncio
+import importlib.util
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+import httpx
+from telegram.error import TimedOut
+from telegram.request import BaseRequest
+
+from bot.telemetry import TracedHTTPXRequest
+from config import (
+    TELEGRAM_CONNECT_TIMEOUT,
+    TELEGRAM_HTTP_VERSION,
+    TELEGRAM_KEEPALIVE_EXPIRY,
+    TELEGRAM_POOL_SIZE,
+    TELEGRAM_POOL_TIMEOUT,
+    TELEGRAM_READ_TIMEOUT,
+    TELEGRAM_WRITE_TIMEOUT
+)
+
+def resolve_http_version(setting: str = TELEGRAM_HTTP_VERSION) -> str:
+    """'auto'면 h2 패키지 설치 여부로 HTTP 버전 결정"""
+    if setting == 'auto':
+        return '2' if importlib.util.find_spec('h2') else '1.1'
+    return setting
+
+class PoolWaitStats:
+    """연결 풀 대기 시간 통계 (최근 window개 요청 기준)"""
+    def __init__(self, name: str, pool_size: int, window: int = 1000):
+        """통계 초기화"""
+        self.name = name
+        self.pool_size = pool_size
+        self._waits: Deque[float] = deque(maxlen=window)
+        self.in_flight = 0
+        self.waiting = 0
+        self.requests = 0
+        self.timeouts = 0
+        self.max_wait_ms = 0.0
+
+    def record(self, wait_ms: float) -> None:
+        """빈 연결을 얻기까지 기다린 시간 기록"""
+        self.requests += 1
+        self._waits.append(wait_ms)
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def percentile(self, q: float) -> float:
+        """최근 대기 시간의 백분위수 (ms)"""
+        if not self._waits:
+            return 0.0
+        ordered = sorted(self._waits)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    def snapshot(self) -> Dict:
+        """현재 상태 요약"""
+        return {
+            'name': self.name,
+            'pool_size': self.pool_size,
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'requests': self.requests,
+            'timeouts': self.timeouts,
+            'wait_p50_ms': round(self.percentile(0.5), 1),
+            'wait_p95_ms': round(self.percentile(0.95), 1),
+            'wait_max_ms': round(self.max_wait_ms, 1)
+        }
+
+# 요청 객체 이름 -> 풀 대기 통계 (/stats 보고용)
+transport_stats: Dict[str, PoolWaitStats] = {}
+
+class TelegramRequest(TracedHTTPXRequest):
+    """연결 수만큼만 동시에 보내고 빈 연결 대기 시간을 기록하는 HTTP 요청 클래스"""
+    def __init__(
+        self,
+        name: str,
+        connection_pool_size: int = TELEGRAM_POOL_SIZE,
+        keepalive_expiry: float = TELEGRAM_KEEPALIVE_EXPIRY,
+        read_timeout: Optional[float] = TELEGRAM_READ_TIMEOUT,
+        write_timeout: Optional[float] = TELEGRAM_WRITE_TIMEOUT,
+        connect_timeout: Optional[float] = TELEGRAM_CONNECT_TIMEOUT,
+        pool_timeout: Optional[float] = TELEGRAM_POOL_TIMEOUT,
+        http_version: Optional[str] = None,
+        traced: bool = True
+    ):
+        """요청 객체 초기화 (http_version이 없으면 TELEGRAM_HTTP_VERSION에 따라 결정)"""
+        self.keepalive_expiry = keepalive_expiry
+        self.stats = PoolWaitStats(name, connection_pool_size)
+        # 연결 수와 같은 크기의 대기열: 여기서 기다린 시간이 곧 풀 대기 시간
+        self._slots = asyncio.Semaphore(connection_pool_size)
+        super().__init__(
+            connection_pool_size=connection_pool_size,
+            read_timeout=read_timeout,
+            write_timeout=write_timeout,
+            connect_timeout=connect_timeout,
+            pool_timeout=pool_timeout,
+            http_version=http_version or resolve_http_version(),
+            traced=traced
+        )
+        transport_stats[name] = self.stats
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """유휴 연결 유지 시간을 반영한 httpx 클라이언트 생성"""
+        limits = self._client_kwargs['limits']
+        self._client_kwargs['limits'] = httpx.Limits(
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+        return super()._build_client()
+
+    async def do_request(self, url: str, method: str, *args, pool_timeout=BaseRequest.DEFAULT_NONE, **kwargs) -> Tuple[int, bytes]:
+        """빈 연결이 생길 때까지 pool_timeout만큼 기다린 뒤 요청"""
+        timeout = pool_timeout if pool_timeout is None or isinstance(pool_timeout, (int, float)) else self._client.timeout.pool
+        started = time.monotonic()
+        self.stats.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout)
+        except asyncio.TimeoutError as e:
+            self.stats.timeouts += 1
+            raise TimedOut(
+                f"연결 풀 대기 시간 초과 ({self.stats.name}, {timeout}s): 요청을 보내지 않았습니다. "
+                "TELEGRAM_POOL_SIZE 또는 TELEGRAM_POOL_TIMEOUT을 늘려보세요."
+            ) from e
+        finally:
+            self.stats.waiting -= 1
+
+        self.stats.record((time.monotonic() - started) * 1000)
+        self.stats.in_flight += 1
+        try:
+            return await super().do_request(url, method, *args, pool_timeout=pool_timeout, **kwargs)
+        finally:
+            self.stats.in_flight -= 1
+            self._slots.release()
+
+def build_bot_request() -> TelegramRequest:
+    """봇 API 호출용 요청 객체 (sendMessage, editMessageText 등)"""
+    return TelegramRequest('bot')
+
+def build_updates_request() -> TelegramRequest:
+    """getUpdates 롱폴링 전용 요청 객체 (동시에 하나만 실행되므로 연결 하나, 추적하지 않음)"""
+    return TelegramRequest('updates', connection_pool_size=1, traced=False)
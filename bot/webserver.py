@@ -0,0 +1,120 @@
+"""
+웹 서버 모듈
+
+이 모듈은 웹훅 포트 하나에서 텔레그램 웹훅과 상태 확인 엔드포인트를 함께 제공합니다.
+
+- GET /healthz: 프로세스와 이벤트 루프가 응답하는지 (liveness)
+- GET /readyz: 예열과 자체 점검을 마치고 요청을 받을 준비가 되었는지 (readiness)
+- POST /telegram: 텔레그램 업데이트 수신
+
+웹훅은 예열(post_init)이 끝나 준비 상태가 된 뒤에만 텔레그램에 등록합니다.
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application
+
+# 웹훅 수신 경로
+WEBHOOK_PATH = 'telegram'
+
+# 준비 여부 판단에 반드시 통과해야 하는 점검 항목
+CRITICAL_CHECKS = ('telegram', 'self_check')
+
+class HealthState:
+    """준비 상태와 시작 시 점검 결과"""
+    def __init__(self):
+        """상태 초기화"""
+        self.ready = False
+        self.checks: Dict[str, str] = {}
+        self.started_at = time.monotonic()
+
+    @property
+    def checks_passed(self) -> bool:
+        """필수 점검 항목 통과 여부"""
+        return all(self.checks.get(name) == 'ok' for name in CRITICAL_CHECKS)
+
+    def snapshot(self) -> Dict:
+        """상태 확인 응답 본문"""
+        return {
+            'ready': self.ready,
+            'uptime': round(time.monotonic() - self.started_at, 1),
+            'checks': dict(self.checks)
+        }
+
+# 프로세스 전역 상태
+health = HealthState()
+
+def build_web_app(application: Application, secret_token: Optional[str] = None) -> web.Application:
+    """웹훅/상태 확인 라우트를 가진 aiohttp 앱 생성"""
+    async def healthz(request: web.Request) -> web.Response:
+        return web.json_response({'status': 'ok', 'uptime': health.snapshot()['uptime']})
+
+    async def readyz(request: web.Request) -> web.Response:
+        return web.json_response(health.snapshot(), status=200 if health.ready else 503)
+
+    async def webhook(request: web.Request) -> web.Response:
+        if secret_token and request.headers.get('X-Telegram-Bot-Api-Secret-Token') != secret_token:
+            return web.Response(status=403)
+        try:
+            data = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+        await application.update_queue.put(Update.de_json(data, application.bot))
+        return web.Response()
+
+    app = web.Application()
+    app.router.add_get('/healthz', healthz)
+    app.router.add_get('/readyz', readyz)
+    app.router.add_post(f'/{WEBHOOK_PATH}', webhook)
+    return app
+
+async def start_web_server(application: Application, listen: str, port: int, secret_token: Optional[str] = None) -> web.AppRunner:
+    """웹 서버 시작 (예열 중에도 /healthz 응답, /readyz는 503)"""
+    runner = web.AppRunner(build_web_app(application, secret_token), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, listen, port).start()
+    return runner
+
+def run_webhook(application: Application, listen: str, port: int, webhook_url: str, secret_token: Optional[str] = None) -> None:
+    """웹 서버를 먼저 열고 예열이 끝나 준비되면 웹훅 등록 (Application.run_webhook 대체)
+
+    실행 순서는 Application.run_webhook과 같고(initialize → post_init → start → 대기 → 종료 처리),
+    상태 확인 엔드포인트를 위해 서버만 직접 띄웁니다. 종료는 stop_running()으로 합니다.
+    """
+    loop = asyncio.get_event_loop()
+    runner = None
+    try:
+        loop.run_until_complete(application.initialize())
+        runner = loop.run_until_complete(start_web_server(application, listen, port, secret_token))
+        if application.post_init:
+            loop.run_until_complete(application.post_init(application))
+        if not health.checks_passed:
+            raise RuntimeError(f"시작 점검 실패로 웹훅을 등록하지 않습니다: {health.checks}")
+
+        loop.run_until_complete(application.start())
+        loop.run_until_complete(
+            application.bot.set_webhook(
+                f"{webhook_url.rstrip('/')}/{WEBHOOK_PATH}",
+                allowed_updates=Update.ALL_TYPES,
+                secret_token=secret_token
+            )
+        )
+        health.ready = True
+        loop.run_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        health.ready = False
+        try:
+            if application.running:
+                loop.run_until_complete(application.stop())
+            if runner is not None:
+                loop.run_until_complete(runner.cleanup())
+            loop.run_until_complete(application.shutdown())
+            if application.post_shutdown:
+                loop.run_until_complete(application.post_shutdown(application))
+        finally:
+            loop.close()
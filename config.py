@@ -1,4 +1,6 @@
 import os
+import json
+import uuid
 from dotenv import load_dotenv
 
 # .env 파일 로드
@@ -10,6 +12,20 @@ TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 # ANTHROPIC 설정
 ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY')
 
+# LLM 백엔드 풀 설정
+# ANTHROPIC_API_KEYS: 쉼표 구분 키 목록 ('키:모델' 형식이면 해당 모델 전용 백엔드)
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'anthropic')  # 'anthropic' | 'local'
+ANTHROPIC_API_KEYS = [
+    key.strip() for key in (os.getenv('ANTHROPIC_API_KEYS') or ANTHROPIC_API_KEY or '').split(',')
+    if key.strip()
+]
+LLM_KEY_RPM = float(os.getenv('LLM_KEY_RPM', 0))  # 키당 분당 요청 한도 (0이면 응답 헤더 기준만 사용)
+LLM_EJECT_SECONDS = float(os.getenv('LLM_EJECT_SECONDS', 10))
+LLM_EJECT_MAX_SECONDS = float(os.getenv('LLM_EJECT_MAX_SECONDS', 120))
+LLM_WORKER_THREADS = int(os.getenv('LLM_WORKER_THREADS', 8))  # LLM 호출 전용 스레드 수 (DB 호출과 분리)
+LLM_LOCAL_BACKENDS = int(os.getenv('LLM_LOCAL_BACKENDS', 1))
+LLM_LOCAL_LATENCY_MS = float(os.getenv('LLM_LOCAL_LATENCY_MS', 0))
+
 # 에러 메시지
 ERROR_MESSAGES = {
     'server_error': '서버 오류가 발생했습니다. 잠시 후 다시 시도해주세요.'
@@ -18,3 +34,110 @@ ERROR_MESSAGES = {
 # Railway 환경 설정
 IS_PRODUCTION = os.getenv('RAILWAY_ENVIRONMENT') == 'production'
 PORT = int(os.getenv('PORT', 3000))
+
+# 요청 병합 설정
+COALESCE_ACROSS_REPLICAS = os.getenv('COALESCE_ACROSS_REPLICAS') == 'true'
+COALESCE_LOCK_TIMEOUT = float(os.getenv('COALESCE_LOCK_TIMEOUT', 120))
+COALESCE_POLL_INTERVAL = float(os.getenv('COALESCE_POLL_INTERVAL', 0.5))
+
+# 분석 요청 스케줄러 설정
+SCHEDULER_MAX_CONCURRENCY = int(os.getenv('SCHEDULER_MAX_CONCURRENCY', 4))
+SCHEDULER_QUANTUM = float(os.getenv('SCHEDULER_QUANTUM', 1.0))
+SHED_WAIT_SECONDS = float(os.getenv('SHED_WAIT_SECONDS', 90))
+USER_RATE_PER_MINUTE = float(os.getenv('USER_RATE_PER_MINUTE', 1))
+USER_BURST = float(os.getenv('USER_BURST', 3))
+USER_DAILY_QUOTA = int(os.getenv('USER_DAILY_QUOTA', 20))
+
+# 적응형 max_tokens 설정
+ADAPTIVE_WINDOW = int(os.getenv('ADAPTIVE_WINDOW', 500))
+ADAPTIVE_MIN_SAMPLES = int(os.getenv('ADAPTIVE_MIN_SAMPLES', 20))
+ADAPTIVE_MAX_TOKENS_MARGIN = float(os.getenv('ADAPTIVE_MAX_TOKENS_MARGIN', 1.3))
+ADAPTIVE_MAX_TOKENS_FLOOR = int(os.getenv('ADAPTIVE_MAX_TOKENS_FLOOR', 512))
+ADAPTIVE_MAX_TOKENS_CEILING = int(os.getenv('ADAPTIVE_MAX_TOKENS_CEILING', 4000))
+
+# 단계별 모델 라우팅 (예: {"summary": "claude-3-haiku-20240307", "analysis:테크/IT": "claude-3-sonnet-20240229"})
+LLM_DEFAULT_MODEL = os.getenv('LLM_DEFAULT_MODEL', 'claude-3-haiku-20240307')
+LLM_MODEL_ROUTES = json.loads(os.getenv('LLM_MODEL_ROUTES') or '{}')
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 2))
+LLM_MEMO_SIZE = int(os.getenv('LLM_MEMO_SIZE', 500))  # 단계별 출력 메모 항목 수
+
+# 프롬프트 변형 실험 설정 (prompts/<변형 id>/ 아래 버전별 프롬프트 파일)
+# PROMPT_VARIANTS: '변형:비율' 쉼표 구분 (예: "v1:90,v2-compact:10"), 사용자는 텔레그램 ID로 고정 배정
+PROMPTS_DIR = os.getenv('PROMPTS_DIR', 'prompts')
+PROMPT_VARIANTS = os.getenv('PROMPT_VARIANTS', 'v1:100')
+PROMPT_EXPERIMENT = os.getenv('PROMPT_EXPERIMENT', 'prompt-v1')  # 배정 해시 솔트 (바꾸면 전체 재배정)
+
+# 디버깅용 체인 중복 실행 여부 (켜면 LLM 호출이 두 배가 됨)
+DEBUG_CHAIN = os.getenv('DEBUG_CHAIN') == 'true'
+
+# 관리자 텔레그램 ID 목록 (쉼표 구분)
+ADMIN_IDS = {int(x) for x in os.getenv('ADMIN_IDS', '').split(',') if x.strip()}
+
+# 사용량 집계 주기 (초)
+ROLLUP_INTERVAL = int(os.getenv('ROLLUP_INTERVAL', 300))
+
+# analyses 파티션 및 보관 설정
+PARTITION_MONTHS_AHEAD = int(os.getenv('PARTITION_MONTHS_AHEAD', 3))
+ANALYSES_RETENTION_MONTHS = int(os.getenv('ANALYSES_RETENTION_MONTHS', 12))
+ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', 'archive')
+PARTITION_MAINTENANCE_INTERVAL = int(os.getenv('PARTITION_MAINTENANCE_INTERVAL', 86400))
+
+# 사용자 조회 등 자주 쓰는 쿼리의 조회 기간 (일)
+HOT_QUERY_DAYS = int(os.getenv('HOT_QUERY_DAYS', 90))
+
+# 해시태그 순위 인덱스 설정
+HASHTAG_HALF_LIFE_DAYS = float(os.getenv('HASHTAG_HALF_LIFE_DAYS', 14))
+HASHTAG_TOP_K = int(os.getenv('HASHTAG_TOP_K', 10))
+HASHTAG_SNAPSHOT_PATH = os.getenv('HASHTAG_SNAPSHOT_PATH', 'data/hashtag_index.json')
+HASHTAG_REFRESH_INTERVAL = int(os.getenv('HASHTAG_REFRESH_INTERVAL', 600))
+
+# 사용자 상태 메모리 한도
+USER_STATE_MAX_ENTRIES = int(os.getenv('USER_STATE_MAX_ENTRIES', 50000))
+USER_STATE_IDLE_TTL = int(os.getenv('USER_STATE_IDLE_TTL', 3600))
+RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', 1000))
+CONVERSATION_TIMEOUT = int(os.getenv('CONVERSATION_TIMEOUT', 900))
+
+# 배포 시 진행 중인 분석 처리 설정
+INSTANCE_ID = os.getenv('RAILWAY_REPLICA_ID') or os.getenv('HOSTNAME') or uuid.uuid4().hex[:12]
+DRAIN_GRACE_SECONDS = float(os.getenv('DRAIN_GRACE_SECONDS', 25))
+JOURNAL_STALE_SECONDS = int(os.getenv('JOURNAL_STALE_SECONDS', 300))
+JOURNAL_MAX_ATTEMPTS = int(os.getenv('JOURNAL_MAX_ATTEMPTS', 3))
+JOURNAL_REPLAY_INTERVAL = int(os.getenv('JOURNAL_REPLAY_INTERVAL', 60))
+# 진행 중인 작업의 저널 갱신 주기 (JOURNAL_STALE_SECONDS보다 충분히 짧아야 다른 레플리카가 가져가지 않음)
+JOURNAL_HEARTBEAT_INTERVAL = int(os.getenv('JOURNAL_HEARTBEAT_INTERVAL', 60))
+
+# 분산 추적 설정
+TRACING_ENABLED = os.getenv('TRACING_ENABLED') == 'true'
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', 0.01))
+TRACE_SLOW_MS = float(os.getenv('TRACE_SLOW_MS', 30000))
+TRACE_SINK = os.getenv('TRACE_SINK', 'file')
+TRACE_FILE_PATH = os.getenv('TRACE_FILE_PATH', 'data/traces.jsonl')
+TRACE_EXPORT_BATCH_SIZE = int(os.getenv('TRACE_EXPORT_BATCH_SIZE', 512))
+TRACE_EXPORT_INTERVAL = float(os.getenv('TRACE_EXPORT_INTERVAL', 5))
+
+# 업데이트 동시 처리 수
+UPDATE_CONCURRENCY = int(os.getenv('UPDATE_CONCURRENCY', 256))
+
+# 텔레그램 HTTP 전송 설정 (봇 API 호출과 getUpdates 롱폴링은 연결 풀을 따로 사용)
+TELEGRAM_POOL_SIZE = int(os.getenv('TELEGRAM_POOL_SIZE', 32))  # 봇 API 호출 동시 연결 수 (httpx 풀은 연결 수에 비례해 느려짐)
+TELEGRAM_POOL_TIMEOUT = float(os.getenv('TELEGRAM_POOL_TIMEOUT', 10))  # 빈 연결 대기 한도 (초)
+TELEGRAM_CONNECT_TIMEOUT = float(os.getenv('TELEGRAM_CONNECT_TIMEOUT', 5))
+TELEGRAM_READ_TIMEOUT = float(os.getenv('TELEGRAM_READ_TIMEOUT', 10))
+TELEGRAM_WRITE_TIMEOUT = float(os.getenv('TELEGRAM_WRITE_TIMEOUT', 10))
+TELEGRAM_KEEPALIVE_EXPIRY = float(os.getenv('TELEGRAM_KEEPALIVE_EXPIRY', 60))  # 유휴 연결 유지 시간 (초)
+TELEGRAM_HTTP_VERSION = os.getenv('TELEGRAM_HTTP_VERSION', 'auto')  # 'auto'(h2 설치 시 HTTP/2) | '1.1' | '2'
+TELEGRAM_POLL_TIMEOUT = int(os.getenv('TELEGRAM_POLL_TIMEOUT', 30))  # getUpdates 롱폴링 대기 (초)
+
+# 인라인 질의 설정
+TOPIC_INDEX_MAX_ENTRIES = int(os.getenv('TOPIC_INDEX_MAX_ENTRIES', 5000))
+TOPIC_INDEX_DAYS = int(os.getenv('TOPIC_INDEX_DAYS', 90))
+TOPIC_INDEX_REFRESH_INTERVAL = int(os.getenv('TOPIC_INDEX_REFRESH_INTERVAL', 60))
+INLINE_RESULTS_LIMIT = int(os.getenv('INLINE_RESULTS_LIMIT', 10))
+INLINE_CACHE_TIME = int(os.getenv('INLINE_CACHE_TIME', 60))
+
+# DB 연결 풀 / 시작 시 예열 설정
+DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', 4))  # 시작 시 미리 여는 연결 수
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', 20))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))
+WARMUP_TIMEOUT = float(os.getenv('WARMUP_TIMEOUT', 30))
+WEBHOOK_SECRET_TOKEN = os.getenv('WEBHOOK_SECRET_TOKEN')
@@ -5,30 +5,279 @@ PostgreSQL 데이터베이스 연결 및 쿼리 처리
 
 import os
 import json
+import threading
 import psycopg2
-from datetime import datetime
+from datetime import date, datetime
+from psycopg2 import sql
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+from config import DB_POOL_MAX, DB_POOL_MIN, DB_POOL_TIMEOUT, HOT_QUERY_DAYS, PARTITION_MONTHS_AHEAD
+from services.tracing import tracer
 
 # 데이터베이스 URL
 DATABASE_URL = os.getenv('DATABASE_URL')
 
+# 연결 풀 (처음 사용할 때 생성, 가득 차면 반환될 때까지 대기)
+# 반환된 연결은 DB_POOL_MIN개까지만 유휴 상태로 유지되고 나머지는 닫힘
+_pool = None
+_pool_lock = threading.Lock()
+_pool_slots = threading.BoundedSemaphore(DB_POOL_MAX)
+
+def _get_pool() -> ThreadedConnectionPool:
+    """연결 풀 생성/조회"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadedConnectionPool(DB_POOL_MIN, DB_POOL_MAX, DATABASE_URL)
+    return _pool
+
+class _PooledConnection:
+    """풀 연결 래퍼 (close()는 연결을 닫지 않고 풀에 반환)"""
+    __slots__ = ('_conn', '_released')
+
+    def __init__(self, conn):
+        object.__setattr__(self, '_conn', conn)
+        object.__setattr__(self, '_released', False)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+    def close(self) -> None:
+        """풀에 반환 (끊어진 연결은 버림, 진행 중인 트랜잭션은 풀이 롤백)"""
+        if self._released:
+            return
+        object.__setattr__(self, '_released', True)
+        try:
+            _get_pool().putconn(self._conn, close=bool(self._conn.closed))
+        finally:
+            _pool_slots.release()
+
+    def __del__(self):
+        # 예외로 close()를 건너뛴 경우에도 풀 자리를 돌려줌
+        try:
+            self.close()
+        except Exception:
+            pass
+
+def connect():
+    """풀에서 연결 가져오기"""
+    if not _pool_slots.acquire(timeout=DB_POOL_TIMEOUT):
+        raise PoolError("DB 연결 풀 대기 시간 초과")
+    try:
+        return _PooledConnection(_get_pool().getconn())
+    except Exception:
+        _pool_slots.release()
+        raise
+
+def warm_up(connections: int) -> int:
+    """연결을 미리 열고 SELECT 1로 확인한 뒤 풀에 반환 (연 연결 수 반환)"""
+    opened = [connect() for _ in range(connections)]
+    try:
+        for conn in opened:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            conn.commit()
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
+
+def _month_start(value) -> date:
+    """해당 날짜가 속한 달의 1일"""
+    return date(value.year, value.month, 1)
+
+def _add_months(month: date, months: int) -> date:
+    """월 단위 날짜 이동"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+# 월 파티션 범위 밖의 행을 받는 기본 파티션
+DEFAULT_PARTITION = 'analyses_default'
+
+def _partition_name(month: date) -> str:
+    """월별 파티션 테이블 이름"""
+    return f"analyses_p{month:%Y_%m}"
+
+def _create_partition(cur, month: date) -> bool:
+    """해당 월의 파티션 생성 (새로 만들었으면 True, 기본 파티션에 들어간 그 달의 행은 옮김)"""
+    month = _month_start(month)
+    name = _partition_name(month)
+    bounds = (month, _add_months(month, 1))
+    cur.execute("SELECT to_regclass(%s), to_regclass(%s)", (name, DEFAULT_PARTITION))
+    existing, default = cur.fetchone()
+    if existing is not None:
+        return False
+    
+    # 기본 파티션에 같은 달 행이 남아 있으면 파티션 생성이 실패하므로 임시 테이블로 뺐다가 다시 저장
+    if default is not None:
+        cur.execute("CREATE TEMP TABLE analyses_moved (LIKE analyses) ON COMMIT DROP")
+        cur.execute(
+            sql.SQL(
+                "WITH moved AS (DELETE FROM {} WHERE created_at >= %s AND created_at < %s RETURNING *) "
+                "INSERT INTO analyses_moved SELECT * FROM moved"
+            ).format(sql.Identifier(DEFAULT_PARTITION)),
+            bounds
+        )
+    cur.execute(
+        sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF analyses FOR VALUES FROM (%s) TO (%s)").format(
+            sql.Identifier(name)
+        ),
+        bounds
+    )
+    if default is not None:
+        cur.execute("INSERT INTO analyses SELECT * FROM analyses_moved")
+        cur.execute("DROP TABLE analyses_moved")
+    return True
+
+def _ensure_partitions(cur, months_ahead: int) -> None:
+    """이번 달부터 months_ahead개월 뒤까지 파티션 생성"""
+    current = _month_start(datetime.now())
+    for offset in range(months_ahead + 1):
+        _create_partition(cur, _add_months(current, offset))
+
+def _migrate_to_partitioned(cur) -> bool:
+    """기존 단일 analyses 테이블을 파티션 전환용으로 이름 변경"""
+    cur.execute("SELECT relkind FROM pg_class WHERE relname = 'analyses' AND relkind IN ('r', 'p')")
+    row = cur.fetchone()
+    if not row or row[0] != 'r':
+        return False
+    
+    cur.execute("ALTER TABLE analyses ADD COLUMN IF NOT EXISTS latency_ms INTEGER")
+    cur.execute("ALTER TABLE analyses RENAME TO analyses_legacy")
+    cur.execute("ALTER TABLE analyses_legacy RENAME CONSTRAINT analyses_pkey TO analyses_legacy_pkey")
+    # 기존 id 시퀀스는 새 파티션 테이블이 이어서 사용
+    cur.execute("ALTER SEQUENCE analyses_id_seq OWNED BY NONE")
+    return True
+
+def _copy_legacy_rows(cur) -> None:
+    """이름 변경된 기존 테이블의 행을 파티션 테이블로 복사 후 삭제"""
+    cur.execute(
+        "SELECT DISTINCT date_trunc('month', COALESCE(created_at, CURRENT_TIMESTAMP)) FROM analyses_legacy"
+    )
+    for (month,) in cur.fetchall():
+        _create_partition(cur, month)
+    
+    cur.execute("""
+        INSERT INTO analyses (id, telegram_id, input_data, result, created_at, latency_ms)
+        SELECT id, telegram_id, input_data, result, COALESCE(created_at, CURRENT_TIMESTAMP), latency_ms
+        FROM analyses_legacy
+    """)
+    cur.execute("DROP TABLE analyses_legacy")
+
 def init_db():
     """데이터베이스 테이블 생성"""
     try:
-        conn = psycopg2.connect(DATABASE_URL)
+        conn = connect()
         cur = conn.cursor()
         
-        # analyses 테이블 생성
+        # 기존 단일 테이블이면 파티션 테이블로 전환
+        migrating = _migrate_to_partitioned(cur)
+        
+        # analyses 테이블 생성 (created_at 기준 월별 파티션)
+        cur.execute("CREATE SEQUENCE IF NOT EXISTS analyses_id_seq")
         cur.execute("""
             CREATE TABLE IF NOT EXISTS analyses (
-                id SERIAL PRIMARY KEY,
+                id INTEGER NOT NULL DEFAULT nextval('analyses_id_seq'),
                 telegram_id TEXT,
                 input_data JSONB,
                 result JSONB,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                latency_ms INTEGER,
+                PRIMARY KEY (id, created_at)
+            ) PARTITION BY RANGE (created_at)
+        """)
+        cur.execute("ALTER SEQUENCE analyses_id_seq OWNED BY analyses.id")
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS analyses_telegram_id_created_at_idx
+            ON analyses (telegram_id, created_at DESC)
+        """)
+        # 프롬프트 변형 실험 지표 (토큰 수는 실제로 LLM을 호출한 행에만 기록)
+        cur.execute("ALTER TABLE analyses ADD COLUMN IF NOT EXISTS prompt_variant TEXT")
+        cur.execute("ALTER TABLE analyses ADD COLUMN IF NOT EXISTS input_tokens INTEGER")
+        cur.execute("ALTER TABLE analyses ADD COLUMN IF NOT EXISTS output_tokens INTEGER")
+        cur.execute("ALTER TABLE analyses ADD COLUMN IF NOT EXISTS parse_ok BOOLEAN")
+        # 부하 분산 시 같은 답변 조합의 저장된 결과를 찾기 위한 요청 키
+        cur.execute("ALTER TABLE analyses ADD COLUMN IF NOT EXISTS request_key TEXT")
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS analyses_request_key_created_at_idx
+            ON analyses (request_key, created_at DESC)
+        """)
+        _ensure_partitions(cur, PARTITION_MONTHS_AHEAD)
+        # 파티션 관리가 밀려 해당 월 파티션이 없어도 저장이 실패하지 않도록 기본 파티션 생성
+        cur.execute(
+            sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF analyses DEFAULT").format(
+                sql.Identifier(DEFAULT_PARTITION)
+            )
+        )
+        
+        if migrating:
+            _copy_legacy_rows(cur)
+        
+        # 일별 사용량 집계 테이블 (워터마크 이후 행만 증분 반영)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS analysis_daily_rollup (
+                day DATE NOT NULL,
+                content_category TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                hook_point TEXT NOT NULL,
+                request_count INTEGER NOT NULL DEFAULT 0,
+                latency_ms_sum BIGINT NOT NULL DEFAULT 0,
+                latency_ms_max INTEGER NOT NULL DEFAULT 0,
+                latency_samples INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, content_category, platform, hook_point)
+            )
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS rollup_watermarks (
+                name TEXT PRIMARY KEY,
+                last_id BIGINT NOT NULL DEFAULT 0
+            )
+        """)
+        # 최근 파티션만 스캔하도록 마지막 처리 시각도 기록
+        cur.execute("ALTER TABLE rollup_watermarks ADD COLUMN IF NOT EXISTS last_created_at TIMESTAMP")
+        
+        # 진행 중인 분석 작업 저널 (배포/재시작 후 이어서 실행)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS analysis_journal (
+                job_id TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'running',
+                request_key TEXT NOT NULL,
+                chat_id BIGINT NOT NULL,
+                telegram_id TEXT NOT NULL,
+                input_data JSONB NOT NULL,
+                stage1 TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # 레플리카 간 요청 병합 결과 테이블
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS shared_results (
+                request_key TEXT PRIMARY KEY,
+                result JSONB,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
         
+        # 사용자별 요청 한도 테이블 (토큰 버킷 + 일일 한도)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS user_quotas (
+                telegram_id TEXT PRIMARY KEY,
+                tokens DOUBLE PRECISION NOT NULL,
+                refilled_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                daily_count INTEGER NOT NULL DEFAULT 0,
+                quota_date DATE NOT NULL DEFAULT CURRENT_DATE
+            )
+        """)
+        
         conn.commit()
         cur.close()
         conn.close()
@@ -36,40 +285,529 @@ def init_db():
     except Exception as e:
         print(f"데이터베이스 초기화 실패 (무시하고 계속 진행): {e}")
 
-def save_analysis(telegram_id: str, input_data: dict, result: dict):
-    """분석 결과 저장"""
+def save_analysis(telegram_id: str, input_data: dict, result: dict, latency_ms: int = None, experiment: dict = None,
+                  request_key: str = None):
+    """분석 결과 저장 (저장된 id 반환, 실패 시 None)"""
+    with tracer.span('db.save_analysis') as span:
+        analysis_id = _save_analysis(telegram_id, input_data, result, latency_ms, experiment or {}, request_key)
+        if analysis_id is None:
+            span.set_error('save failed')
+        return analysis_id
+
+def _save_analysis(telegram_id: str, input_data: dict, result: dict, latency_ms: int, experiment: dict, request_key: str):
+    """분석 결과 INSERT (experiment: prompt_variant, input_tokens, output_tokens, parse_ok)"""
     try:
-        conn = psycopg2.connect(DATABASE_URL)
+        conn = connect()
         cur = conn.cursor()
         
         cur.execute(
             """
-            INSERT INTO analyses (telegram_id, input_data, result)
-            VALUES (%s, %s, %s)
+            INSERT INTO analyses
+                (telegram_id, input_data, result, latency_ms, prompt_variant, input_tokens, output_tokens, parse_ok,
+                 request_key)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING id
             """,
-            (str(telegram_id), json.dumps(input_data), json.dumps(result))
+            (
+                str(telegram_id), json.dumps(input_data), json.dumps(result), latency_ms,
+                experiment.get('prompt_variant'), experiment.get('input_tokens'),
+                experiment.get('output_tokens'), experiment.get('parse_ok'), request_key
+            )
         )
+        analysis_id = cur.fetchone()[0]
         
         conn.commit()
         cur.close()
         conn.close()
         print("분석 결과 저장 성공")
+        return analysis_id
     except Exception as e:
         print(f"분석 결과 저장 실패 (무시하고 계속 진행): {e}")
+        return None
 
-def get_user_analyses(telegram_id: str, limit: int = 5):
-    """사용자의 최근 분석 결과 조회"""
-    conn = psycopg2.connect(DATABASE_URL)
+def find_analysis_by_request(request_key: str, days: int = HOT_QUERY_DAYS):
+    """같은 답변 조합(요청 키)으로 저장된 가장 최근 분석 결과 조회 (최근 파티션만 조회)"""
+    try:
+        conn = connect()
+        cur = conn.cursor()
+        
+        cur.execute(
+            """
+            SELECT result FROM analyses
+            WHERE request_key = %s
+              AND parse_ok IS NOT FALSE
+              AND created_at > CURRENT_TIMESTAMP - make_interval(days => %s)
+            ORDER BY created_at DESC
+            LIMIT 1
+            """,
+            (request_key, days)
+        )
+        row = cur.fetchone()
+        
+        cur.close()
+        conn.close()
+        return row[0] if row else None
+    except Exception as e:
+        print(f"저장된 분석 결과 조회 실패: {e}")
+        return None
+
+def get_user_analyses(telegram_id: str, limit: int = 5, days: int = HOT_QUERY_DAYS):
+    """사용자의 최근 분석 결과 조회 (최근 파티션만 조회)"""
+    conn = connect()
     cur = conn.cursor(cursor_factory=RealDictCursor)
     
     cur.execute(
         """
         SELECT * FROM analyses 
         WHERE telegram_id = %s 
+          AND created_at > CURRENT_TIMESTAMP - make_interval(days => %s)
         ORDER BY created_at DESC 
         LIMIT %s
         """,
-        (str(telegram_id), limit)
+        (str(telegram_id), days, limit)
+    )
+    
+    results = cur.fetchall()
+    
+    cur.close()
+    conn.close()
+    
+    return results
+
+def open_lock_connection():
+    """advisory lock 전용 연결 생성 (세션 단위 잠금이므로 풀을 쓰지 않음)"""
+    conn = psycopg2.connect(DATABASE_URL)
+    conn.autocommit = True
+    return conn
+
+def try_advisory_lock(conn, lock_key: str) -> bool:
+    """advisory lock 획득 시도 (대기하지 않음)"""
+    cur = conn.cursor()
+    cur.execute("SELECT pg_try_advisory_lock(hashtext(%s))", (lock_key,))
+    acquired = cur.fetchone()[0]
+    cur.close()
+    return acquired
+
+def close_lock_connection(conn, lock_key: str = None):
+    """advisory lock 해제 후 연결 종료"""
+    try:
+        if lock_key is not None:
+            cur = conn.cursor()
+            cur.execute("SELECT pg_advisory_unlock(hashtext(%s))", (lock_key,))
+            cur.close()
+    finally:
+        conn.close()
+
+def find_shared_result(request_key: str, max_age_seconds: float):
+    """다른 레플리카가 최근 max_age_seconds초 안에 저장한 병합 결과 조회"""
+    try:
+        conn = connect()
+        cur = conn.cursor()
+        
+        cur.execute(
+            """
+            SELECT result FROM shared_results
+            WHERE request_key = %s
+              AND created_at > CURRENT_TIMESTAMP - make_interval(secs => %s)
+            """,
+            (request_key, max_age_seconds)
+        )
+        
+        row = cur.fetchone()
+        
+        cur.close()
+        conn.close()
+        return row[0] if row else None
+    except Exception as e:
+        print(f"병합 결과 조회 실패 (무시하고 계속 진행): {e}")
+        return None
+
+def save_shared_result(request_key: str, result: dict, max_age_seconds: float = 3600):
+    """병합 결과 저장 및 대기자가 더 이상 읽지 않는 오래된 결과 정리"""
+    try:
+        conn = connect()
+        cur = conn.cursor()
+        
+        cur.execute(
+            """
+            INSERT INTO shared_results (request_key, result, created_at)
+            VALUES (%s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (request_key)
+            DO UPDATE SET result = EXCLUDED.result, created_at = EXCLUDED.created_at
+            """,
+            (request_key, json.dumps(result))
+        )
+        cur.execute(
+            "DELETE FROM shared_results WHERE created_at < CURRENT_TIMESTAMP - make_interval(secs => %s)",
+            (max_age_seconds,)
+        )
+        
+        conn.commit()
+        cur.close()
+        conn.close()
+    except Exception as e:
+        print(f"병합 결과 저장 실패 (무시하고 계속 진행): {e}")
+
+def consume_quota(telegram_id: str, refill_per_second: float, burst: float, daily_limit: int):
+    """사용자 요청 한도 차감 (허용 여부, 거절 사유) 반환"""
+    try:
+        conn = connect()
+        cur = conn.cursor()
+        
+        cur.execute(
+            """
+            INSERT INTO user_quotas (telegram_id, tokens)
+            VALUES (%s, %s)
+            ON CONFLICT (telegram_id) DO NOTHING
+            """,
+            (str(telegram_id), burst)
+        )
+        # 같은 사용자의 동시 요청은 행 잠금으로 직렬화
+        cur.execute(
+            """
+            SELECT tokens,
+                   EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - refilled_at)),
+                   CASE WHEN quota_date = CURRENT_DATE THEN daily_count ELSE 0 END
+            FROM user_quotas
+            WHERE telegram_id = %s
+            FOR UPDATE
+            """,
+            (str(telegram_id),)
+        )
+        tokens, elapsed, daily_count = cur.fetchone()
+        tokens = min(burst, tokens + float(elapsed) * refill_per_second)
+        
+        if daily_count >= daily_limit:
+            allowed, reason = False, 'daily_quota'
+        elif tokens < 1:
+            allowed, reason = False, 'rate_limited'
+        else:
+            allowed, reason = True, None
+            tokens -= 1
+            daily_count += 1
+        
+        cur.execute(
+            """
+            UPDATE user_quotas
+            SET tokens = %s, refilled_at = CURRENT_TIMESTAMP,
+                daily_count = %s, quota_date = CURRENT_DATE
+            WHERE telegram_id = %s
+            """,
+            (tokens, daily_count, str(telegram_id))
+        )
+        
+        conn.commit()
+        cur.close()
+        conn.close()
+        return allowed, reason
+    except Exception as e:
+        print(f"요청 한도 확인 실패 (무시하고 계속 진행): {e}")
+        return True, None
+
+def refresh_rollups(batch_size: int = 5000, lag_seconds: int = 60) -> int:
+    """워터마크 이후 새로 저장된 분석만 일별 집계 테이블에 반영"""
+    conn = connect()
+    cur = conn.cursor()
+    processed = 0
+    
+    try:
+        while True:
+            cur.execute(
+                """
+                INSERT INTO rollup_watermarks (name, last_id) VALUES ('analysis_daily', 0)
+                ON CONFLICT (name) DO NOTHING
+                """
+            )
+            # 여러 레플리카가 동시에 실행해도 중복 집계되지 않도록 잠금
+            cur.execute(
+                "SELECT last_id, last_created_at FROM rollup_watermarks WHERE name = 'analysis_daily' FOR UPDATE"
+            )
+            watermark, watermark_at = cur.fetchone()
+            
+            # 커밋이 늦는 행을 놓치지 않도록 lag_seconds 이전 행만 처리
+            # (첫 실행처럼 처리 시각이 없으면 created_at 하한 없이 전체 파티션 조회)
+            since_clause = "AND created_at >= %(watermark_at)s - interval '1 hour'" if watermark_at is not None else ""
+            cur.execute(
+                f"""
+                WITH batch AS (
+                    SELECT id, created_at, input_data, latency_ms
+                    FROM analyses
+                    WHERE id > %(watermark)s
+                      {since_clause}
+                      AND created_at < CURRENT_TIMESTAMP - make_interval(secs => %(lag)s)
+                    ORDER BY id
+                    LIMIT %(limit)s
+                ), upsert AS (
+                    INSERT INTO analysis_daily_rollup AS r (
+                        day, content_category, platform, hook_point,
+                        request_count, latency_ms_sum, latency_ms_max, latency_samples
+                    )
+                    SELECT created_at::date,
+                           COALESCE(input_data->>'content_category', ''),
+                           COALESCE(input_data->>'platform', ''),
+                           COALESCE(input_data->>'hook_point', ''),
+                           COUNT(*),
+                           COALESCE(SUM(latency_ms), 0),
+                           COALESCE(MAX(latency_ms), 0),
+                           COUNT(latency_ms)
+                    FROM batch
+                    GROUP BY 1, 2, 3, 4
+                    ON CONFLICT (day, content_category, platform, hook_point) DO UPDATE SET
+                        request_count = r.request_count + EXCLUDED.request_count,
+                        latency_ms_sum = r.latency_ms_sum + EXCLUDED.latency_ms_sum,
+                        latency_ms_max = GREATEST(r.latency_ms_max, EXCLUDED.latency_ms_max),
+                        latency_samples = r.latency_samples + EXCLUDED.latency_samples
+                )
+                SELECT MAX(id), MAX(created_at), COUNT(*) FROM batch
+                """,
+                {'watermark': watermark, 'watermark_at': watermark_at, 'lag': lag_seconds, 'limit': batch_size}
+            )
+            last_id, last_created_at, count = cur.fetchone()
+            
+            if count:
+                cur.execute(
+                    """
+                    UPDATE rollup_watermarks SET last_id = %s, last_created_at = %s
+                    WHERE name = 'analysis_daily'
+                    """,
+                    (last_id, last_created_at)
+                )
+            conn.commit()
+            processed += count
+            
+            if count < batch_size:
+                return processed
+    finally:
+        cur.close()
+        conn.close()
+
+def get_rollup_stats(days: int = 7) -> dict:
+    """일별 집계 테이블에서 사용량 통계 조회"""
+    conn = connect()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    stats = {}
+    
+    # 차원별 요청 수
+    for dimension in ('content_category', 'platform', 'hook_point'):
+        cur.execute(
+            f"""
+            SELECT {dimension} AS label, SUM(request_count) AS requests
+            FROM analysis_daily_rollup
+            WHERE day > CURRENT_DATE - %s
+            GROUP BY {dimension}
+            ORDER BY requests DESC
+            LIMIT 10
+            """,
+            (days,)
+        )
+        stats[dimension] = cur.fetchall()
+    
+    # 일별 요청 수 및 소요 시간
+    cur.execute(
+        """
+        SELECT day,
+               SUM(request_count) AS requests,
+               SUM(latency_ms_sum) / NULLIF(SUM(latency_samples), 0) AS avg_latency_ms,
+               MAX(latency_ms_max) AS max_latency_ms
+        FROM analysis_daily_rollup
+        WHERE day > CURRENT_DATE - %s
+        GROUP BY day
+        ORDER BY day DESC
+        """,
+        (days,)
+    )
+    stats['daily'] = cur.fetchall()
+    
+    cur.close()
+    conn.close()
+    
+    return stats
+
+def get_variant_stats(days: int = 7) -> list:
+    """프롬프트 변형별 소요 시간, 토큰 수, 파싱 성공률 조회"""
+    conn = connect()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    
+    cur.execute(
+        """
+        SELECT prompt_variant AS variant,
+               COUNT(*) AS requests,
+               AVG(latency_ms) AS avg_latency_ms,
+               percentile_cont(0.95) WITHIN GROUP (ORDER BY latency_ms) AS p95_latency_ms,
+               COUNT(input_tokens) AS llm_runs,
+               AVG(input_tokens) AS avg_input_tokens,
+               AVG(output_tokens) AS avg_output_tokens,
+               AVG(parse_ok::int) AS parse_ok_rate
+        FROM analyses
+        WHERE created_at > CURRENT_TIMESTAMP - make_interval(days => %s)
+          AND prompt_variant IS NOT NULL
+        GROUP BY prompt_variant
+        ORDER BY prompt_variant
+        """,
+        (days,)
+    )
+    stats = cur.fetchall()
+    
+    cur.close()
+    conn.close()
+    
+    return stats
+
+def get_recent_inputs(limit: int = 100, days: int = HOT_QUERY_DAYS) -> list:
+    """최근 분석 입력(답변 조합) 조회 (같은 조합은 한 번만, 오프라인 재실행용)"""
+    conn = connect()
+    cur = conn.cursor()
+    
+    cur.execute(
+        """
+        SELECT input_data FROM (
+            SELECT DISTINCT ON (input_data) input_data, created_at
+            FROM analyses
+            WHERE created_at > CURRENT_TIMESTAMP - make_interval(days => %s)
+            ORDER BY input_data, created_at DESC
+        ) recent
+        ORDER BY created_at DESC
+        LIMIT %s
+        """,
+        (days, limit)
+    )
+    inputs = [row[0] for row in cur.fetchall()]
+    
+    cur.close()
+    conn.close()
+    
+    return inputs
+
+def ensure_partitions(months_ahead: int = PARTITION_MONTHS_AHEAD):
+    """앞으로 사용할 월별 파티션 미리 생성"""
+    conn = connect()
+    cur = conn.cursor()
+    
+    _ensure_partitions(cur, months_ahead)
+    
+    conn.commit()
+    cur.close()
+    conn.close()
+
+# 보관 파일에서 복원하며 새로 만든 파티션 표시 (보관 기간이 지나도 자동 보관/삭제하지 않음)
+RESTORED_PARTITION_COMMENT = 'restored'
+
+def list_partitions() -> list:
+    """analyses의 월별 파티션 목록 (이름, 시작 월, 복원 여부) 조회"""
+    conn = connect()
+    cur = conn.cursor()
+    
+    cur.execute(
+        """
+        SELECT child.relname, obj_description(child.oid, 'pg_class') = %s
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = 'analyses'
+        ORDER BY child.relname
+        """,
+        (RESTORED_PARTITION_COMMENT,)
+    )
+    rows = cur.fetchall()
+    
+    cur.close()
+    conn.close()
+    
+    partitions = []
+    for name, restored in rows:
+        try:
+            month = datetime.strptime(name, 'analyses_p%Y_%m').date()
+        except ValueError:
+            continue
+        partitions.append((name, month, bool(restored)))
+    return partitions
+
+def release_partition(partition: str):
+    """복원 표시 해제 (다음 파티션 관리 때 보관 기간이 지났으면 다시 보관 후 삭제)"""
+    conn = connect()
+    cur = conn.cursor()
+    
+    cur.execute(sql.SQL("COMMENT ON TABLE {} IS NULL").format(sql.Identifier(partition)))
+    
+    conn.commit()
+    cur.close()
+    conn.close()
+
+def iter_partition_rows(partition: str, batch_size: int = 2000):
+    """서버 측 커서로 파티션의 행을 JSON 문자열로 하나씩 반환"""
+    conn = connect()
+    # 이름 있는 커서는 서버 측 커서이므로 메모리 사용량이 일정
+    cur = conn.cursor(name=f"export_{partition}")
+    cur.itersize = batch_size
+    
+    try:
+        cur.execute(
+            sql.SQL("SELECT row_to_json(t)::text FROM {} t ORDER BY id").format(sql.Identifier(partition))
+        )
+        for (line,) in cur:
+            yield line
+    finally:
+        cur.close()
+        conn.close()
+
+def drop_partition(partition: str):
+    """파티션 분리 후 삭제"""
+    conn = connect()
+    cur = conn.cursor()
+    
+    cur.execute(sql.SQL("ALTER TABLE analyses DETACH PARTITION {}").format(sql.Identifier(partition)))
+    cur.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(partition)))
+    
+    conn.commit()
+    cur.close()
+    conn.close()
+
+def insert_archived_rows(lines: list) -> int:
+    """보관 파일의 JSON 행을 analyses에 다시 저장 (새로 만든 파티션은 복원 파티션으로 표시)"""
+    months = {_month_start(datetime.fromisoformat(json.loads(line)['created_at'])) for line in lines}
+    
+    conn = connect()
+    cur = conn.cursor()
+    
+    for month in months:
+        if _create_partition(cur, month):
+            cur.execute(
+                sql.SQL("COMMENT ON TABLE {} IS %s").format(sql.Identifier(_partition_name(month))),
+                (RESTORED_PARTITION_COMMENT,)
+            )
+    cur.execute(
+        """
+        INSERT INTO analyses
+        SELECT * FROM json_populate_recordset(NULL::analyses, %s::json)
+        ON CONFLICT DO NOTHING
+        """,
+        ('[' + ','.join(lines) + ']',)
+    )
+    inserted = cur.rowcount
+    
+    conn.commit()
+    cur.close()
+    conn.close()
+    return inserted
+
+def get_analyses_since(last_id: int, since_created_at=None, limit: int = 1000) -> list:
+    """워터마크 이후 저장된 분석 결과 조회 (증분 처리용)"""
+    conn = connect()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    
+    # created_at 조건으로 최근 파티션만 스캔 (처리 시각이 없으면 하한 없이 조회)
+    params = {'last_id': last_id, 'since': since_created_at, 'limit': limit}
+    since_clause = "AND created_at >= %(since)s - interval '1 hour'" if since_created_at is not None else ""
+    cur.execute(
+        f"""
+        SELECT id, created_at, input_data, result
+        FROM analyses
+        WHERE id > %(last_id)s
+          {since_clause}
+        ORDER BY id
+        LIMIT %(limit)s
+        """,
+        params
     )
     
     results = cur.fetchall()
@@ -78,3 +816,164 @@ def get_user_analyses(telegram_id: str, limit: int = 5):
     conn.close()
     
     return results
+
+def get_analysis_result(analysis_id: int, days: int = HOT_QUERY_DAYS):
+    """id로 분석 결과 조회 (최근 파티션만 조회)"""
+    try:
+        conn = connect()
+        cur = conn.cursor()
+        
+        cur.execute(
+            """
+            SELECT result FROM analyses
+            WHERE id = %s
+              AND created_at > CURRENT_TIMESTAMP - make_interval(days => %s)
+            """,
+            (analysis_id, days)
+        )
+        row = cur.fetchone()
+        
+        cur.close()
+        conn.close()
+        return row[0] if row else None
+    except Exception as e:
+        print(f"분석 결과 조회 실패: {e}")
+        return None
+
+def upsert_journal_entry(job_id: str, owner: str, status: str, request_key: str, chat_id: int,
+                         telegram_id: str, input_data: dict, stage1: str = None):
+    """작업 저널 기록 (이미 있으면 상태/1단계 결과 갱신)"""
+    try:
+        conn = connect()
+        cur = conn.cursor()
+        
+        cur.execute(
+            """
+            INSERT INTO analysis_journal
+                (job_id, owner, status, request_key, chat_id, telegram_id, input_data, stage1)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (job_id) DO UPDATE SET
+                owner = EXCLUDED.owner,
+                status = EXCLUDED.status,
+                stage1 = COALESCE(EXCLUDED.stage1, analysis_journal.stage1),
+                updated_at = CURRENT_TIMESTAMP
+            """,
+            (job_id, owner, status, request_key, chat_id, str(telegram_id), json.dumps(input_data), stage1)
+        )
+        
+        conn.commit()
+        cur.close()
+        conn.close()
+    except Exception as e:
+        print(f"작업 저널 기록 실패 (무시하고 계속 진행): {e}")
+
+def update_journal_stage1(coalesce_key: str, owner: str, stage1: str):
+    """같은 병합 키(프롬프트 변형 포함)로 진행 중인 작업들의 1단계 결과 기록"""
+    try:
+        conn = connect()
+        cur = conn.cursor()
+        
+        cur.execute(
+            """
+            UPDATE analysis_journal
+            SET stage1 = %s, updated_at = CURRENT_TIMESTAMP
+            WHERE request_key = %s AND owner = %s
+            """,
+            (stage1, coalesce_key, owner)
+        )
+        
+        conn.commit()
+        cur.close()
+        conn.close()
+    except Exception as e:
+        print(f"작업 저널 갱신 실패 (무시하고 계속 진행): {e}")
+
+def delete_journal_entry(job_id: str):
+    """완료된 작업 저널 삭제"""
+    try:
+        conn = connect()
+        cur = conn.cursor()
+        
+        cur.execute("DELETE FROM analysis_journal WHERE job_id = %s", (job_id,))
+        
+        conn.commit()
+        cur.close()
+        conn.close()
+    except Exception as e:
+        print(f"작업 저널 삭제 실패 (무시하고 계속 진행): {e}")
+
+def touch_journal_entries(owner: str, job_ids: list):
+    """진행 중인 작업의 저널 갱신 시각을 현재로 변경 (오래된 작업으로 오인되어 재실행되지 않도록)"""
+    if not job_ids:
+        return
+    try:
+        conn = connect()
+        cur = conn.cursor()
+        
+        cur.execute(
+            """
+            UPDATE analysis_journal
+            SET updated_at = CURRENT_TIMESTAMP
+            WHERE owner = %s AND job_id = ANY(%s)
+            """,
+            (owner, list(job_ids))
+        )
+        
+        conn.commit()
+        cur.close()
+        conn.close()
+    except Exception as e:
+        print(f"작업 저널 갱신 실패 (무시하고 계속 진행): {e}")
+
+def get_abandoned_journal_entries(stale_seconds: int, max_attempts: int, limit: int = 50) -> list:
+    """재시도 한도를 넘긴 뒤 다시 중단된 작업 조회 (사용자에게 알린 뒤 삭제)"""
+    conn = connect()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    
+    cur.execute(
+        """
+        SELECT job_id, chat_id FROM analysis_journal
+        WHERE attempts >= %s
+          AND (status = 'suspended' OR updated_at < CURRENT_TIMESTAMP - make_interval(secs => %s))
+        ORDER BY created_at
+        LIMIT %s
+        """,
+        (max_attempts, stale_seconds, limit)
+    )
+    entries = cur.fetchall()
+    
+    cur.close()
+    conn.close()
+    
+    return entries
+
+def claim_journal_entries(owner: str, stale_seconds: int, max_attempts: int, limit: int = 50) -> list:
+    """중단된 작업(종료 시 보류됐거나 하트비트가 끊긴 작업)을 가져와 이 인스턴스에 할당"""
+    conn = connect()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    
+    # 여러 레플리카가 동시에 실행해도 한 작업은 한 곳에서만 가져감
+    # (실행 중인 작업은 소유 인스턴스가 주기적으로 updated_at을 갱신하므로 오래된 작업은 소유자가 사라진 것)
+    cur.execute(
+        """
+        UPDATE analysis_journal
+        SET owner = %s, status = 'replaying', attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+        WHERE job_id IN (
+            SELECT job_id FROM analysis_journal
+            WHERE attempts < %s
+              AND (status = 'suspended' OR updated_at < CURRENT_TIMESTAMP - make_interval(secs => %s))
+            ORDER BY created_at
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING job_id, request_key, chat_id, telegram_id, input_data, stage1
+        """,
+        (owner, max_attempts, stale_seconds, limit)
+    )
+    entries = cur.fetchall()
+    
+    conn.commit()
+    cur.close()
+    conn.close()
+    
+    return entries
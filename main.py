@@ -1,9 +1,48 @@
 import os
+import asyncio
+import functools
 import logging
+import signal
 from telegram import Update
-from telegram.ext import Application, CommandHandler, ContextTypes
+from telegram.ext import Application, CommandHandler, ContextTypes, InlineQueryHandler
 from dotenv import load_dotenv
-from bot.conversations import analysis_conversation
+import database
+from bot.conversations import (
+    analysis_conversation,
+    analysis_jobs,
+    langchain_service,
+    resume_journaled_analyses,
+    user_states
+)
+from bot.admin import experiments_command, memory_command, stats_command
+from bot.inline import handle_inline_query
+from bot.messages import ElonStyleMessageFormatter as Elon
+from bot.telemetry import TracingUpdateProcessor
+from bot.transport import build_bot_request, build_updates_request
+from bot.webserver import health, run_webhook
+from config import (
+    DB_POOL_MIN,
+    DRAIN_GRACE_SECONDS,
+    HASHTAG_REFRESH_INTERVAL,
+    JOURNAL_HEARTBEAT_INTERVAL,
+    JOURNAL_REPLAY_INTERVAL,
+    PARTITION_MAINTENANCE_INTERVAL,
+    ROLLUP_INTERVAL,
+    TELEGRAM_POLL_TIMEOUT,
+    TOPIC_INDEX_REFRESH_INTERVAL,
+    UPDATE_CONCURRENCY,
+    WARMUP_TIMEOUT,
+    WEBHOOK_SECRET_TOKEN
+)
+from database import refresh_rollups
+from services import background
+from services.archive import maintain_partitions
+from services.hashtags import hashtag_index
+from services.labels import AGE_OPTIONS, CATEGORY_OPTIONS, HOOK_OPTIONS, INTEREST_OPTIONS, PLATFORM_OPTIONS
+from services.langchain_service import LangChainService, run_in_llm_thread
+from services.llm_backends import BackendPool, LocalBackend
+from services.topic_index import topic_index
+from services.tracing import tracer
 
 # 환경 변수 로드
 load_dotenv()
@@ -20,6 +59,115 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> N
     """에러 핸들러"""
     logger.error("Exception while handling an update:", exc_info=context.error)
 
+async def drain_and_stop(application: Application) -> None:
+    """진행 중인 분석을 마무리(또는 저널에 보존)한 뒤 봇 종료"""
+    # 로드 밸런서가 새 요청을 보내지 않도록 먼저 준비 해제
+    health.ready = False
+    suspended = await analysis_jobs.drain(DRAIN_GRACE_SECONDS)
+    if suspended:
+        logger.info(f"완료하지 못한 분석 {suspended}건을 저널에 보존했습니다.")
+    application.stop_running()
+
+def install_drain_handlers(application: Application) -> None:
+    """종료 신호를 받으면 즉시 끄지 않고 drain_and_stop 실행"""
+    loop = asyncio.get_running_loop()
+
+    def on_signal():
+        if not analysis_jobs.draining:
+            logger.info("종료 신호 수신: 새 분석을 중지하고 진행 중인 분석을 마무리합니다.")
+            loop.create_task(drain_and_stop(application))
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, on_signal)
+        except NotImplementedError:
+            # Windows에서는 기본 KeyboardInterrupt 처리 사용
+            pass
+
+# 자체 점검용 답변 (각 선택지의 첫 항목)
+SELF_CHECK_INPUT = {
+    'content_category': CATEGORY_OPTIONS[0],
+    'content_topic': '자체 점검',
+    'target_age': AGE_OPTIONS[0],
+    'target_interest': INTEREST_OPTIONS[0],
+    'platform': PLATFORM_OPTIONS[0],
+    'hook_point': HOOK_OPTIONS[0]
+}
+
+def warm_llm_backends() -> None:
+    """LLM 백엔드 연결 예열 (실패한 백엔드가 있으면 오류)"""
+    failed = {name: result for name, result in langchain_service.pool.warm_up().items() if result != 'ok'}
+    if failed:
+        raise RuntimeError(', '.join(f"{name}: {result}" for name, result in failed.items()))
+
+def load_hashtag_snapshot() -> None:
+    """해시태그 스냅샷 로드 (이후 새 분석만 수집)"""
+    if hashtag_index.load_snapshot():
+        logger.info(f"해시태그 스냅샷 로드 완료 (last_id={hashtag_index.last_id})")
+
+async def self_check() -> None:
+    """로컬 백엔드로 변형별 프롬프트 구성 → 응답 파싱 → 메시지 렌더링 경로 점검 (실제 LLM 호출 없음)"""
+    probe = LangChainService(pool=BackendPool([LocalBackend()]), experiment=langchain_service.experiment)
+    for variant_id in probe.experiment.variants:
+        result = await probe.generate_content_ideas(SELF_CHECK_INPUT, variant_id=variant_id)
+        if not result or not result['parse_ok']:
+            raise RuntimeError(f"분석 결과 파싱 실패 ({variant_id})")
+        Elon.format_analysis_result(result)
+
+async def warm_up(application: Application) -> dict:
+    """첫 사용자가 오기 전에 연결/캐시를 준비하고 자체 점검 (항목 -> 'ok' 또는 오류)"""
+    steps = {
+        'database': asyncio.to_thread(database.warm_up, DB_POOL_MIN),
+        'llm': run_in_llm_thread(warm_llm_backends),
+        'telegram': application.bot.get_me(),
+        'hashtags': asyncio.to_thread(load_hashtag_snapshot),
+        'topic_index': asyncio.to_thread(topic_index.mine),
+        'self_check': self_check()
+    }
+    results = await asyncio.gather(
+        *(asyncio.wait_for(step, WARMUP_TIMEOUT) for step in steps.values()),
+        return_exceptions=True
+    )
+    checks = {}
+    for name, result in zip(steps, results):
+        if isinstance(result, BaseException):
+            checks[name] = f"{type(result).__name__}: {result}"
+            logger.warning(f"예열 단계 실패 ({name}): {checks[name]}")
+        else:
+            checks[name] = 'ok'
+    return checks
+
+async def post_init(application: Application) -> None:
+    """봇 시작 후 예열/자체 점검 및 주기 작업 등록"""
+    install_drain_handlers(application)
+    
+    # 연결/캐시/인덱스 예열 및 자체 점검 (웹훅 모드에서는 통과해야 웹훅 등록)
+    health.checks = await warm_up(application)
+    logger.info(f"예열 완료: {health.checks}")
+    
+    background.schedule_periodic('hashtags', hashtag_index.refresh, HASHTAG_REFRESH_INTERVAL)
+    background.schedule_periodic('user_states', user_states.sweep, 60)
+    
+    # 인라인 질의용 주제 인덱스 (예열에서 최근 분석을 적재했으므로 이후 새 분석만 수집)
+    background.schedule_periodic(
+        'topic_index', topic_index.mine, TOPIC_INDEX_REFRESH_INTERVAL, initial_delay=TOPIC_INDEX_REFRESH_INTERVAL
+    )
+    
+    # 이전 배포에서 중단된 분석을 이어서 실행
+    background.schedule_periodic(
+        'journal_replay',
+        functools.partial(resume_journaled_analyses, application),
+        JOURNAL_REPLAY_INTERVAL
+    )
+    background.schedule_periodic('journal_heartbeat', analysis_jobs.heartbeat, JOURNAL_HEARTBEAT_INTERVAL)
+    background.schedule_periodic('rollups', refresh_rollups, ROLLUP_INTERVAL, initial_delay=10)
+    background.schedule_periodic('partitions', maintain_partitions, PARTITION_MAINTENANCE_INTERVAL, initial_delay=60)
+
+async def post_shutdown(application: Application) -> None:
+    """봇 종료 시 주기 작업 중지 및 남은 트레이스 내보내기"""
+    await background.stop_all()
+    tracer.shutdown()
+
 def main():
     """봇 실행"""
     # 토큰 확인
@@ -27,12 +175,31 @@ def main():
     if not token:
         raise ValueError("TELEGRAM_TOKEN이 설정되지 않았습니다.")
     
-    # 봇 생성
-    application = Application.builder().token(token).build()
+    # 봇 생성 (분석 대기 중에도 다른 업데이트를 처리하도록 동시 처리 활성화,
+    # 업데이트 처리와 Bot API 호출은 트레이스로 기록,
+    # 메시지 전송이 롱폴링 뒤에 밀리지 않도록 getUpdates는 별도 연결 풀 사용)
+    application = (
+        Application.builder()
+        .token(token)
+        .concurrent_updates(TracingUpdateProcessor(UPDATE_CONCURRENCY))
+        .request(build_bot_request())
+        .get_updates_request(build_updates_request())
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
     
     # 대화 핸들러 등록
     application.add_handler(analysis_conversation)
     
+    # 관리자 명령어 등록
+    application.add_handler(CommandHandler("stats", stats_command))
+    application.add_handler(CommandHandler("experiments", experiments_command))
+    application.add_handler(CommandHandler("memory", memory_command))
+    
+    # 인라인 질의 핸들러 등록 (BotFather에서 /setinline 필요)
+    application.add_handler(InlineQueryHandler(handle_inline_query))
+    
     # 에러 핸들러 등록
     application.add_error_handler(error_handler)
     
@@ -46,17 +213,22 @@ def main():
         if not webhook_url:
             webhook_url = f"https://{os.getenv('RENDER_EXTERNAL_HOSTNAME')}.onrender.com"
         
-        # 웹훅 모드로 실행
-        application.run_webhook(
+        # 웹훅 모드로 실행 (같은 포트에서 /healthz, /readyz 제공, 준비된 뒤에 웹훅 등록)
+        run_webhook(
+            application,
             listen="0.0.0.0",
             port=port,
             webhook_url=webhook_url,
-            allowed_updates=Update.ALL_TYPES
+            secret_token=WEBHOOK_SECRET_TOKEN
         )
         logger.info(f"봇이 웹훅 모드로 시작되었습니다. (포트: {port})")
     else:
         # 로컬 개발 환경
-        application.run_polling(allowed_updates=Update.ALL_TYPES)
+        application.run_polling(
+            allowed_updates=Update.ALL_TYPES,
+            timeout=TELEGRAM_POLL_TIMEOUT,
+            stop_signals=None  # 종료 신호는 install_drain_handlers에서 처리
+        )
         logger.info("봇이 폴링 모드로 시작되었습니다.")
 
 if __name__ == '__main__':
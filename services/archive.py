@@ -0,0 +1,119 @@
+"""
+분석 데이터 보관 모듈
+
+이 모듈은 보관 기간이 지난 analyses 월별 파티션을 gzip 압축 JSONL 파일로
+내보낸 뒤 삭제하고, 필요할 때 보관 파일을 다시 불러옵니다.
+파티션 생성/보관은 advisory lock을 얻은 레플리카 하나만 실행합니다.
+
+복원으로 다시 만든 월 파티션은 표시해 두고 자동 보관/삭제에서 제외합니다.
+다 쓴 뒤 release로 표시를 해제하면 다음 관리 주기에 다시 보관 후 삭제됩니다.
+
+사용법:
+    python -m services.archive archive          # 만료 파티션 보관 후 삭제
+    python -m services.archive restore <파일>    # 보관 파일 복원 (release 전까지 유지)
+    python -m services.archive release <파티션>  # 복원 파티션 표시 해제
+"""
+
+import gzip
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+
+import database
+from config import ANALYSES_RETENTION_MONTHS, ARCHIVE_DIR, PARTITION_MONTHS_AHEAD
+
+# 파티션 관리 작업 advisory lock 키
+PARTITION_LOCK_KEY = 'analyses:partitions'
+
+@contextmanager
+def _partition_lock():
+    """파티션 관리 잠금 (다른 레플리카가 실행 중이면 False)"""
+    conn = database.open_lock_connection()
+    acquired = False
+    try:
+        acquired = database.try_advisory_lock(conn, PARTITION_LOCK_KEY)
+        yield acquired
+    finally:
+        database.close_lock_connection(conn, PARTITION_LOCK_KEY if acquired else None)
+
+def _archive_path(partition: str) -> str:
+    """파티션 보관 파일 경로"""
+    return os.path.join(ARCHIVE_DIR, f"{partition}.jsonl.gz")
+
+def export_partition(partition: str) -> int:
+    """파티션을 압축 JSONL 파일로 내보내기 (행 수 반환)"""
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    path = _archive_path(partition)
+    tmp_path = f"{path}.tmp"
+    count = 0
+
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        for line in database.iter_partition_rows(partition):
+            f.write(line)
+            f.write('\n')
+            count += 1
+
+    # 파일이 완전히 기록된 뒤에만 최종 이름으로 변경
+    with open(tmp_path, 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return count
+
+def archive_expired_partitions(retention_months: int = ANALYSES_RETENTION_MONTHS) -> list:
+    """보관 기간이 지난 파티션을 내보낸 뒤 삭제 (복원된 파티션은 제외)"""
+    cutoff = database._add_months(database._month_start(datetime.now()), -retention_months)
+    archived = []
+
+    for partition, month, restored in database.list_partitions():
+        if month >= cutoff or restored:
+            continue
+        count = export_partition(partition)
+        database.drop_partition(partition)
+        print(f"파티션 보관 완료: {partition} ({count}건) -> {_archive_path(partition)}")
+        archived.append(partition)
+
+    return archived
+
+def maintain_partitions() -> list:
+    """미래 파티션 생성 및 만료 파티션 보관 (주기 작업용, 잠금을 얻지 못하면 건너뜀)"""
+    with _partition_lock() as acquired:
+        if not acquired:
+            return []
+        database.ensure_partitions(PARTITION_MONTHS_AHEAD)
+        return archive_expired_partitions()
+
+def restore_archive(path: str, batch_size: int = 1000) -> int:
+    """보관 파일을 analyses 테이블에 다시 불러오기 (복원된 행 수 반환)"""
+    restored = 0
+    batch = []
+
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            batch.append(line)
+            if len(batch) >= batch_size:
+                restored += database.insert_archived_rows(batch)
+                batch = []
+    if batch:
+        restored += database.insert_archived_rows(batch)
+
+    return restored
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == 'archive':
+        with _partition_lock() as acquired:
+            if not acquired:
+                print("다른 레플리카가 파티션을 관리하는 중입니다. 잠시 후 다시 시도하세요.")
+                sys.exit(1)
+            print(f"보관된 파티션: {archive_expired_partitions()}")
+    elif len(sys.argv) >= 3 and sys.argv[1] == 'restore':
+        print(f"복원된 행: {restore_archive(sys.argv[2])}")
+    elif len(sys.argv) >= 3 and sys.argv[1] == 'release':
+        database.release_partition(sys.argv[2])
+        print(f"복원 표시 해제: {sys.argv[2]} (다음 파티션 관리 때 보관 기간이 지났으면 다시 보관 후 삭제)")
+    else:
+        print(__doc__)
+        sys.exit(1)
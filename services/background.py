@@ -0,0 +1,47 @@
+"""
+백그라운드 작업 모듈
+
+이 모듈은 집계, 정리 등 주기적으로 실행되는 작업을 관리합니다.
+동기 함수는 스레드에서 실행하여 이벤트 루프를 막지 않습니다.
+"""
+
+import asyncio
+import inspect
+from typing import Callable, Dict
+
+# 실행 중인 주기 작업
+_tasks: Dict[str, asyncio.Task] = {}
+
+async def _run_periodic(name: str, func: Callable, interval: float, initial_delay: float) -> None:
+    """주기 작업 루프"""
+    await asyncio.sleep(initial_delay)
+    while True:
+        try:
+            if inspect.iscoroutinefunction(func):
+                result = await func()
+            else:
+                result = await asyncio.to_thread(func)
+            if result:
+                print(f"[{name}] 처리 결과: {result}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[{name}] 주기 작업 실패 (다음 주기에 재시도): {e}")
+        await asyncio.sleep(interval)
+
+def schedule_periodic(name: str, func: Callable, interval: float, initial_delay: float = 0.0) -> None:
+    """주기 작업 등록 (같은 이름은 한 번만 등록)"""
+    if name in _tasks and not _tasks[name].done():
+        return
+    _tasks[name] = asyncio.get_running_loop().create_task(
+        _run_periodic(name, func, interval, initial_delay),
+        name=name
+    )
+
+async def stop_all() -> None:
+    """등록된 주기 작업 모두 중지"""
+    tasks = list(_tasks.values())
+    _tasks.clear()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
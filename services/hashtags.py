@@ -0,0 +1,194 @@
+"""
+해시태그 순위 인덱스 모듈
+
+이 모듈은 저장된 LLM 분석 결과에 등장한 해시태그를 증분 수집하여
+(카테고리, 플랫폼, 후킹포인트)별 순위 인덱스를 메모리에 유지합니다.
+
+- 점수는 반감기(HASHTAG_HALF_LIFE_DAYS) 기준으로 시간 감쇠됩니다.
+  모든 태그가 같은 비율로 감쇠하므로 기준 시각으로 환산한 점수를 더하기만 하면 순위가 유지됩니다.
+- 상위 태그 목록은 수집 시점에 미리 계산해 두므로 조회는 O(1)입니다.
+- 주기적으로 스냅샷 파일을 저장하여 재시작 시 다시 구축하지 않고 바로 불러옵니다.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+import database
+from config import HASHTAG_HALF_LIFE_DAYS, HASHTAG_SNAPSHOT_PATH, HASHTAG_TOP_K
+from services.labels import canonical_label
+
+# 틱톡 카테고리별 해시태그 매핑 (수집된 데이터가 부족할 때 사용)
+TIKTOK_HASHTAGS = {
+    "엔터테인먼트/예능": ["fyp", "viral", "funny", "comedy", "entertainment", "humor", "trending", "meme", "laugh", "fun"],
+    "교육/정보": ["learnontiktok", "education", "facts", "knowledge", "study", "learning", "tips", "howto", "tutorial", "skills"],
+    "뷰티/패션": ["beauty", "fashion", "makeup", "skincare", "style", "outfit", "cosmetics", "hairstyle", "fashionblogger", "beautytips"],
+    "여행/레저": ["travel", "adventure", "explore", "wanderlust", "vacation", "trip", "tourism", "travelblogger", "nature", "destination"],
+    "음식/요리": ["food", "cooking", "recipe", "foodie", "cook", "yummy", "delicious", "foodlover", "homemade", "chef"],
+    "게임/스포츠": ["gaming", "sports", "game", "esports", "gamer", "athlete", "fitness", "workout", "training", "sport"],
+    "음악/댄스": ["music", "dance", "song", "singer", "musician", "dancing", "choreography", "performance", "concert", "dancer"],
+    "일상/브이로그": ["daily", "vlog", "lifestyle", "life", "dailylife", "routine", "dayinthelife", "vlogger", "reallife", "moment"],
+    "반려동물": ["pet", "dog", "cat", "animal", "puppy", "kitten", "pets", "cute", "petsoftiktok", "animals"],
+    "테크/IT": ["tech", "technology", "gadget", "innovation", "smartphone", "computer", "digital", "software", "coding", "programming"],
+    "재테크/투자": ["finance", "money", "investment", "crypto", "stocks", "trading", "wealth", "financial", "business", "investing"],
+    "건강/운동": ["health", "fitness", "workout", "gym", "exercise", "healthy", "training", "fit", "wellness", "motivation"]
+}
+
+DEFAULT_CATEGORY = "엔터테인먼트/예능"
+
+# 집계 키의 와일드카드
+ANY = '*'
+
+# LLM 출력에서 해시태그 추출
+_HASHTAG_PATTERN = re.compile(r'#([0-9A-Za-z_가-힣]{2,30})')
+
+# 기준 시각 환산 점수가 이 값을 넘으면 전체를 재조정
+_RESCALE_LIMIT = 1e12
+
+def extract_hashtags(result: Dict) -> List[str]:
+    """분석 결과(아이디어/전략)에서 해시태그 추출"""
+    texts = [result.get('ideas') or '']
+    for section in ('production_strategy', 'engagement_strategy', 'growth_strategy'):
+        texts.extend(result.get(section) or [])
+    # trending_hashtags는 우리가 넣은 값이므로 제외 (자기강화 방지)
+    tags = _HASHTAG_PATTERN.findall('\n'.join(texts))
+    return list(dict.fromkeys(tag.lower() for tag in tags))
+
+class HashtagIndex:
+    """시간 감쇠 해시태그 순위 인덱스"""
+    def __init__(self, half_life_days: float = HASHTAG_HALF_LIFE_DAYS, top_k: int = HASHTAG_TOP_K):
+        """인덱스 초기화"""
+        self.decay_rate = math.log(2) / (half_life_days * 86400)
+        self.top_k = top_k
+        self._reference_time = time.time()
+        self._scores: Dict[Tuple[str, str, str], Dict[str, float]] = {}
+        self._top: Dict[Tuple[str, str, str], Tuple[str, ...]] = {}
+        self._dirty = set()
+        self.last_id = 0
+        self.last_created_at = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _keys(category: str, platform: str, hook_point: str):
+        """세부 키부터 전체 키까지 반환"""
+        return (
+            (category, platform, hook_point),
+            (category, platform, ANY),
+            (category, ANY, ANY),
+            (ANY, ANY, ANY)
+        )
+
+    def add(self, category: str, platform: str, hook_point: str, tags: Iterable[str], timestamp: float) -> None:
+        """태그 관측 추가 (기준 시각으로 환산한 가중치 누적)"""
+        weight = math.exp(self.decay_rate * (timestamp - self._reference_time))
+        if weight > _RESCALE_LIMIT:
+            self._rescale(timestamp)
+            weight = 1.0
+        for key in self._keys(category, platform, hook_point):
+            scores = self._scores.setdefault(key, {})
+            for tag in tags:
+                scores[tag] = scores.get(tag, 0.0) + weight
+            self._dirty.add(key)
+
+    def _rescale(self, new_reference: float) -> None:
+        """기준 시각을 옮기고 모든 점수 재조정 (순위는 변하지 않음)"""
+        factor = math.exp(-self.decay_rate * (new_reference - self._reference_time))
+        for scores in self._scores.values():
+            for tag in scores:
+                scores[tag] *= factor
+        self._reference_time = new_reference
+
+    def rebuild(self) -> None:
+        """변경된 키의 상위 태그 목록 재계산"""
+        for key in self._dirty:
+            scores = self._scores[key]
+            ranked = sorted(scores, key=scores.get, reverse=True)[:self.top_k]
+            self._top[key] = tuple(ranked)
+        self._dirty.clear()
+
+    def top(self, category: str, platform: str = '', hook_point: str = '') -> List[str]:
+        """조건에 맞는 상위 해시태그 (데이터가 부족하면 상위 키 또는 정적 목록 사용)"""
+        category = canonical_label(category)
+        for key in self._keys(category, canonical_label(platform), canonical_label(hook_point))[:3]:
+            ranked = self._top.get(key)
+            if ranked and len(ranked) >= self.top_k:
+                return list(ranked)
+        return TIKTOK_HASHTAGS.get(category, TIKTOK_HASHTAGS[DEFAULT_CATEGORY])
+
+    def mine(self, batch_size: int = 1000) -> int:
+        """워터마크 이후 저장된 분석 결과에서 해시태그 수집"""
+        processed = 0
+        with self._lock:
+            while True:
+                rows = database.get_analyses_since(self.last_id, self.last_created_at, batch_size)
+                for row in rows:
+                    input_data = row['input_data'] or {}
+                    tags = extract_hashtags(row['result'] or {})
+                    if tags:
+                        self.add(
+                            canonical_label(input_data.get('content_category')),
+                            canonical_label(input_data.get('platform')),
+                            canonical_label(input_data.get('hook_point')),
+                            tags,
+                            row['created_at'].timestamp()
+                        )
+                    self.last_id = row['id']
+                    self.last_created_at = row['created_at']
+                processed += len(rows)
+                if len(rows) < batch_size:
+                    break
+            self.rebuild()
+        return processed
+
+    def save_snapshot(self, path: str = HASHTAG_SNAPSHOT_PATH) -> None:
+        """인덱스 스냅샷 저장"""
+        with self._lock:
+            snapshot = {
+                'reference_time': self._reference_time,
+                'last_id': self.last_id,
+                'last_created_at': self.last_created_at.isoformat() if self.last_created_at else None,
+                'scores': [[list(key), scores] for key, scores in self._scores.items()]
+            }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def load_snapshot(self, path: str = HASHTAG_SNAPSHOT_PATH) -> bool:
+        """스냅샷이 있으면 불러오기"""
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"해시태그 스냅샷 로드 실패 (처음부터 수집): {e}")
+            return False
+
+        with self._lock:
+            self._reference_time = snapshot['reference_time']
+            self.last_id = snapshot['last_id']
+            last_created_at = snapshot.get('last_created_at')
+            self.last_created_at = datetime.fromisoformat(last_created_at) if last_created_at else None
+            self._scores = {tuple(key): scores for key, scores in snapshot['scores']}
+            self._dirty = set(self._scores)
+            self.rebuild()
+        return True
+
+    def refresh(self) -> int:
+        """새 분석 수집 후 스냅샷 저장 (주기 작업용)"""
+        processed = self.mine()
+        if processed:
+            self.save_snapshot()
+        return processed
+
+# 프로세스 전역 인덱스
+hashtag_index = HashtagIndex()
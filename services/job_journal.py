@@ -0,0 +1,102 @@
+"""
+분석 작업 저널 모듈
+
+이 모듈은 진행 중인 분석 작업을 추적하고 DB 저널(analysis_journal)에 기록합니다.
+
+- 작업 시작 시 입력값과 채팅 id를, 1단계가 끝나면 1단계 결과를 저널에 남깁니다.
+- 종료 신호를 받으면 새 분석을 받지 않고, 진행 중인 작업이 유예 시간 안에 끝나기를 기다립니다.
+- 유예 시간 안에 끝나지 않은 작업은 'suspended'로 저널에 남기고 중단합니다.
+- 재시작한 인스턴스는 저널을 가져와 마지막으로 완료된 단계부터 이어서 실행합니다.
+- 진행 중인 작업은 주기적으로 저널 갱신 시각을 갱신하여, 대기열/LLM 호출이 길어져도 다른 레플리카가 가져가지 않습니다.
+"""
+
+import asyncio
+import uuid
+from typing import Dict, Optional, Set
+
+import database
+from config import INSTANCE_ID
+
+class _TrackedJob:
+    """추적 중인 작업"""
+    __slots__ = ('job_id', 'task', 'request_key', 'chat_id', 'telegram_id', 'input_data', 'stage1')
+
+    def __init__(self, job_id, task, request_key, chat_id, telegram_id, input_data, stage1):
+        self.job_id = job_id
+        self.task = task
+        self.request_key = request_key
+        self.chat_id = chat_id
+        self.telegram_id = telegram_id
+        self.input_data = input_data
+        self.stage1 = stage1
+
+class JobTracker:
+    """진행 중인 분석 작업 추적 및 종료 시 저널 보존 클래스"""
+    def __init__(self, owner: str = INSTANCE_ID):
+        """추적기 초기화"""
+        self.owner = owner
+        self.draining = False
+        self._jobs: Dict[str, _TrackedJob] = {}
+        # 저널 기록 태스크 (완료 전에 가비지 컬렉션되지 않도록 참조 유지)
+        self._writes: Set[asyncio.Task] = set()
+
+    async def begin(self, chat_id: int, telegram_id, request_key: str, input_data: Dict,
+                    job_id: Optional[str] = None, stage1: Optional[str] = None) -> str:
+        """현재 태스크를 작업으로 등록하고 저널에 기록 (request_key는 변형까지 포함한 병합 키)"""
+        job_id = job_id or uuid.uuid4().hex
+        self._jobs[job_id] = _TrackedJob(
+            job_id, asyncio.current_task(), request_key, chat_id, telegram_id, input_data, stage1
+        )
+        await asyncio.to_thread(
+            database.upsert_journal_entry,
+            job_id, self.owner, 'running', request_key, chat_id, telegram_id, input_data, stage1
+        )
+        return job_id
+
+    def record_stage1(self, coalesce_key: str, stage1: str) -> None:
+        """1단계 결과 기록 (같은 병합 키로 합류한 작업 모두에 반영, 프롬프트 변형이 다르면 제외)"""
+        for job in self._jobs.values():
+            if job.request_key == coalesce_key:
+                job.stage1 = stage1
+        task = asyncio.get_running_loop().create_task(
+            asyncio.to_thread(database.update_journal_stage1, coalesce_key, self.owner, stage1)
+        )
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    async def heartbeat(self) -> None:
+        """진행 중인 작업의 저널 갱신 시각 갱신 (주기 작업용)"""
+        if self._jobs:
+            await asyncio.to_thread(database.touch_journal_entries, self.owner, list(self._jobs))
+
+    async def finish(self, job_id: str) -> None:
+        """작업 완료 처리 (결과를 전달했거나 사용자에게 오류를 알린 경우)"""
+        self._jobs.pop(job_id, None)
+        await asyncio.to_thread(database.delete_journal_entry, job_id)
+
+    def release(self, job_id: str) -> None:
+        """저널은 남겨둔 채 추적만 중지 (다른 인스턴스가 나중에 재시도)"""
+        self._jobs.pop(job_id, None)
+
+    async def drain(self, grace_seconds: float) -> int:
+        """새 작업을 막고 유예 시간 동안 대기한 뒤 남은 작업을 저널에 보존 (보존한 수 반환)"""
+        self.draining = True
+        tasks = {job.task for job in self._jobs.values() if job.task is not None}
+        if tasks:
+            print(f"진행 중인 분석 {len(tasks)}건 완료 대기 (최대 {grace_seconds}초)")
+            await asyncio.wait(tasks, timeout=grace_seconds)
+
+        remaining = list(self._jobs.values())
+        for job in remaining:
+            await asyncio.to_thread(
+                database.upsert_journal_entry,
+                job.job_id, self.owner, 'suspended', job.request_key, job.chat_id,
+                job.telegram_id, job.input_data, job.stage1
+            )
+            if job.task is not None and not job.task.done():
+                job.task.cancel()
+        self._jobs.clear()
+        return len(remaining)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
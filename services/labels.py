@@ -0,0 +1,76 @@
+"""
+선택지 레이블 모듈
+
+이 모듈은 대화에서 사용하는 선택지 목록과 정규화된 레이블 테이블을 제공합니다.
+키보드 버튼 텍스트에는 이모지가 붙어 있으므로('🎭 엔터테인먼트/예능'),
+조회/집계에는 미리 계산된 정규 레이블('엔터테인먼트/예능')을 사용합니다.
+"""
+
+import re
+from typing import Dict, List, Sequence
+
+# 콘텐츠 카테고리 선택지
+CATEGORY_OPTIONS = (
+    '🎭 엔터테인먼트/예능', '🎓 교육/정보',
+    '💄 뷰티/패션', '✈️ 여행/레저',
+    '🍳 음식/요리', '🎮 게임/스포츠',
+    '🎵 음악/댄스', '📹 일상/브이로그',
+    '🐾 반려동물', '💻 테크/IT',
+    '💰 재테크/투자', '💪 건강/운동'
+)
+
+# 타겟 연령대 선택지
+AGE_OPTIONS = (
+    '👶 10대', '👩 20대',
+    '👨 30대', '👴 40대',
+    '👵 50대 이상'
+)
+
+# 타겟 관심사 선택지
+INTEREST_OPTIONS = (
+    '🎯 트렌드/유행 정보', '📚 실용적/생활 정보',
+    '📈 자기계발/성장', '🎨 취미/여가 활동',
+    '🛍️ 쇼핑/소비', '🧘 건강/웰빙',
+    '🎭 문화/예술', '👥 소셜/커뮤니티'
+)
+
+# 플랫폼 선택지
+PLATFORM_OPTIONS = (
+    '📱 TikTok', '📸 Instagram Reels',
+    '🎥 YouTube Shorts', '📺 기타'
+)
+
+# 후킹포인트 선택지
+HOOK_OPTIONS = (
+    '😱 충격적인 사실/반전', '🤔 궁금증 유발',
+    '💝 공감되는 상황', '💡 유용한 정보/팁',
+    '🎭 재미있는 연출', '👀 시선 끄는 액션',
+    '🌟 트렌디한 밈/챌린지', '💖 감동/힐링'
+)
+
+# 앞쪽 이모지/기호 제거용 패턴
+_LEADING_SYMBOLS = re.compile(r'^[^\w]+')
+
+def _strip_symbols(text: str) -> str:
+    """앞쪽 이모지와 공백 제거"""
+    return _LEADING_SYMBOLS.sub('', text.strip())
+
+# 버튼 텍스트 -> 정규 레이블 (미리 계산된 테이블)
+CANONICAL_LABELS: Dict[str, str] = {
+    option: _strip_symbols(option)
+    for options in (CATEGORY_OPTIONS, AGE_OPTIONS, INTEREST_OPTIONS, PLATFORM_OPTIONS, HOOK_OPTIONS)
+    for option in options
+}
+
+def canonical_label(text: str) -> str:
+    """버튼 텍스트 또는 직접 입력값을 정규 레이블로 변환"""
+    if not text:
+        return ''
+    label = CANONICAL_LABELS.get(text)
+    if label is None:
+        label = _strip_symbols(text)
+    return label
+
+def keyboard_rows(options: Sequence[str], columns: int = 2) -> List[List[str]]:
+    """선택지를 키보드 행으로 배치"""
+    return [list(options[i:i + columns]) for i in range(0, len(options), columns)]
@@ -5,148 +5,225 @@ LangChain 서비스 모듈
 체계적인 보고서를 생성하는 기능을 제공합니다.
 """
 
-import os
 import asyncio
-from typing import Dict, Optional
-import anthropic
-from langchain.prompts import ChatPromptTemplate
+import contextvars
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
 import warnings
+from config import DEBUG_CHAIN, LLM_DEFAULT_MODEL, LLM_MEMO_SIZE, LLM_MODEL_ROUTES, LLM_WORKER_THREADS
+from services.token_stats import OutputTokenStats
+from services.llm_backends import BackendPool, build_pool
+from services.hashtags import hashtag_index
+from services.labels import canonical_label
+from services.prompt_variants import PromptExperiment, PromptVariant
+from services.request_coalescer import make_request_key
+from services.result_parser import parse_analysis, parse_section_content
+from services.tracing import tracer
 
 # SQLite 관련 경고 무시
 warnings.filterwarnings('ignore', category=UserWarning, module='langchain')
 
-# 틱톡 카테고리별 해시태그 매핑
-TIKTOK_HASHTAGS = {
-    "엔터테인먼트/예능": ["fyp", "viral", "funny", "comedy", "entertainment", "humor", "trending", "meme", "laugh", "fun"],
-    "교육/정보": ["learnontiktok", "education", "facts", "knowledge", "study", "learning", "tips", "howto", "tutorial", "skills"],
-    "뷰티/패션": ["beauty", "fashion", "makeup", "skincare", "style", "outfit", "cosmetics", "hairstyle", "fashionblogger", "beautytips"],
-    "여행/레저": ["travel", "adventure", "explore", "wanderlust", "vacation", "trip", "tourism", "travelblogger", "nature", "destination"],
-    "음식/요리": ["food", "cooking", "recipe", "foodie", "cook", "yummy", "delicious", "foodlover", "homemade", "chef"],
-    "게임/스포츠": ["gaming", "sports", "game", "esports", "gamer", "athlete", "fitness", "workout", "training", "sport"],
-    "음악/댄스": ["music", "dance", "song", "singer", "musician", "dancing", "choreography", "performance", "concert", "dancer"],
-    "일상/브이로그": ["daily", "vlog", "lifestyle", "life", "dailylife", "routine", "dayinthelife", "vlogger", "reallife", "moment"],
-    "반려동물": ["pet", "dog", "cat", "animal", "puppy", "kitten", "pets", "cute", "petsoftiktok", "animals"],
-    "테크/IT": ["tech", "technology", "gadget", "innovation", "smartphone", "computer", "digital", "software", "coding", "programming"],
-    "재테크/투자": ["finance", "money", "investment", "crypto", "stocks", "trading", "wealth", "financial", "business", "investing"],
-    "건강/운동": ["health", "fitness", "workout", "gym", "exercise", "healthy", "training", "fit", "wellness", "motivation"]
-}
+# LLM 호출 전용 스레드 풀
+# (모든 키가 한도에 걸려 백엔드 풀이 대기해도 DB 호출이 쓰는 기본 스레드 풀을 차지하지 않도록 분리)
+_llm_executor = ThreadPoolExecutor(max_workers=LLM_WORKER_THREADS, thread_name_prefix='llm')
+
+async def run_in_llm_thread(func: Callable, *args):
+    """LLM 전용 스레드에서 실행 (현재 트레이스 컨텍스트 유지)"""
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        _llm_executor, functools.partial(context.run, func, *args)
+    )
+
+class StageMemo:
+    """단계별 출력 메모 (크기 제한 LRU, 스레드 안전)"""
+    def __init__(self, max_entries: int = LLM_MEMO_SIZE):
+        """메모 초기화"""
+        self.max_entries = max_entries
+        self._items: 'OrderedDict[str, str]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def get(self, key: str) -> Optional[str]:
+        """메모 조회"""
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.stats['misses'] += 1
+                return None
+            self._items.move_to_end(key)
+            self.stats['hits'] += 1
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        """메모 저장 (한도를 넘으면 가장 오래 안 쓴 것부터 제거)"""
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
 
 class LangChainService:
     """LangChain 서비스 클래스"""
-    def __init__(self):
-        """서비스 초기화"""
-        self.api_key = os.getenv('ANTHROPIC_API_KEY')
-        if not self.api_key:
-            raise ValueError("ANTHROPIC_API_KEY가 설정되지 않았습니다.")
+    def __init__(self, pool: Optional[BackendPool] = None, experiment: Optional[PromptExperiment] = None):
+        """서비스 초기화 (pool/experiment가 없으면 설정에 따라 생성)"""
+        # 키/모델별 백엔드 풀 (재시도와 장애 백엔드 제외는 풀에서 처리)
+        self.pool = pool or build_pool()
+        self.model = LLM_DEFAULT_MODEL
         
-        self.client = anthropic.Client(api_key=self.api_key)
-        self.model = "claude-3-haiku-20240307"
+        # 단계별 모델 라우팅 테이블 및 출력 토큰 통계
+        self.model_routes = dict(LLM_MODEL_ROUTES)
+        self.token_stats = OutputTokenStats()
         
-        # 1단계: 콘텐츠 아이디어 생성
-        self.summary_prompt = ChatPromptTemplate.from_messages([
-            ("system", """당신은 숏폼 콘텐츠 전문 크리에이터입니다.
-            제공된 정보를 바탕으로 매력적인 숏폼 콘텐츠 아이디어를 제안해주세요.
-            
-            다음 형식을 정확히 따라주세요:
-            
-            # 트렌딩 콘텐츠 아이디어
-            - [인기 있는 콘텐츠 아이디어 3-5개]
-            - [각 아이디어별 핵심 포인트]
-            
-            # 니치 콘텐츠 아이디어
-            - [차별화된 콘텐츠 아이디어 2-3개]
-            - [각 아이디어의 독특한 가치]
-            
-            # 시리즈 콘텐츠 아이디어
-            - [연속성 있는 콘텐츠 아이디어 2-3개]
-            - [각 시리즈의 발전 방향]
-            
-            주의사항:
-            1. 각 아이디어는 구체적이고 실현 가능해야 함
-            2. 플랫폼 특성과 트렌드를 반영
-            3. 타겟 시청자의 관심사에 부합
-            4. 후킹포인트를 활용한 아이디어 제시
-            5. 확장 가능성을 고려한 제안"""),
-            
-            ("human", """콘텐츠 카테고리: {content_category}
-            콘텐츠 주제/키워드: {content_topic}
-            타겟 연령대: {target_age}
-            타겟 관심사: {target_interest}
-            플랫폼: {platform}
-            후킹포인트: {hook_point}""")
-        ])
+        # 단계별 메모: 1단계는 답변 조합 해시, 2단계는 1단계 출력 해시 기준 (변형별로 분리)
+        self.summary_memo = StageMemo()
+        self.analysis_memo = StageMemo()
         
-        # 2단계: 실행 전략 생성
-        self.analysis_prompt = ChatPromptTemplate.from_messages([
-            ("system", """당신은 숏폼 콘텐츠 전략 전문가입니다.
-
-            1단계에서 제안된 아이디어를 바탕으로 실행 전략을 제시해주세요.
-
-            다음 형식으로 응답해주세요:
-
-            # 콘텐츠 제작 전략
-            - 촬영 팁: [구도, 앵글, 조명 등]
-            - 편집 포인트: [템포, 전환, 효과 등]
-            - 사운드 활용: [BGM, 효과음 등]
-            - 자막 전략: [폰트, 위치, 애니메이션 등]
-
-            # 참여 유도 전략
-            - 후킹 포인트: [시청자 관심 유도 방법]
-            - 인터랙션: [댓글, 공유 유도 방법]
-            - 해시태그: [검색 최적화 전략]
-            - 업로드 타이밍: [최적 시간대]
-
-            # 성장 전략
-            - 시리즈화: [콘텐츠 확장 방안]
-            - 크로스 프로모션: [협업 아이디어]
-            - 트렌드 활용: [인기 요소 접목]
-            - 커뮤니티: [팬층 형성 방안]
-
-            주의사항:
-            1. 각 섹션은 반드시 '# '으로 시작
-            2. 모든 항목은 반드시 '- '으로 시작
-            3. 빈 줄은 섹션 구분에만 사용
-            4. 실제 트렌드와 성공 사례 기반의 구체적 제안"""),
-            
-            ("human", """아이디어: {ideas}""")
-        ])
-
-    def _get_trending_hashtags(self, category: str) -> list:
-        """카테고리에 맞는 틱톡 트렌딩 해시태그 반환"""
-        return TIKTOK_HASHTAGS.get(category, TIKTOK_HASHTAGS["엔터테인먼트/예능"])
-
-    def _get_summary(self, data):
-        """1단계: 기본 정보 정리 및 요약"""
-        response = self.client.messages.create(
-            model=self.model,
-            system=self.summary_prompt.messages[0].prompt.template,
-            messages=[
-                {"role": "user", "content": self.summary_prompt.messages[1].prompt.template.format(**data)}
-            ],
-            max_tokens=4000
+        # 버전별 프롬프트 변형과 사용자 배정 (prompts/<변형 id>/)
+        self.experiment = experiment or PromptExperiment()
+
+    def _get_trending_hashtags(self, data: Dict) -> list:
+        """카테고리/플랫폼/후킹포인트에 맞는 트렌딩 해시태그 반환"""
+        return hashtag_index.top(
+            data.get('content_category', ''),
+            data.get('platform', ''),
+            data.get('hook_point', '')
+        )
+
+    def _route_model(self, stage: str, category: str = None) -> str:
+        """단계(와 카테고리)에 맞는 모델 선택"""
+        if category and f"{stage}:{category}" in self.model_routes:
+            return self.model_routes[f"{stage}:{category}"]
+        return self.model_routes.get(stage, self.model)
+
+    def _complete(
+        self,
+        stage: str,
+        system: str,
+        content: str,
+        data: Dict,
+        memo: StageMemo = None,
+        memo_key: str = None,
+        usage: Dict = None
+    ) -> str:
+        """라우팅된 모델로 호출하고 출력 토큰 수 기록 (memo_key가 있으면 잘리지 않은 출력을 메모, usage에 토큰 합산)"""
+        category = canonical_label(data.get('content_category'))
+        platform = canonical_label(data.get('platform'))
+        model = self._route_model(stage, category)
+        max_tokens = self.token_stats.max_tokens(stage, category, platform)
+        
+        with tracer.span(f"llm.{stage}", model=model, max_tokens=max_tokens) as span:
+            response = self.pool.complete(model, system, content, max_tokens)
+            span.set_attributes(**{
+                'llm.backend': response.backend,
+                'llm.retries': response.retries,
+                'llm.input_tokens': response.input_tokens,
+                'llm.output_tokens': response.output_tokens,
+                'llm.stop_reason': response.stop_reason
+            })
+        
+        truncated = response.stop_reason == 'max_tokens'
+        self.token_stats.record(
+            stage,
+            category,
+            platform,
+            response.output_tokens,
+            truncated=truncated
         )
-        return response.content[0].text
-
-    def _get_analysis(self, ideas):
-        """2단계: 실행 전략 생성"""
-        response = self.client.messages.create(
-            model=self.model,
-            system=self.analysis_prompt.messages[0].prompt.template,
-            messages=[
-                {"role": "user", "content": f"아이디어: {ideas}"}
-            ],
-            max_tokens=4000
+        if usage is not None:
+            usage['input_tokens'] += response.input_tokens
+            usage['output_tokens'] += response.output_tokens
+        if memo is not None and memo_key and not truncated:
+            memo.put(memo_key, response.text)
+        return response.text
+
+    def _summary_key(self, data: Dict, variant: PromptVariant) -> str:
+        """1단계 메모 키 (변형 + 모델 + 답변 조합 해시)"""
+        model = self._route_model('summary', canonical_label(data.get('content_category')))
+        return f"{variant.variant_id}:{model}:{make_request_key(data)}"
+
+    def _analysis_key(self, ideas: str, data: Dict, variant: PromptVariant) -> str:
+        """2단계 메모 키 (변형 + 모델 + 1단계 출력 해시)"""
+        model = self._route_model('analysis', canonical_label(data.get('content_category')))
+        return f"{variant.variant_id}:{model}:{hashlib.sha256(ideas.encode('utf-8')).hexdigest()}"
+
+    def memoized_summary(self, data: Dict, variant_id: Optional[str] = None) -> Optional[str]:
+        """답변 조합에 대해 메모된 1단계 출력 (없으면 None)"""
+        return self.summary_memo.get(self._summary_key(data, self.experiment.get(variant_id)))
+
+    def _get_summary(self, data, variant: Optional[PromptVariant] = None, usage: Dict = None):
+        """1단계: 기본 정보 정리 및 요약 (같은 답변 조합이면 메모 사용)"""
+        variant = variant or self.experiment.get()
+        memo_key = self._summary_key(data, variant)
+        cached = self.summary_memo.get(memo_key)
+        if cached is not None:
+            tracer.current_span().set_attribute('llm.summary.memo_hit', True)
+            return cached
+        return self._complete(
+            'summary',
+            variant.summary_system,
+            variant.summary_content(data),
+            data,
+            self.summary_memo,
+            memo_key,
+            usage
         )
-        return response.content[0].text
+
+    def _get_analysis(
+        self,
+        ideas,
+        data: Dict = None,
+        fresh: bool = False,
+        variant: Optional[PromptVariant] = None,
+        usage: Dict = None
+    ):
+        """2단계: 실행 전략 생성 (같은 1단계 출력이면 메모 사용, fresh면 새로 생성)"""
+        data = data or {}
+        variant = variant or self.experiment.get()
+        memo_key = self._analysis_key(ideas, data, variant)
+        if not fresh:
+            cached = self.analysis_memo.get(memo_key)
+            if cached is not None:
+                tracer.current_span().set_attribute('llm.analysis.memo_hit', True)
+                return cached
+        return self._complete(
+            'analysis',
+            variant.analysis_system,
+            variant.analysis_content(ideas),
+            data,
+            self.analysis_memo,
+            memo_key,
+            usage
+        )
+
+    def describe_limits(self) -> Dict:
+        """현재 라우팅 테이블, 백엔드 상태, 단계별 max_tokens 통계 반환"""
+        return {
+            'default_model': self.model,
+            'routes': dict(self.model_routes),
+            'prompt_variants': dict(self.experiment.weights),
+            'backends': self.pool.snapshot(),
+            'memo': {
+                'summary': {'entries': len(self.summary_memo), **self.summary_memo.stats},
+                'analysis': {'entries': len(self.analysis_memo), **self.analysis_memo.stats}
+            },
+            'output_tokens': self.token_stats.snapshot()
+        }
 
     async def debug_chain(self, data: Dict) -> None:
         """디버깅용 체인 실행"""
         try:
-            summary_result = await asyncio.to_thread(self._get_summary, data)
+            summary_result = await run_in_llm_thread(self._get_summary, data)
             print("\n=== Summary Chain Result ===")
             print(f"Content: {summary_result}")
             
-            analysis_result = await asyncio.to_thread(self._get_analysis, summary_result)
+            analysis_result = await run_in_llm_thread(self._get_analysis, summary_result, data)
             print("\n=== Analysis Chain Result ===")
             print(f"Content: {analysis_result}")
             
@@ -159,95 +236,52 @@ class LangChainService:
 
     def _parse_section_content(self, content: str) -> list:
         """섹션 내용을 리스트 형태로 파싱"""
-        if not content:
-            return []
-        
-        lines = [line.strip() for line in content.split('\n') if line.strip()]
-        result = []
-        
-        for line in lines:
-            if line.startswith('- '):
-                if ':' in line:
-                    label, value = line[2:].split(':', 1)
-                    result.append(f"# {label.strip()}")
-                    if value.strip():
-                        result.append(f"- {value.strip()}")
-                else:
-                    result.append(line)
-            else:
-                result.append(f"- {line.strip()}")
-        
-        result = [item.strip() for item in result if item.strip()]
-        return result
+        return parse_section_content(content)
+
+    async def generate_content_ideas(
+        self,
+        data: Dict,
+        summary: Optional[str] = None,
+        on_summary: Optional[Callable[[str], None]] = None,
+        fresh_strategy: bool = False,
+        variant_id: Optional[str] = None
+    ) -> Optional[Dict]:
+        """숏폼 콘텐츠 아이디어 생성 (summary가 있으면 1단계를 건너뛰고, fresh_strategy면 2단계 메모를 무시)
 
-    async def generate_content_ideas(self, data: Dict) -> Optional[Dict]:
-        """숏폼 콘텐츠 아이디어 생성"""
+        결과에는 사용한 프롬프트 변형(prompt_variant), 파싱 성공 여부(parse_ok),
+        이번 호출에서 실제로 쓴 토큰 수(llm_usage, 메모 적중 단계는 0)가 함께 담깁니다.
+        """
         try:
-            # 디버깅 실행
-            await self.debug_chain(data)
+            # 디버깅 실행 (LLM 호출이 두 배가 되므로 설정 시에만)
+            if DEBUG_CHAIN:
+                await self.debug_chain(data)
+
+            variant = self.experiment.get(variant_id)
+            tracer.current_span().set_attribute('llm.prompt_variant', variant.variant_id)
+            usage = {'input_tokens': 0, 'output_tokens': 0}
 
             # 체인 실행
             print("\n=== Chain Execution ===")
-            summary = await asyncio.to_thread(self._get_summary, data)
-            analysis = await asyncio.to_thread(self._get_analysis, summary)
+            if summary is None:
+                summary = await run_in_llm_thread(self._get_summary, data, variant, usage)
+                if on_summary:
+                    on_summary(summary)
+            analysis = await run_in_llm_thread(self._get_analysis, summary, data, fresh_strategy, variant, usage)
+            sections = parse_analysis(analysis)
             
             # 틱톡 트렌딩 해시태그 가져오기
-            trending_hashtags = self._get_trending_hashtags(data.get('content_category', ''))
+            trending_hashtags = self._get_trending_hashtags(data)
             
             # 결과를 직접 구성
             content_result = {
                 'ideas': summary,
-                'production_strategy': [],
-                'engagement_strategy': [],
-                'growth_strategy': [],
-                'trending_hashtags': trending_hashtags
-            }
-            
-            # 섹션 매핑 정의
-            section_mapping = {
-                '콘텐츠 제작 전략': 'production_strategy',
-                '참여 유도 전략': 'engagement_strategy',
-                '성장 전략': 'growth_strategy'
+                **sections,
+                'trending_hashtags': trending_hashtags,
+                'prompt_variant': variant.variant_id,
+                'parse_ok': all(sections.values()),
+                'llm_usage': usage
             }
             
-            # 분석 결과 파싱
-            current_section = None
-            current_content = []
-            
-            print("\n=== Parsing Analysis Result ===")
-            
-            for line in analysis.split('\n'):
-                line = line.strip()
-                if not line:
-                    continue
-                
-                if line.startswith('# '):
-                    # 이전 섹션의 내용을 처리
-                    if current_section and current_content:
-                        parsed_content = self._parse_section_content('\n'.join(current_content))
-                        if current_section in section_mapping:
-                            mapped_section = section_mapping[current_section]
-                            print(f"\nProcessing section: {current_section} -> {mapped_section}")
-                            print(f"Parsed content: {parsed_content}")
-                            content_result[mapped_section] = parsed_content
-                    
-                    # 새로운 섹션 시작
-                    current_section = line[2:].strip()
-                    print(f"\nNew section: {current_section}")
-                    current_content = []
-                else:
-                    current_content.append(line)
-                    print(f"Added content: {line}")
-            
-            # 마지막 섹션 처리
-            if current_section and current_content:
-                parsed_content = self._parse_section_content('\n'.join(current_content))
-                if current_section in section_mapping:
-                    mapped_section = section_mapping[current_section]
-                    print(f"\nProcessing final section: {current_section} -> {mapped_section}")
-                    print(f"Parsed content: {parsed_content}")
-                    content_result[mapped_section] = parsed_content
-
             return content_result
             
         except Exception as e:
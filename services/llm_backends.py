@@ -0,0 +1,320 @@
+"""
+LLM 백엔드 풀 모듈
+
+이 모듈은 여러 API 키/모델의 Anthropic 클라이언트를 하나의 풀로 묶어
+가장 한가한 정상 백엔드로 요청을 보내고, 429/5xx 응답을 받은 백엔드는
+일정 시간 제외합니다. 네트워크 없이 동작하는 결정적 로컬 백엔드도 제공합니다.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import anthropic
+import httpx
+
+from config import (
+    ANTHROPIC_API_KEYS,
+    LLM_BACKEND,
+    LLM_EJECT_MAX_SECONDS,
+    LLM_EJECT_SECONDS,
+    LLM_KEY_RPM,
+    LLM_LOCAL_BACKENDS,
+    LLM_LOCAL_LATENCY_MS,
+    LLM_MAX_RETRIES
+)
+
+# 다른 백엔드로 넘겨 재시도할 오류 (429, 5xx, 연결 실패)
+RETRYABLE_ERRORS = (anthropic.RateLimitError, anthropic.InternalServerError, anthropic.APIConnectionError)
+
+class Completion:
+    """백엔드 응답"""
+    __slots__ = ('text', 'input_tokens', 'output_tokens', 'stop_reason', 'model', 'backend', 'retries')
+
+    def __init__(self, text: str, input_tokens: int, output_tokens: int, stop_reason: str, model: str, backend: str):
+        self.text = text
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.stop_reason = stop_reason
+        self.model = model
+        self.backend = backend
+        self.retries = 0
+
+class Backend(ABC):
+    """백엔드 공통 상태 (동시 요청 수, 분당 한도, 제외 시각)"""
+    def __init__(self, name: str, model: Optional[str] = None, rpm: float = 0.0):
+        """백엔드 상태 초기화 (model이 있으면 해당 모델 전용)"""
+        self.name = name
+        self.model = model
+        self.rpm = rpm
+        self.in_flight = 0
+        self.failures = 0  # 연속 실패 수 (제외 시간 지수 증가)
+        self.ejected_until = 0.0
+        self.limited_until = 0.0  # 응답 헤더상 한도 소진 시 초기화 시각
+        self.remaining_ratio = 1.0  # 응답 헤더상 남은 한도 비율
+        self._capacity = max(1.0, rpm / 60)
+        self._tokens = self._capacity
+        self._refilled_at = time.monotonic()
+        self.stats = {'requests': 0, 'errors': 0, 'ejections': 0}
+
+    def ready_at(self, now: float) -> float:
+        """요청을 받을 수 있는 가장 이른 시각"""
+        ready = max(self.ejected_until, self.limited_until)
+        if self.rpm > 0:
+            tokens = min(self._capacity, self._tokens + (now - self._refilled_at) * self.rpm / 60)
+            if tokens < 1:
+                ready = max(ready, now + (1 - tokens) * 60 / self.rpm)
+        return ready
+
+    def take(self, now: float) -> None:
+        """분당 한도 토큰 하나 사용"""
+        if self.rpm > 0:
+            self._tokens = min(self._capacity, self._tokens + (now - self._refilled_at) * self.rpm / 60) - 1
+            self._refilled_at = now
+
+    @abstractmethod
+    def complete(self, model: str, system: str, content: str, max_tokens: int) -> Completion:
+        """단일 메시지 호출"""
+
+    def warm_up(self) -> None:
+        """첫 요청 전에 연결 준비 (기본은 할 일 없음)"""
+
+    def snapshot(self, now: float) -> Dict:
+        """현재 상태 요약"""
+        return {
+            'name': self.name,
+            'model': self.model or '*',
+            'in_flight': self.in_flight,
+            'ejected_for': round(max(0.0, self.ejected_until - now), 1),
+            'remaining_ratio': round(self.remaining_ratio, 3),
+            **self.stats
+        }
+
+class AnthropicBackend(Backend):
+    """API 키 하나(와 선택적 전용 모델)에 묶인 Anthropic 백엔드"""
+    def __init__(self, api_key: str, model: Optional[str] = None, rpm: float = LLM_KEY_RPM):
+        """클라이언트 생성 (재시도는 풀에서 처리)"""
+        name = f"anthropic:…{api_key[-4:]}" + (f"/{model}" if model else '')
+        super().__init__(name, model, rpm)
+        self.client = anthropic.Client(api_key=api_key, max_retries=0)
+
+    def complete(self, model: str, system: str, content: str, max_tokens: int) -> Completion:
+        """Messages API 호출 후 응답 헤더의 한도 정보 반영"""
+        raw = self.client.messages.with_raw_response.create(
+            model=model,
+            system=system,
+            messages=[
+                {"role": "user", "content": content}
+            ],
+            max_tokens=max_tokens
+        )
+        self._observe_headers(raw.headers)
+        response = raw.parse()
+        return Completion(
+            response.content[0].text,
+            response.usage.input_tokens,
+            response.usage.output_tokens,
+            response.stop_reason,
+            model,
+            self.name
+        )
+
+    def warm_up(self) -> None:
+        """TLS 연결을 미리 맺어 둠 (인증 실패만 오류로 보고 그 외 HTTP 응답은 성공)"""
+        try:
+            self.client.get('/v1/models', cast_to=httpx.Response)
+        except anthropic.AuthenticationError:
+            raise
+        except anthropic.APIStatusError:
+            pass
+
+    def _observe_headers(self, headers) -> None:
+        """anthropic-ratelimit-* 헤더로 남은 한도 갱신"""
+        ratios = []
+        for kind in ('requests', 'tokens'):
+            try:
+                limit = int(headers[f'anthropic-ratelimit-{kind}-limit'])
+                remaining = int(headers[f'anthropic-ratelimit-{kind}-remaining'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if limit > 0:
+                ratios.append(remaining / limit)
+            if remaining <= 0:
+                self.limited_until = max(self.limited_until, _monotonic_deadline(headers.get(f'anthropic-ratelimit-{kind}-reset')))
+        if ratios:
+            self.remaining_ratio = min(ratios)
+
+class LocalBackend(Backend):
+    """네트워크 없이 시스템 프롬프트 형식을 그대로 채워 응답하는 결정적 백엔드"""
+    _PLACEHOLDER = re.compile(r'\[([^\]]+)\]')
+    _TOPIC = re.compile(r'콘텐츠 주제/키워드:\s*(.+)|^- ([^\n]+?)(?: - |$)', re.M)
+    _ANGLES = ('현실 공감', '비포/애프터', '3초 요약', '의외의 반전', '단계별 튜토리얼', '실패담')
+
+    def __init__(self, index: int = 0, latency_ms: float = LLM_LOCAL_LATENCY_MS, rpm: float = 0.0):
+        """로컬 백엔드 초기화 (latency_ms로 응답 지연 흉내)"""
+        super().__init__(f"local-{index}", None, rpm)
+        self.latency_ms = latency_ms
+
+    def complete(self, model: str, system: str, content: str, max_tokens: int) -> Completion:
+        """같은 입력에는 항상 같은 응답 반환"""
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        digest = hashlib.sha256(f"{model}\n{system}\n{content}".encode()).digest()
+        match = self._TOPIC.search(content)
+        topic = (match.group(1) or match.group(2) if match else '콘텐츠').strip()[:30]
+        for angle in self._ANGLES:
+            topic = topic.replace(f" {angle}", '')
+
+        lines = []
+        for raw in system.splitlines():
+            line = raw.strip()
+            if line.startswith('# '):
+                if lines:
+                    lines.append('')
+                lines.append(line)
+            elif line.startswith('- ') and lines:
+                index = len(lines)
+                angle = self._ANGLES[digest[index % len(digest)] % len(self._ANGLES)]
+                lines.append(self._PLACEHOLDER.sub(
+                    lambda m: f"{topic} {angle} - {m.group(1).replace(' 등', '')}",
+                    line
+                ))
+        text = '\n'.join(lines)
+
+        # 토큰 수는 한국어 기준 대략 2자당 1토큰으로 추정
+        stop_reason = 'end_turn'
+        if len(text) // 2 > max_tokens:
+            text = text[:max_tokens * 2]
+            stop_reason = 'max_tokens'
+        return Completion(text, (len(system) + len(content)) // 2, len(text) // 2, stop_reason, model, self.name)
+
+class BackendPool:
+    """가장 한가한 정상 백엔드로 요청을 분배하는 풀"""
+    def __init__(
+        self,
+        backends: List[Backend],
+        max_retries: int = LLM_MAX_RETRIES,
+        eject_seconds: float = LLM_EJECT_SECONDS,
+        eject_max_seconds: float = LLM_EJECT_MAX_SECONDS
+    ):
+        """풀 초기화"""
+        if not backends:
+            raise ValueError("LLM 백엔드가 없습니다.")
+        self.backends = list(backends)
+        self.max_retries = max_retries
+        self.eject_seconds = eject_seconds
+        self.eject_max_seconds = eject_max_seconds
+        self._lock = threading.Lock()
+
+    def complete(self, model: str, system: str, content: str, max_tokens: int) -> Completion:
+        """백엔드 하나를 골라 호출 (재시도 가능한 오류면 다른 백엔드로 재시도)"""
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            backend = self._acquire(model)
+            try:
+                result = backend.complete(model, system, content, max_tokens)
+            except RETRYABLE_ERRORS as e:
+                self._release(backend, e)
+                last_error = e
+                print(f"LLM 백엔드 오류 ({backend.name}, {attempt + 1}/{self.max_retries + 1}): {e}")
+                continue
+            except Exception:
+                self._release(backend)
+                raise
+            self._release(backend)
+            result.retries = attempt
+            return result
+        raise last_error
+
+    def _acquire(self, model: str) -> Backend:
+        """요청 모델을 처리할 수 있는 백엔드 중 가장 한가한 정상 백엔드 선택 (없으면 대기)"""
+        # 다른 모델 전용 백엔드는 쓰지 않음 (라우팅된 모델 기준의 메모/토큰 통계와 실제 모델이 달라지지 않도록)
+        eligible = [backend for backend in self.backends if backend.model in (None, model)]
+        if not eligible:
+            raise ValueError(f"{model} 모델을 처리할 LLM 백엔드가 없습니다. ANTHROPIC_API_KEYS의 '키:모델' 설정을 확인하세요.")
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                ready = [backend for backend in eligible if backend.ready_at(now) <= now]
+                if ready:
+                    backend = min(
+                        ready,
+                        key=lambda b: (b.in_flight, -b.remaining_ratio, b.stats['requests'])
+                    )
+                    backend.take(now)
+                    backend.in_flight += 1
+                    backend.stats['requests'] += 1
+                    return backend
+                wait = min(backend.ready_at(now) for backend in eligible) - now
+            time.sleep(min(max(wait, 0.01), 1.0))
+
+    def _release(self, backend: Backend, error: Optional[Exception] = None) -> None:
+        """호출 종료 처리 (재시도 가능한 오류면 일정 시간 제외)"""
+        with self._lock:
+            backend.in_flight -= 1
+            if error is None:
+                backend.failures = 0
+                return
+
+            backend.stats['errors'] += 1
+            cooldown = _retry_after(error)
+            if cooldown is None:
+                cooldown = self.eject_seconds * 2 ** backend.failures
+            backend.failures += 1
+            backend.ejected_until = time.monotonic() + min(cooldown, self.eject_max_seconds)
+            backend.stats['ejections'] += 1
+
+    def warm_up(self) -> Dict[str, str]:
+        """모든 백엔드 연결 예열 (백엔드 이름 -> 'ok' 또는 오류 메시지)"""
+        results = {}
+        for backend in self.backends:
+            try:
+                backend.warm_up()
+                results[backend.name] = 'ok'
+            except Exception as e:
+                results[backend.name] = f"{type(e).__name__}: {e}"
+        return results
+
+    def snapshot(self) -> List[Dict]:
+        """백엔드별 상태 목록"""
+        with self._lock:
+            now = time.monotonic()
+            return [backend.snapshot(now) for backend in self.backends]
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """오류 응답의 retry-after 헤더 (초)"""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+def _monotonic_deadline(reset: Optional[str]) -> float:
+    """RFC 3339 초기화 시각을 monotonic 시각으로 변환 (해석 실패 시 1분 뒤)"""
+    try:
+        seconds = (datetime.fromisoformat(reset) - datetime.now(timezone.utc)).total_seconds()
+    except (TypeError, ValueError):
+        seconds = 60.0
+    return time.monotonic() + max(0.0, min(seconds, 60.0))
+
+def build_pool() -> BackendPool:
+    """설정(LLM_BACKEND, ANTHROPIC_API_KEYS)에 따라 백엔드 풀 생성"""
+    if LLM_BACKEND == 'local':
+        return BackendPool([LocalBackend(index) for index in range(max(1, LLM_LOCAL_BACKENDS))])
+    if LLM_BACKEND != 'anthropic':
+        raise ValueError(f"알 수 없는 LLM_BACKEND입니다: {LLM_BACKEND}")
+    if not ANTHROPIC_API_KEYS:
+        raise ValueError("ANTHROPIC_API_KEY가 설정되지 않았습니다.")
+
+    backends = []
+    for spec in ANTHROPIC_API_KEYS:
+        api_key, _, model = spec.partition(':')
+        backends.append(AnthropicBackend(api_key, model or None))
+    return BackendPool(backends)
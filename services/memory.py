@@ -0,0 +1,48 @@
+"""
+메모리 사용량 보고 모듈
+
+이 모듈은 주요 구성 요소가 차지하는 메모리를 객체 그래프를 따라가며 추정합니다.
+"""
+
+import sys
+from collections import deque
+from types import FunctionType, MethodType, ModuleType
+from typing import Dict
+
+def deep_sizeof(obj, seen: set = None) -> int:
+    """객체와 참조하는 객체들의 메모리 크기 합계(바이트) 추정"""
+    if seen is None:
+        seen = set()
+    stack = [obj]
+    total = 0
+
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+
+        # 클래스/모듈/함수는 공유 객체이므로 따라가지 않음
+        if isinstance(current, (type, ModuleType, FunctionType, MethodType)):
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            stack.extend(current)
+        else:
+            if hasattr(current, '__dict__'):
+                stack.append(vars(current))
+            for slot in getattr(type(current), '__slots__', ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+
+    return total
+
+def memory_report(components: Dict[str, object]) -> Dict[str, int]:
+    """구성 요소별 메모리 사용량(바이트) 보고 (큰 순서)"""
+    # 여러 구성 요소가 공유하는 객체는 처음 센 곳에만 포함
+    seen = set()
+    report = {name: deep_sizeof(component, seen) for name, component in components.items()}
+    return dict(sorted(report.items(), key=lambda item: item[1], reverse=True))
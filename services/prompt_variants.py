@@ -0,0 +1,113 @@
+"""
+프롬프트 변형 실험 모듈
+
+이 모듈은 prompts/<변형 id>/ 아래의 버전별 프롬프트 파일을 불러오고,
+사용자를 텔레그램 ID 해시로 변형에 고정 배정합니다.
+
+- summary.system.txt / summary.human.txt: 1단계(아이디어) 프롬프트
+- analysis.system.txt / analysis.human.txt: 2단계(실행 전략) 프롬프트
+
+변형 id는 분석 결과와 함께 저장되어 변형별 소요 시간, 토큰 수, 파싱 성공률을 비교합니다.
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from langchain.prompts import ChatPromptTemplate
+from config import PROMPT_EXPERIMENT, PROMPT_VARIANTS, PROMPTS_DIR
+
+# 상대 경로는 저장소 루트 기준
+PROMPTS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), PROMPTS_DIR)
+
+# 변형 하나를 구성하는 프롬프트 파일
+PROMPT_FILES = ('summary.system', 'summary.human', 'analysis.system', 'analysis.human')
+
+class PromptVariant:
+    """버전별 1단계/2단계 프롬프트"""
+    __slots__ = ('variant_id', 'summary_prompt', 'analysis_prompt')
+
+    def __init__(self, variant_id: str, texts: Dict[str, str]):
+        self.variant_id = variant_id
+        self.summary_prompt = ChatPromptTemplate.from_messages([
+            ("system", texts['summary.system']),
+            ("human", texts['summary.human'])
+        ])
+        self.analysis_prompt = ChatPromptTemplate.from_messages([
+            ("system", texts['analysis.system']),
+            ("human", texts['analysis.human'])
+        ])
+
+    @property
+    def summary_system(self) -> str:
+        return self.summary_prompt.messages[0].prompt.template
+
+    @property
+    def analysis_system(self) -> str:
+        return self.analysis_prompt.messages[0].prompt.template
+
+    def summary_content(self, data: Dict) -> str:
+        """1단계 사용자 메시지"""
+        return self.summary_prompt.messages[1].prompt.template.format(**data)
+
+    def analysis_content(self, ideas: str) -> str:
+        """2단계 사용자 메시지"""
+        return self.analysis_prompt.messages[1].prompt.template.format(ideas=ideas)
+
+def load_variant(variant_id: str, path: str = PROMPTS_PATH) -> PromptVariant:
+    """변형 디렉터리의 프롬프트 파일 로드 (파일이 없으면 FileNotFoundError)"""
+    texts = {}
+    for name in PROMPT_FILES:
+        with open(os.path.join(path, variant_id, f"{name}.txt"), encoding='utf-8') as f:
+            texts[name] = f.read().strip()
+    return PromptVariant(variant_id, texts)
+
+def available_variants(path: str = PROMPTS_PATH) -> List[str]:
+    """프롬프트 디렉터리에 있는 변형 id 목록"""
+    return sorted(
+        name for name in os.listdir(path)
+        if all(os.path.isfile(os.path.join(path, name, f"{file}.txt")) for file in PROMPT_FILES)
+    )
+
+def parse_weights(spec: str) -> 'OrderedDict[str, int]':
+    """'v1:90,v2-compact:10' 형식의 배정 비율 파싱 (비율을 생략하면 1)"""
+    weights = OrderedDict()
+    for item in spec.split(','):
+        variant_id, _, weight = item.strip().partition(':')
+        if variant_id:
+            weights[variant_id] = int(weight or 1)
+    if not weights or sum(weights.values()) <= 0:
+        raise ValueError(f"프롬프트 변형 비율이 올바르지 않습니다: {spec!r}")
+    return weights
+
+class PromptExperiment:
+    """사용자를 변형에 고정 배정하는 실험 (비율 0인 변형은 오프라인 재실행용으로만 로드)"""
+    def __init__(self, spec: str = PROMPT_VARIANTS, salt: str = PROMPT_EXPERIMENT, path: str = PROMPTS_PATH):
+        """실험 초기화 (설정된 변형의 프롬프트 파일을 모두 로드)"""
+        self.salt = salt
+        self.weights = parse_weights(spec)
+        self.total = sum(self.weights.values())
+        self.variants = {variant_id: load_variant(variant_id, path) for variant_id in self.weights}
+        # 배정 대상이 아닌 호출(자체 점검 등)에 쓰는 기본 변형
+        self.default = next(iter(self.weights))
+
+    @property
+    def active(self) -> bool:
+        """두 개 이상의 변형에 사용자가 배정되는지 여부"""
+        return sum(1 for weight in self.weights.values() if weight > 0) > 1
+
+    def assign(self, telegram_id) -> str:
+        """텔레그램 ID 해시로 변형 배정 (같은 사용자는 항상 같은 변형)"""
+        if telegram_id is None:
+            return self.default
+        digest = hashlib.sha256(f"{self.salt}:{telegram_id}".encode()).digest()
+        bucket = int.from_bytes(digest[:8], 'big') % self.total
+        for variant_id, weight in self.weights.items():
+            if bucket < weight:
+                return variant_id
+            bucket -= weight
+        return self.default
+
+    def get(self, variant_id: Optional[str] = None) -> PromptVariant:
+        """변형 조회 (없거나 알 수 없는 id면 기본 변형)"""
+        return self.variants.get(variant_id) or self.variants[self.default]
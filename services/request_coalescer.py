@@ -0,0 +1,110 @@
+"""
+요청 병합(single-flight) 모듈
+
+이 모듈은 동일한 답변 조합으로 동시에 들어온 분석 요청을 하나의 작업으로 합칩니다.
+같은 키로 진행 중인 작업이 있으면 새 LLM 호출 없이 그 결과를 함께 기다립니다.
+선택적으로 PostgreSQL advisory lock을 사용해 여러 레플리카 사이에서도 병합합니다.
+레플리카 간 공유 결과는 잠금 보유자를 기다리는 동안 저장된 것만 사용하며, 결과 캐시로 쓰지 않습니다.
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Awaitable, Callable, Dict, Optional
+
+import database
+from services.tracing import tracer
+from config import (
+    COALESCE_ACROSS_REPLICAS,
+    COALESCE_LOCK_TIMEOUT,
+    COALESCE_POLL_INTERVAL
+)
+
+# 요청 키를 구성하는 답변 항목
+REQUEST_FIELDS = (
+    'content_category',
+    'content_topic',
+    'target_age',
+    'target_interest',
+    'platform',
+    'hook_point'
+)
+
+def make_request_key(data: Dict) -> str:
+    """답변 조합을 정규화하여 요청 키 생성"""
+    canonical = {}
+    for field in REQUEST_FIELDS:
+        value = data.get(field) or ''
+        # 공백/대소문자 차이는 같은 요청으로 취급
+        canonical[field] = ' '.join(str(value).split()).casefold()
+    payload = json.dumps(canonical, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class RequestCoalescer:
+    """진행 중인 동일 요청을 하나의 작업으로 합치는 클래스"""
+    def __init__(self, across_replicas: bool = COALESCE_ACROSS_REPLICAS):
+        """병합기 초기화"""
+        self.across_replicas = across_replicas
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.stats = {'leaders': 0, 'followers': 0, 'shared_hits': 0}
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Optional[Dict]]]) -> Optional[Dict]:
+        """같은 키의 작업이 진행 중이면 합류하고, 없으면 새로 실행"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._execute(key, factory))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t))
+            self.stats['leaders'] += 1
+            tracer.current_span().set_attribute('coalesce.role', 'leader')
+        else:
+            self.stats['followers'] += 1
+            tracer.current_span().set_attribute('coalesce.role', 'follower')
+
+        # 대기자 하나가 취소되어도 공유 작업은 계속 진행
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: str, task: asyncio.Task) -> None:
+        """완료된 작업 정리"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 모든 대기자가 취소된 경우에도 예외를 회수하여 경고 방지
+        if not task.cancelled():
+            task.exception()
+
+    async def _execute(self, key: str, factory: Callable[[], Awaitable[Optional[Dict]]]) -> Optional[Dict]:
+        """실제 작업 실행 (레플리카 간 병합 포함)"""
+        if not self.across_replicas:
+            return await factory()
+
+        try:
+            conn = await asyncio.to_thread(database.open_lock_connection)
+        except Exception as e:
+            print(f"advisory lock 연결 실패 (로컬 병합만 사용): {e}")
+            return await factory()
+
+        acquired = False
+        try:
+            loop = asyncio.get_running_loop()
+            wait_started = loop.time()
+            deadline = wait_started + COALESCE_LOCK_TIMEOUT
+            acquired = await asyncio.to_thread(database.try_advisory_lock, conn, key)
+
+            # 다른 레플리카가 실행 중이면 잠금이 풀릴 때까지 대기
+            while not acquired and loop.time() < deadline:
+                await asyncio.sleep(COALESCE_POLL_INTERVAL)
+                acquired = await asyncio.to_thread(database.try_advisory_lock, conn, key)
+                # 기다리기 시작한 뒤 잠금 보유자가 저장한 결과만 사용
+                shared = await asyncio.to_thread(database.find_shared_result, key, loop.time() - wait_started)
+                if shared is not None:
+                    self.stats['shared_hits'] += 1
+                    # LLM 토큰 사용량은 실제로 실행한 레플리카에서만 기록
+                    shared.pop('llm_usage', None)
+                    return shared
+
+            result = await factory()
+            if result and acquired:
+                await asyncio.to_thread(database.save_shared_result, key, result, COALESCE_LOCK_TIMEOUT * 2)
+            return result
+        finally:
+            await asyncio.to_thread(database.close_lock_connection, conn, key if acquired else None)
@@ -0,0 +1,69 @@
+"""
+분석 결과 파싱 모듈
+
+이 모듈은 2단계(실행 전략) LLM 응답 텍스트를 섹션별 항목 리스트로 변환합니다.
+외부 의존성이 없으므로 벤치마크와 오프라인 도구에서도 그대로 사용할 수 있습니다.
+"""
+
+from typing import Dict, List
+
+# 응답 섹션 제목 -> 결과 키
+SECTION_MAPPING = {
+    '콘텐츠 제작 전략': 'production_strategy',
+    '참여 유도 전략': 'engagement_strategy',
+    '성장 전략': 'growth_strategy'
+}
+
+def parse_section_lines(lines: List[str]) -> List[str]:
+    """섹션 내용(공백 제거된 줄 목록)을 항목 리스트로 파싱"""
+    result = []
+    append = result.append
+
+    for line in lines:
+        if line.startswith('- '):
+            if ':' in line:
+                label, value = line[2:].split(':', 1)
+                append(f"# {label.strip()}".strip())
+                value = value.strip()
+                if value:
+                    append(f"- {value}")
+            else:
+                append(line)
+        else:
+            append(f"- {line}")
+
+    return result
+
+def parse_section_content(content: str) -> List[str]:
+    """섹션 내용 텍스트를 항목 리스트로 파싱"""
+    if not content:
+        return []
+    return parse_section_lines([line.strip() for line in content.split('\n') if line.strip()])
+
+def parse_analysis(analysis: str) -> Dict[str, List[str]]:
+    """실행 전략 응답을 섹션별 항목 리스트로 파싱"""
+    sections = {key: [] for key in SECTION_MAPPING.values()}
+    current_section = None
+    current_content = []
+
+    def flush():
+        mapped_section = SECTION_MAPPING.get(current_section)
+        if mapped_section and current_content:
+            sections[mapped_section] = parse_section_lines(current_content)
+
+    for line in analysis.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+
+        if line.startswith('# '):
+            # 이전 섹션의 내용을 처리한 뒤 새로운 섹션 시작
+            flush()
+            current_section = line[2:].strip()
+            current_content = []
+        else:
+            current_content.append(line)
+
+    # 마지막 섹션 처리
+    flush()
+    return sections
@@ -0,0 +1,162 @@
+"""
+분석 요청 스케줄러 모듈
+
+이 모듈은 LLM 분석 요청의 승인과 실행 순서를 관리합니다.
+사용자별 토큰 버킷/일일 한도로 요청을 승인하고,
+deficit round robin 방식으로 사용자 간 실행 기회를 공평하게 나눕니다.
+대기 시간이 임계값을 넘으면 새 요청을 받지 않고 예상 대기 시간을 알려줍니다.
+"""
+
+import asyncio
+import contextvars
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+import database
+from services.tracing import tracer
+from config import (
+    SCHEDULER_MAX_CONCURRENCY,
+    SCHEDULER_QUANTUM,
+    SHED_WAIT_SECONDS,
+    USER_BURST,
+    USER_DAILY_QUOTA,
+    USER_RATE_PER_MINUTE
+)
+
+class AdmissionRejected(Exception):
+    """요청 승인 거절 예외"""
+    def __init__(self, reason: str, estimated_wait: float = 0.0):
+        super().__init__(reason)
+        self.reason = reason  # 'rate_limited' | 'daily_quota' | 'overloaded'
+        self.estimated_wait = estimated_wait
+
+class _Job:
+    """대기열 작업"""
+    __slots__ = ('factory', 'future', 'cost', 'enqueued_at', 'context')
+
+    def __init__(self, factory, future, cost):
+        self.factory = factory
+        self.future = future
+        self.cost = cost
+        self.enqueued_at = time.monotonic()
+        # 다른 요청의 디스패치 중에 시작되어도 원래 요청의 트레이스에 연결되도록 보관
+        self.context = contextvars.copy_context()
+
+class FairScheduler:
+    """사용자 간 공평 분배 스케줄러"""
+    def __init__(self, max_concurrency: int = SCHEDULER_MAX_CONCURRENCY, quantum: float = SCHEDULER_QUANTUM):
+        """스케줄러 초기화"""
+        self.max_concurrency = max_concurrency
+        self.quantum = quantum
+        self._queues: Dict[str, Deque[_Job]] = {}
+        self._deficits: Dict[str, float] = {}
+        self._active: Deque[str] = deque()
+        self._running = 0
+        # 작업 1건당 평균 처리 시간 (지수 이동 평균, 초)
+        self._avg_service_time = 30.0
+        self.stats = {'admitted': 0, 'rate_limited': 0, 'daily_quota': 0, 'overloaded': 0}
+
+    def estimate_wait(self, user_id: str) -> float:
+        """해당 사용자의 새 요청이 실행되기까지 예상 대기 시간(초)"""
+        own = len(self._queues.get(user_id, ()))
+        # DRR에서는 각 사용자가 내 요청 수 + 1건까지만 앞설 수 있음
+        ahead = sum(min(len(queue), own + 1) for uid, queue in self._queues.items() if uid != user_id) + own
+        slots_busy = self._running + ahead - self.max_concurrency + 1
+        if slots_busy <= 0:
+            return 0.0
+        return slots_busy / self.max_concurrency * self._avg_service_time
+
+    async def admit(self, user_id: str) -> None:
+        """사용자 한도와 대기 시간을 확인하여 요청 승인"""
+        user_id = str(user_id)
+        wait = self.estimate_wait(user_id)
+        if wait > SHED_WAIT_SECONDS:
+            self.stats['overloaded'] += 1
+            raise AdmissionRejected('overloaded', wait)
+
+        allowed, reason = await asyncio.to_thread(
+            database.consume_quota,
+            user_id,
+            USER_RATE_PER_MINUTE / 60.0,
+            USER_BURST,
+            USER_DAILY_QUOTA
+        )
+        if not allowed:
+            self.stats[reason] += 1
+            raise AdmissionRejected(reason, wait)
+        self.stats['admitted'] += 1
+
+    async def run(self, user_id: str, factory: Callable[[], Awaitable], cost: float = 1.0):
+        """대기열에 작업을 넣고 차례가 되면 실행하여 결과 반환"""
+        user_id = str(user_id)
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues.get(user_id)
+        if queue is None:
+            queue = self._queues[user_id] = deque()
+            self._deficits[user_id] = 0.0
+            self._active.append(user_id)
+        queue.append(_Job(factory, future, cost))
+        self._dispatch()
+        return await future
+
+    def _dispatch(self) -> None:
+        """deficit round robin으로 실행 슬롯 배분"""
+        while self._running < self.max_concurrency and self._active:
+            user_id = self._active[0]
+            queue = self._queues[user_id]
+
+            # 취소된 작업은 건너뜀
+            while queue and queue[0].future.done():
+                queue.popleft()
+
+            if queue and queue[0].cost <= self._deficits[user_id] + self.quantum:
+                self._deficits[user_id] += self.quantum
+                job = queue.popleft()
+                self._deficits[user_id] -= job.cost
+                self._start(job)
+            elif queue:
+                self._deficits[user_id] += self.quantum
+
+            if not queue:
+                self._active.popleft()
+                del self._queues[user_id]
+                del self._deficits[user_id]
+            else:
+                self._active.rotate(-1)
+
+    def _start(self, job: _Job) -> None:
+        """작업 실행"""
+        self._running += 1
+        started_at = time.monotonic()
+        wait_ms = round((started_at - job.enqueued_at) * 1000, 1)
+        # 현재 스팬 조회도 작업 컨텍스트 안에서 해야 디스패치 중인 다른 요청의 스팬에 기록되지 않음
+        job.context.run(lambda: tracer.current_span().set_attribute('scheduler.queue_wait_ms', wait_ms))
+        task = asyncio.get_running_loop().create_task(job.factory(), context=job.context)
+
+        def _finish(t: asyncio.Task):
+            self._running -= 1
+            elapsed = time.monotonic() - started_at
+            self._avg_service_time = 0.8 * self._avg_service_time + 0.2 * elapsed
+            if not job.future.done():
+                if t.cancelled():
+                    job.future.cancel()
+                elif t.exception() is not None:
+                    job.future.set_exception(t.exception())
+                else:
+                    job.future.set_result(t.result())
+            elif not t.cancelled():
+                t.exception()
+            self._dispatch()
+
+        task.add_done_callback(_finish)
+
+    def snapshot(self) -> Dict:
+        """현재 스케줄러 상태 반환"""
+        return {
+            'running': self._running,
+            'queued': sum(len(queue) for queue in self._queues.values()),
+            'active_users': len(self._active),
+            'avg_service_time': round(self._avg_service_time, 2),
+            **self.stats
+        }
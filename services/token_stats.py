@@ -0,0 +1,99 @@
+"""
+출력 토큰 통계 모듈
+
+이 모듈은 단계별/카테고리별/플랫폼별 실제 출력 토큰 수를 기록하고,
+관측값의 p99에 여유 배수를 곱해 다음 요청의 max_tokens를 정합니다.
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, Tuple
+
+from config import (
+    ADAPTIVE_MAX_TOKENS_CEILING,
+    ADAPTIVE_MAX_TOKENS_FLOOR,
+    ADAPTIVE_MAX_TOKENS_MARGIN,
+    ADAPTIVE_MIN_SAMPLES,
+    ADAPTIVE_WINDOW
+)
+
+# 집계 키의 와일드카드
+ANY = '*'
+
+class OutputTokenStats:
+    """출력 토큰 통계 및 적응형 max_tokens 계산 클래스"""
+    def __init__(
+        self,
+        window: int = ADAPTIVE_WINDOW,
+        margin: float = ADAPTIVE_MAX_TOKENS_MARGIN,
+        floor: int = ADAPTIVE_MAX_TOKENS_FLOOR,
+        ceiling: int = ADAPTIVE_MAX_TOKENS_CEILING,
+        min_samples: int = ADAPTIVE_MIN_SAMPLES
+    ):
+        """통계 초기화"""
+        self.window = window
+        self.margin = margin
+        self.floor = floor
+        self.ceiling = ceiling
+        self.min_samples = min_samples
+        self._samples: Dict[Tuple[str, str, str], Deque[int]] = {}
+        self._truncations: Dict[Tuple[str, str, str], int] = {}
+        # LLM 호출은 스레드에서 실행되므로 잠금 필요
+        self._lock = threading.Lock()
+
+    def _keys(self, stage: str, category: str, platform: str):
+        """세부 키부터 단계 전체 키까지 반환"""
+        return [
+            (stage, category or ANY, platform or ANY),
+            (stage, category or ANY, ANY),
+            (stage, ANY, ANY)
+        ]
+
+    def record(self, stage: str, category: str, platform: str, output_tokens: int, truncated: bool = False) -> None:
+        """실제 출력 토큰 수 기록"""
+        # 잘린 응답은 실제 필요량의 하한이므로 더 크게 기록
+        value = min(self.ceiling, output_tokens * 2) if truncated else output_tokens
+        with self._lock:
+            for key in dict.fromkeys(self._keys(stage, category, platform)):
+                samples = self._samples.get(key)
+                if samples is None:
+                    samples = self._samples[key] = deque(maxlen=self.window)
+                samples.append(value)
+                if truncated:
+                    self._truncations[key] = self._truncations.get(key, 0) + 1
+
+    @staticmethod
+    def _percentile(values, q: float) -> int:
+        """정렬된 값에서 백분위수 계산"""
+        index = max(0, math.ceil(q * len(values)) - 1)
+        return values[index]
+
+    def max_tokens(self, stage: str, category: str = None, platform: str = None) -> int:
+        """관측된 p99 × 여유 배수로 max_tokens 결정"""
+        with self._lock:
+            for key in self._keys(stage, category, platform):
+                samples = self._samples.get(key)
+                if samples and len(samples) >= self.min_samples:
+                    p99 = self._percentile(sorted(samples), 0.99)
+                    return max(self.floor, min(self.ceiling, int(p99 * self.margin)))
+        # 표본이 부족하면 상한값 사용
+        return self.ceiling
+
+    def snapshot(self) -> Dict:
+        """키별 통계와 현재 적용되는 max_tokens 반환"""
+        with self._lock:
+            items = [(key, sorted(samples)) for key, samples in self._samples.items()]
+            truncations = dict(self._truncations)
+
+        result = {}
+        for key, values in items:
+            result[' | '.join(key)] = {
+                'samples': len(values),
+                'p50': self._percentile(values, 0.5),
+                'p99': self._percentile(values, 0.99),
+                'max': values[-1],
+                'truncated': truncations.get(key, 0),
+                'max_tokens': self.max_tokens(*key)
+            }
+        return result
@@ -0,0 +1,175 @@
+"""
+주제 검색 인덱스 모듈
+
+이 모듈은 지금까지 생성된 분석 결과를 주제(content_topic) 기준으로 색인하여
+인라인 질의(@bot 홈트레이닝)에 즉시 답할 수 있게 합니다.
+
+- 접두어: 주제 전체와 각 단어를 정렬된 목록에 넣고 이진 탐색으로 찾습니다 (짧은 질의용).
+- 트라이그램: 3글자 조각이 겹치는 비율로 오타/부분 일치를 찾습니다.
+- 카테고리: 질의가 정규 카테고리 레이블과 겹치면 해당 카테고리의 결과도 포함합니다.
+
+새 분석은 저장될 때 바로 추가되고, 다른 레플리카가 저장한 분석은 워터마크 이후 행을 주기적으로 가져옵니다.
+"""
+
+import bisect
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Set, Tuple
+
+import database
+from config import TOPIC_INDEX_DAYS, TOPIC_INDEX_MAX_ENTRIES
+from services.labels import CATEGORY_OPTIONS, canonical_label
+
+# 색인에 보관하는 1단계 아이디어 길이 (인라인 결과 메시지용)
+IDEAS_SNIPPET_LENGTH = 1000
+
+# 정규 카테고리 레이블 (질의와 비교용)
+CATEGORY_LABELS = tuple(canonical_label(option) for option in CATEGORY_OPTIONS)
+
+_NON_WORD = re.compile(r'[^\w]+')
+
+def normalize(text: str) -> str:
+    """소문자로 바꾸고 기호를 공백 하나로 정리"""
+    return _NON_WORD.sub(' ', (text or '').lower()).strip()
+
+def trigrams(text: str) -> Set[str]:
+    """공백을 제외한 3글자 조각 집합"""
+    compact = text.replace(' ', '')
+    return {compact[i:i + 3] for i in range(len(compact) - 2)}
+
+class TopicEntry:
+    """색인된 분석 결과 하나"""
+    __slots__ = ('result_id', 'topic', 'category', 'platform', 'ideas', 'seq')
+
+    def __init__(self, result_id, topic: str, category: str, platform: str, ideas: str, seq: int):
+        self.result_id = result_id
+        self.topic = topic
+        self.category = category
+        self.platform = platform
+        self.ideas = ideas
+        self.seq = seq
+
+# 같은 주제/카테고리/플랫폼은 최신 결과 하나만 보관
+EntryKey = Tuple[str, str, str]
+
+class TopicIndex:
+    """주제 접두어/트라이그램 검색 인덱스"""
+    def __init__(self, max_entries: int = TOPIC_INDEX_MAX_ENTRIES, days: int = TOPIC_INDEX_DAYS):
+        """인덱스 초기화"""
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[EntryKey, TopicEntry]' = OrderedDict()
+        self._prefixes: List[Tuple[str, EntryKey]] = []  # (주제 또는 단어, 키) 정렬 목록
+        self._trigrams: Dict[str, Set[EntryKey]] = {}
+        self._by_category: Dict[str, Set[EntryKey]] = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+
+        # 워터마크 (최근 days일 이내 분석부터 수집)
+        self.last_id = 0
+        self.last_created_at = datetime.now(timezone.utc) - timedelta(days=days)
+
+    def add(self, result_id, input_data: Dict, result: Dict) -> None:
+        """분석 결과 하나를 색인 (같은 키의 이전 결과는 교체)"""
+        topic = (input_data.get('content_topic') or '').strip()
+        normalized = normalize(topic)
+        if not normalized:
+            return
+        category = canonical_label(input_data.get('content_category'))
+        platform = canonical_label(input_data.get('platform'))
+        key = (normalized, category, platform)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._seq += 1
+            self._entries[key] = TopicEntry(
+                result_id, topic, category, platform,
+                (result.get('ideas') or '')[:IDEAS_SNIPPET_LENGTH], self._seq
+            )
+            for token in {normalized, *normalized.split(' ')}:
+                bisect.insort(self._prefixes, (token, key))
+            for gram in trigrams(normalized):
+                self._trigrams.setdefault(gram, set()).add(key)
+            self._by_category.setdefault(category, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: EntryKey) -> None:
+        """항목과 보조 색인 제거 (잠금 안에서 호출)"""
+        entry = self._entries.pop(key)
+        for token in {key[0], *key[0].split(' ')}:
+            index = bisect.bisect_left(self._prefixes, (token, key))
+            if index < len(self._prefixes) and self._prefixes[index] == (token, key):
+                del self._prefixes[index]
+        for gram in trigrams(key[0]):
+            keys = self._trigrams.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._trigrams[gram]
+        keys = self._by_category.get(entry.category)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_category[entry.category]
+
+    def search(self, query: str, limit: int = 10) -> List[TopicEntry]:
+        """질의와 가장 잘 맞는 결과 (빈 질의면 최신 결과)"""
+        normalized = normalize(query)
+        with self._lock:
+            if not normalized:
+                return [self._entries[key] for key in reversed(list(self._entries)[-limit:])]
+
+            scores: Dict[EntryKey, float] = {}
+
+            # 접두어 일치 (주제 전체 > 단어)
+            index = bisect.bisect_left(self._prefixes, (normalized,))
+            while index < len(self._prefixes) and self._prefixes[index][0].startswith(normalized):
+                token, key = self._prefixes[index]
+                score = 3.0 if token == key[0] else 2.0
+                scores[key] = max(scores.get(key, 0.0), score)
+                index += 1
+
+            # 트라이그램 겹침 비율
+            grams = trigrams(normalized)
+            if grams:
+                hits: Dict[EntryKey, int] = {}
+                for gram in grams:
+                    for key in self._trigrams.get(gram, ()):
+                        hits[key] = hits.get(key, 0) + 1
+                for key, count in hits.items():
+                    ratio = count / len(grams)
+                    if ratio >= 0.3:
+                        scores[key] = scores.get(key, 0.0) + 2.0 * ratio
+
+            # 카테고리 레이블 일치
+            for label in CATEGORY_LABELS:
+                if normalized in normalize(label):
+                    for key in self._by_category.get(label, ()):
+                        scores[key] = scores.get(key, 0.0) + 1.0
+
+            ranked = sorted(scores, key=lambda key: (scores[key], self._entries[key].seq), reverse=True)
+            return [self._entries[key] for key in ranked[:limit]]
+
+    def mine(self, batch_size: int = 1000) -> int:
+        """워터마크 이후 저장된 분석 결과 색인 (시작 시 초기 적재 겸 주기 작업)"""
+        processed = 0
+        while True:
+            rows = database.get_analyses_since(self.last_id, self.last_created_at, batch_size)
+            for row in rows:
+                self.add(row['id'], row['input_data'] or {}, row['result'] or {})
+                self.last_id = row['id']
+                self.last_created_at = row['created_at']
+            processed += len(rows)
+            if len(rows) < batch_size:
+                break
+        return processed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# 프로세스 전역 인덱스
+topic_index = TopicIndex()
@@ -0,0 +1,309 @@
+"""
+분산 추적 모듈
+
+이 모듈은 업데이트 하나를 처리하는 동안의 핸들러, LLM 호출, DB 쓰기, 텔레그램 전송을
+하나의 트레이스(부모-자식 스팬)로 기록합니다.
+
+- 현재 스팬은 contextvars로 전달되므로 asyncio 태스크와 asyncio.to_thread 안에서도 이어집니다.
+- 루트 스팬이 끝날 때 트레이스 전체를 보고 보관 여부를 결정합니다(tail-based sampling).
+  오류가 있거나 TRACE_SLOW_MS 이상 걸린 트레이스는 항상 보관하고, 나머지는 TRACE_SAMPLE_RATE 비율로 보관합니다.
+- 보관된 스팬은 백그라운드 스레드가 모아서 싱크로 내보냅니다 (기본: OTLP 호환 JSON 파일).
+- TRACING_ENABLED가 꺼져 있으면 span()은 공유 no-op 객체를 반환하므로 비용이 거의 없습니다.
+"""
+
+import contextvars
+import functools
+import hashlib
+import importlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+
+from config import (
+    TRACE_EXPORT_BATCH_SIZE,
+    TRACE_EXPORT_INTERVAL,
+    TRACE_FILE_PATH,
+    TRACE_SAMPLE_RATE,
+    TRACE_SINK,
+    TRACE_SLOW_MS,
+    TRACING_ENABLED
+)
+
+SERVICE_NAME = 'starlenz-bot'
+
+# 현재 스팬
+_current_span: contextvars.ContextVar = contextvars.ContextVar('current_span', default=None)
+
+def hash_user_id(user_id) -> str:
+    """사용자 id를 추적용 해시로 변환 (원본 id는 기록하지 않음)"""
+    return hashlib.sha256(f"{SERVICE_NAME}:{user_id}".encode()).hexdigest()[:16]
+
+class _NoopSpan:
+    """추적이 꺼져 있을 때 사용하는 빈 스팬"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+    def set_attributes(self, **attributes) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+class Span:
+    """추적 스팬"""
+    __slots__ = ('tracer', 'trace_id', 'span_id', 'parent_id', 'name', 'attributes',
+                 'start_ns', 'end_ns', 'error', '_token')
+
+    def __init__(self, tracer: 'Tracer', name: str, parent: Optional['Span'], attributes: Dict):
+        self.tracer = tracer
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns = 0
+        self.error = None
+        self._token = None
+
+    def __enter__(self):
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        if exc is not None and not isinstance(exc, GeneratorExit):
+            self.error = f"{exc_type.__name__}: {exc}"
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # 다른 컨텍스트에서 종료된 경우
+            pass
+        self.tracer._on_end(self)
+        return False
+
+    def set_attribute(self, key: str, value) -> None:
+        """속성 설정"""
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes) -> None:
+        """여러 속성 설정"""
+        self.attributes.update(attributes)
+
+    def set_error(self, message: str) -> None:
+        """예외 없이 실패한 경우 오류 표시"""
+        self.error = message
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+def _otlp_value(value) -> Dict:
+    """OTLP JSON 속성 값 변환"""
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+def to_otlp(spans: List[Span]) -> Dict:
+    """스팬 목록을 OTLP/JSON(ExportTraceServiceRequest) 형식으로 변환"""
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': SERVICE_NAME}}]},
+            'scopeSpans': [{
+                'scope': {'name': __name__},
+                'spans': [
+                    {
+                        'traceId': span.trace_id,
+                        'spanId': span.span_id,
+                        **({'parentSpanId': span.parent_id} if span.parent_id else {}),
+                        'name': span.name,
+                        'kind': 1,
+                        'startTimeUnixNano': str(span.start_ns),
+                        'endTimeUnixNano': str(span.end_ns),
+                        'attributes': [{'key': k, 'value': _otlp_value(v)} for k, v in span.attributes.items()],
+                        'status': {'code': 2, 'message': span.error} if span.error else {'code': 1}
+                    }
+                    for span in spans
+                ]
+            }]
+        }]
+    }
+
+class JsonFileSink:
+    """OTLP 호환 JSON Lines 파일 싱크 (배치 하나당 한 줄)"""
+    def __init__(self, path: str = TRACE_FILE_PATH):
+        self.path = path
+
+    def export(self, spans: List[Span]) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(to_otlp(spans), ensure_ascii=False))
+            f.write('\n')
+
+class StdoutSink:
+    """표준 출력 싱크 (디버깅용)"""
+    def export(self, spans: List[Span]) -> None:
+        for span in spans:
+            indent = '  ' if span.parent_id else ''
+            status = f" ERROR {span.error}" if span.error else ''
+            print(f"[trace {span.trace_id[:8]}] {indent}{span.name} {span.duration_ms:.1f}ms {span.attributes}{status}")
+
+def load_sink(spec: str):
+    """설정값으로 싱크 생성 ('file', 'stdout' 또는 '패키지.모듈:클래스')"""
+    if spec == 'file':
+        return JsonFileSink()
+    if spec == 'stdout':
+        return StdoutSink()
+    module_name, _, attr = spec.partition(':')
+    return getattr(importlib.import_module(module_name), attr)()
+
+class Tracer:
+    """스팬 생성, tail-based sampling, 배치 내보내기 관리 클래스"""
+    def __init__(self, enabled: bool = TRACING_ENABLED, sample_rate: float = TRACE_SAMPLE_RATE,
+                 slow_ms: float = TRACE_SLOW_MS, sink=None):
+        """추적기 초기화"""
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self._sink = sink
+        self._lock = threading.Lock()
+        # 진행 중인 트레이스의 종료된 스팬 (루트 종료 시 보관 여부 결정)
+        self._pending: Dict[str, List[Span]] = {}
+        # 최근 결정 결과 (루트 종료 후 끝난 스팬 처리용)
+        self._decisions: 'OrderedDict[str, bool]' = OrderedDict()
+        self._queue: deque = deque(maxlen=TRACE_EXPORT_BATCH_SIZE * 100)
+        self._wakeup = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self.stats = {'kept': 0, 'dropped': 0, 'exported_spans': 0, 'export_errors': 0}
+
+    def set_sink(self, sink) -> None:
+        """내보내기 싱크 변경"""
+        self._sink = sink
+
+    def current_span(self):
+        """현재 스팬 (없으면 no-op 스팬)"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _current_span.get() or _NOOP_SPAN
+
+    def has_active_span(self) -> bool:
+        """현재 컨텍스트에 열린 스팬이 있는지 여부"""
+        return self.enabled and _current_span.get() is not None
+
+    def span(self, name: str, **attributes):
+        """현재 스팬의 자식 스팬 생성 (현재 스팬이 없으면 새 트레이스 시작)"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, _current_span.get(), attributes)
+
+    def start_trace(self, name: str, **attributes):
+        """새 트레이스의 루트 스팬 생성"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, None, attributes)
+
+    def _on_end(self, span: Span) -> None:
+        """스팬 종료 처리"""
+        with self._lock:
+            if span.parent_id is not None:
+                decision = self._decisions.get(span.trace_id)
+                if decision is None:
+                    self._pending.setdefault(span.trace_id, []).append(span)
+                elif decision:
+                    self._queue.append(span)
+                return
+
+            # 루트 스팬 종료: 트레이스 보관 여부 결정
+            spans = self._pending.pop(span.trace_id, [])
+            spans.append(span)
+            keep = (
+                span.duration_ms >= self.slow_ms
+                or any(s.error for s in spans)
+                or random.random() < self.sample_rate
+            )
+            self._decisions[span.trace_id] = keep
+            if len(self._decisions) > 10000:
+                self._decisions.popitem(last=False)
+
+            if keep:
+                self.stats['kept'] += 1
+                self._queue.extend(spans)
+            else:
+                self.stats['dropped'] += 1
+
+        if keep:
+            self._ensure_worker()
+            if len(self._queue) >= TRACE_EXPORT_BATCH_SIZE:
+                self._wakeup.set()
+
+    def _ensure_worker(self) -> None:
+        """내보내기 스레드 시작"""
+        if self._worker is None or not self._worker.is_alive():
+            if self._sink is None:
+                self._sink = load_sink(TRACE_SINK)
+            self._worker = threading.Thread(target=self._export_loop, name='trace-exporter', daemon=True)
+            self._worker.start()
+
+    def _export_loop(self) -> None:
+        """주기적으로(또는 배치가 차면) 스팬 내보내기"""
+        while True:
+            self._wakeup.wait(TRACE_EXPORT_INTERVAL)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """대기 중인 스팬 모두 내보내기"""
+        while self._queue:
+            batch = []
+            while self._queue and len(batch) < TRACE_EXPORT_BATCH_SIZE:
+                batch.append(self._queue.popleft())
+            try:
+                self._sink.export(batch)
+                self.stats['exported_spans'] += len(batch)
+            except Exception as e:
+                self.stats['export_errors'] += 1
+                print(f"트레이스 내보내기 실패 (배치 버림): {e}", file=sys.stderr)
+
+    def shutdown(self) -> None:
+        """종료 시 남은 스팬 내보내기"""
+        if self._sink is not None:
+            self.flush()
+
+def traced(name: Optional[str] = None):
+    """비동기 함수를 스팬으로 감싸는 데코레이터"""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return await func(*args, **kwargs)
+            with tracer.span(span_name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# 프로세스 전역 추적기
+tracer = Tracer()
@@ -0,0 +1,165 @@
+"""
+사용자 상태 관리 모듈
+
+이 모듈은 대화 중인 사용자의 답변과 최근 분석 결과 참조를 메모리 한도 안에서 관리합니다.
+
+- 답변은 고정 슬롯 레코드에 저장하며, 선택지 답변은 긴 이모지 문자열 대신 작은 정수 코드로 보관합니다.
+- 사용자 상태는 유휴 시간(TTL)이 지나거나 최대 개수를 넘으면 오래된 것부터 제거됩니다(LRU).
+- 분석 결과는 상태에 직접 담지 않고 id로 참조하며, 크기가 제한된 결과 캐시나 DB에서 조회합니다.
+"""
+
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
+import database
+from config import RESULT_CACHE_SIZE, USER_STATE_IDLE_TTL, USER_STATE_MAX_ENTRIES
+from services.labels import AGE_OPTIONS, CATEGORY_OPTIONS, HOOK_OPTIONS, INTEREST_OPTIONS, PLATFORM_OPTIONS
+
+# 답변 항목 -> 선택지 목록 (주제는 자유 입력)
+ANSWER_OPTIONS = {
+    'content_category': CATEGORY_OPTIONS,
+    'content_topic': (),
+    'target_age': AGE_OPTIONS,
+    'target_interest': INTEREST_OPTIONS,
+    'platform': PLATFORM_OPTIONS,
+    'hook_point': HOOK_OPTIONS
+}
+
+# 선택지 텍스트 -> 코드 (항목별로 미리 계산)
+_OPTION_CODES = {
+    field: {option: code for code, option in enumerate(options)}
+    for field, options in ANSWER_OPTIONS.items()
+}
+
+class AnswerRecord:
+    """사용자 답변 레코드 (선택지는 정수 코드, 그 외 입력은 문자열)"""
+    __slots__ = tuple(ANSWER_OPTIONS)
+
+    def __init__(self):
+        for field in ANSWER_OPTIONS:
+            setattr(self, field, None)
+
+    def set(self, field: str, text: str) -> None:
+        """답변 저장 (선택지에 있으면 코드로 변환)"""
+        code = _OPTION_CODES[field].get(text)
+        setattr(self, field, text if code is None else code)
+
+    def get(self, field: str) -> Optional[str]:
+        """답변 텍스트 반환"""
+        value = getattr(self, field)
+        if isinstance(value, int):
+            return ANSWER_OPTIONS[field][value]
+        return value
+
+    def to_dict(self) -> Dict[str, Optional[str]]:
+        """분석 요청용 답변 딕셔너리"""
+        return {field: self.get(field) for field in ANSWER_OPTIONS}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'AnswerRecord':
+        """답변 딕셔너리로 레코드 생성"""
+        record = cls()
+        for field in ANSWER_OPTIONS:
+            if data.get(field) is not None:
+                record.set(field, data[field])
+        return record
+
+class UserState:
+    """사용자별 대화 상태"""
+    __slots__ = ('answers', 'analysis_id', 'edit_field', 'last_seen')
+
+    def __init__(self):
+        self.answers = AnswerRecord()
+        self.analysis_id: Optional[Union[int, str]] = None
+        self.edit_field: Optional[str] = None  # 결과 후 다시 답하는 중인 항목
+        self.last_seen = time.monotonic()
+
+class UserStateStore:
+    """유휴 TTL + LRU로 크기가 제한된 사용자 상태 저장소"""
+    def __init__(self, max_entries: int = USER_STATE_MAX_ENTRIES, idle_ttl: float = USER_STATE_IDLE_TTL):
+        """저장소 초기화"""
+        self.max_entries = max_entries
+        self.idle_ttl = idle_ttl
+        self._states: 'OrderedDict[int, UserState]' = OrderedDict()
+        self.stats = {'expired': 0, 'evicted': 0}
+
+    def get(self, user_id: int) -> UserState:
+        """사용자 상태 조회 (없으면 생성)"""
+        state = self._states.get(user_id)
+        if state is None:
+            state = self._states[user_id] = UserState()
+        else:
+            self._states.move_to_end(user_id)
+        state.last_seen = time.monotonic()
+        self._evict()
+        return state
+
+    def peek(self, user_id: int) -> Optional[UserState]:
+        """사용 시각을 갱신하지 않고 상태 조회"""
+        return self._states.get(user_id)
+
+    def active_count(self) -> int:
+        """설문 또는 답변 수정이 진행 중인 사용자 수 (분석 결과가 없거나 수정 중인 상태)"""
+        return sum(1 for state in self._states.values() if state.analysis_id is None or state.edit_field is not None)
+
+    def discard(self, user_id: int) -> None:
+        """사용자 상태 삭제"""
+        self._states.pop(user_id, None)
+
+    def _evict(self) -> None:
+        """유휴 시간이 지났거나 한도를 넘은 상태를 오래된 순서로 제거"""
+        deadline = time.monotonic() - self.idle_ttl
+        while self._states:
+            user_id, state = next(iter(self._states.items()))
+            if state.last_seen < deadline:
+                self.stats['expired'] += 1
+            elif len(self._states) > self.max_entries:
+                self.stats['evicted'] += 1
+            else:
+                break
+            del self._states[user_id]
+
+    async def sweep(self) -> None:
+        """주기적으로 만료된 상태 정리 (이벤트 루프에서 실행)"""
+        self._evict()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+class ResultCache:
+    """크기가 제한된 분석 결과 캐시 (id -> 결과, 이벤트 루프에서만 사용)"""
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE):
+        """캐시 초기화"""
+        self.max_entries = max_entries
+        self._results: 'OrderedDict[Union[int, str], Dict]' = OrderedDict()
+        self._local_ids = itertools.count(1)
+
+    def put(self, result: Dict, result_id: Optional[int] = None) -> Union[int, str]:
+        """결과 저장 후 참조 id 반환 (DB id가 없으면 로컬 id 발급)"""
+        if result_id is None:
+            result_id = f"local-{next(self._local_ids)}"
+        self._results[result_id] = result
+        self._results.move_to_end(result_id)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+        return result_id
+
+    async def get(self, result_id: Union[int, str, None]) -> Optional[Dict]:
+        """결과 조회 (캐시에 없으면 DB에서 조회, DB 조회만 스레드에서 실행)"""
+        if result_id is None:
+            return None
+        result = self._results.get(result_id)
+        if result is not None:
+            self._results.move_to_end(result_id)
+            return result
+        if isinstance(result_id, int):
+            result = await asyncio.to_thread(database.get_analysis_result, result_id)
+            if result is not None:
+                self.put(result, result_id)
+        return result
+
+    def __len__(self) -> int:
+        return len(self._results)
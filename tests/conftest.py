@@ -0,0 +1,12 @@
+"""
+테스트 공통 설정
+
+저장소 루트를 import 경로에 추가합니다. DB와 네트워크 없이 실행됩니다.
+"""
+
+import os
+import sys
+
+# 저장소 루트를 import 경로에 추가
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
@@ -0,0 +1,63 @@
+"""해시태그 인덱스 수집 테스트"""
+
+from datetime import datetime
+
+import database
+from services.hashtags import HashtagIndex, extract_hashtags
+
+class FakeCursor:
+    """실행된 SQL과 파라미터를 기록하는 커서"""
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query, params=None):
+        self.conn.queries.append((query, params))
+
+    def fetchall(self):
+        return self.conn.batches.pop(0) if self.conn.batches else []
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.queries = []
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(self)
+
+    def close(self):
+        pass
+
+def row(row_id, created_at, tags):
+    return {
+        'id': row_id,
+        'created_at': created_at,
+        'input_data': {'content_category': '음식/요리', 'platform': '틱톡', 'hook_point': '재미'},
+        'result': {'ideas': ' '.join(f"#{tag}" for tag in tags)}
+    }
+
+def test_extract_hashtags_skips_injected_tags():
+    result = {'ideas': '#Food #food #요리', 'growth_strategy': ['- #recipe'], 'trending_hashtags': ['#ignored']}
+    assert extract_hashtags(result) == ['food', '요리', 'recipe']
+
+def test_mine_from_empty_watermark(monkeypatch):
+    created_at = datetime(2026, 10, 1, 12, 0)
+    conn = FakeConnection([[row(1, created_at, ['food']), row(2, created_at, ['food', 'recipe'])]])
+    monkeypatch.setattr(database, 'connect', lambda: conn)
+
+    index = HashtagIndex(top_k=2)
+    assert index.mine() == 2
+    query, params = conn.queries[0]
+    # 처음 수집할 때는 created_at 하한 없이 조회
+    assert 'created_at >=' not in query
+    assert params['last_id'] == 0
+    assert (index.last_id, index.last_created_at) == (2, created_at)
+    assert index.top('음식/요리', '틱톡', '재미') == ['food', 'recipe']
+
+    # 이후 수집은 마지막 처리 시각 기준으로 최근 파티션만 조회
+    index.mine()
+    query, params = conn.queries[1]
+    assert 'created_at >=' in query
+    assert params['since'] == created_at
@@ -0,0 +1,36 @@
+"""분석 작업 저널 테스트"""
+
+import asyncio
+
+import database
+from services.job_journal import JobTracker
+
+def test_heartbeat_and_stage1_for_tracked_jobs(monkeypatch):
+    touched, stage1_updates = [], []
+    monkeypatch.setattr(database, 'upsert_journal_entry', lambda *args: None)
+    monkeypatch.setattr(database, 'touch_journal_entries', lambda owner, job_ids: touched.append((owner, job_ids)))
+    monkeypatch.setattr(database, 'update_journal_stage1', lambda key, owner, stage1: stage1_updates.append((key, stage1)))
+
+    async def scenario():
+        tracker = JobTracker(owner='replica-1')
+        await tracker.begin(1, 10, 'key:v1', {}, job_id='a')
+        await tracker.begin(2, 20, 'key:v2', {}, job_id='b')
+        await tracker.heartbeat()
+
+        tracker.record_stage1('key:v1', 'ideas')
+        # 저널 기록 태스크는 끝날 때까지 참조를 유지
+        assert len(tracker._writes) == 1
+        await asyncio.gather(*tracker._writes)
+        stages = {job_id: job.stage1 for job_id, job in tracker._jobs.items()}
+
+        tracker.release('a')
+        tracker.release('b')
+        await tracker.heartbeat()
+        return tracker, stages
+
+    tracker, stages = asyncio.run(scenario())
+    assert touched == [('replica-1', ['a', 'b'])]
+    # 다른 프롬프트 변형의 작업에는 1단계 결과를 복사하지 않음
+    assert stages == {'a': 'ideas', 'b': None}
+    assert stage1_updates == [('key:v1', 'ideas')]
+    assert not tracker._writes
@@ -0,0 +1,25 @@
+"""LLM 백엔드 풀 테스트"""
+
+import pytest
+
+from services.llm_backends import BackendPool, LocalBackend
+
+def dedicated(index: int, model: str) -> LocalBackend:
+    backend = LocalBackend(index)
+    backend.model = model
+    return backend
+
+def test_dedicated_backend_only_serves_its_model():
+    general, sonnet = LocalBackend(0), dedicated(1, 'sonnet')
+    pool = BackendPool([general, sonnet])
+    # 일반 백엔드가 바빠도 다른 모델 전용 백엔드로 대신 보내지 않음
+    general.in_flight = 5
+    result = pool.complete('haiku', '# 콘텐츠 제작 전략\n- [촬영 팁]', '콘텐츠 주제/키워드: 요리', 500)
+    assert result.backend == general.name
+    assert result.model == 'haiku'
+    assert pool.complete('sonnet', '', '', 10).backend == sonnet.name
+
+def test_no_backend_for_routed_model():
+    pool = BackendPool([dedicated(0, 'sonnet')])
+    with pytest.raises(ValueError):
+        pool.complete('haiku', '', '', 10)
@@ -0,0 +1,35 @@
+"""프롬프트 변형 배정 테스트"""
+
+import pytest
+
+from services.prompt_variants import PromptExperiment, parse_weights
+
+def test_parse_weights():
+    assert dict(parse_weights('v1:90, v2-compact:10')) == {'v1': 90, 'v2-compact': 10}
+    assert dict(parse_weights('v1')) == {'v1': 1}
+    with pytest.raises(ValueError):
+        parse_weights('v1:0')
+
+def test_assignment_is_sticky_and_follows_weights():
+    experiment = PromptExperiment('v1:3,v2-compact:1', salt='test')
+    assert experiment.active
+    assignments = [experiment.assign(user_id) for user_id in range(4000)]
+    assert assignments == [experiment.assign(user_id) for user_id in range(4000)]
+    share = assignments.count('v2-compact') / len(assignments)
+    assert 0.2 < share < 0.3
+
+def test_zero_weight_variant_is_loaded_but_never_assigned():
+    experiment = PromptExperiment('v1:1,v2-compact:0', salt='test')
+    assert not experiment.active
+    assert {experiment.assign(user_id) for user_id in range(500)} == {'v1'}
+    assert experiment.get('v2-compact').variant_id == 'v2-compact'
+
+def test_unknown_or_missing_ids_use_default():
+    experiment = PromptExperiment('v1:1,v2-compact:1', salt='test')
+    assert experiment.assign(None) == 'v1'
+    assert experiment.get('nope').variant_id == 'v1'
+
+def test_salt_reshuffles_users():
+    first = PromptExperiment('v1:1,v2-compact:1', salt='a')
+    second = PromptExperiment('v1:1,v2-compact:1', salt='b')
+    assert any(first.assign(user_id) != second.assign(user_id) for user_id in range(100))
@@ -0,0 +1,92 @@
+"""요청 병합 테스트"""
+
+import asyncio
+
+import pytest
+
+import database
+from services import request_coalescer as coalescer_module
+from services.request_coalescer import RequestCoalescer, make_request_key
+
+def test_request_key_ignores_whitespace_and_case():
+    base = {'content_category': '음식/요리', 'content_topic': 'Vegan  Recipes', 'platform': '틱톡'}
+    same = {'content_category': '음식/요리', 'content_topic': ' vegan recipes ', 'platform': '틱톡', 'extra': 'x'}
+    assert make_request_key(base) == make_request_key(same)
+    assert make_request_key(base) != make_request_key({**base, 'platform': '유튜브'})
+
+def test_concurrent_requests_share_one_call():
+    calls = 0
+
+    async def factory():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {'ideas': 'shared'}
+
+    async def scenario():
+        coalescer = RequestCoalescer(across_replicas=False)
+        results = await asyncio.gather(*(coalescer.run('key', factory) for _ in range(5)))
+        # 완료된 뒤에는 다시 실행 (결과를 캐시하지 않음)
+        again = await coalescer.run('key', factory)
+        return coalescer, results, again
+
+    coalescer, results, again = asyncio.run(scenario())
+    assert results == [{'ideas': 'shared'}] * 5
+    assert again == {'ideas': 'shared'}
+    assert calls == 2
+    assert coalescer.stats['leaders'] == 2
+    assert coalescer.stats['followers'] == 4
+
+class FakeLocks:
+    """advisory lock 흉내 (획득 결과를 차례로 반환)"""
+    def __init__(self, monkeypatch, outcomes, shared=None):
+        self.outcomes = list(outcomes)
+        self.shared = shared
+        self.saved = []
+        self.lookups = []
+        self.released = []
+        monkeypatch.setattr(coalescer_module, 'COALESCE_POLL_INTERVAL', 0.001)
+        monkeypatch.setattr(database, 'open_lock_connection', lambda: object())
+        monkeypatch.setattr(database, 'try_advisory_lock', lambda conn, key: self.outcomes.pop(0))
+        monkeypatch.setattr(database, 'find_shared_result', self.find)
+        monkeypatch.setattr(database, 'save_shared_result', lambda key, result, max_age: self.saved.append(key))
+        monkeypatch.setattr(database, 'close_lock_connection', lambda conn, key=None: self.released.append(key))
+
+    def find(self, key, max_age_seconds):
+        self.lookups.append(max_age_seconds)
+        return dict(self.shared) if self.shared else None
+
+def test_lock_holder_runs_without_reading_shared_results(monkeypatch):
+    locks = FakeLocks(monkeypatch, [True], shared={'ideas': 'stale'})
+
+    async def factory():
+        return {'ideas': 'fresh'}
+
+    result = asyncio.run(RequestCoalescer(across_replicas=True).run('key', factory))
+    assert result == {'ideas': 'fresh'}
+    assert locks.lookups == []
+    assert locks.saved == ['key']
+    assert locks.released == ['key']
+
+def test_waiter_uses_result_saved_while_waiting(monkeypatch):
+    locks = FakeLocks(monkeypatch, [False, False, True], shared={'ideas': 'leader', 'llm_usage': {'input_tokens': 1}})
+
+    async def factory():
+        pytest.fail('기다린 요청은 LLM을 호출하지 않아야 함')
+
+    coalescer = RequestCoalescer(across_replicas=True)
+    result = asyncio.run(coalescer.run('key', factory))
+    assert result == {'ideas': 'leader'}
+    assert coalescer.stats['shared_hits'] == 1
+    # 기다린 시간보다 오래된 결과는 조회하지 않음
+    assert locks.lookups and all(age < 1 for age in locks.lookups)
+
+def test_waiter_runs_itself_when_no_result_was_shared(monkeypatch):
+    locks = FakeLocks(monkeypatch, [False, True])
+
+    async def factory():
+        return {'ideas': 'own'}
+
+    assert asyncio.run(RequestCoalescer(across_replicas=True).run('key', factory)) == {'ideas': 'own'}
+    assert locks.saved == ['key']
+    assert locks.released == ['key']
@@ -0,0 +1,61 @@
+"""분석 결과 파서 테스트 (benchmarks/corpus 응답 사용)"""
+
+import glob
+import json
+import os
+
+import pytest
+
+from services.result_parser import SECTION_MAPPING, parse_analysis, parse_section_content
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'corpus')
+
+def load_case(name: str) -> dict:
+    """코퍼스 응답 하나 로드"""
+    with open(os.path.join(CORPUS_DIR, f"{name}.json"), encoding='utf-8') as f:
+        return json.load(f)
+
+def corpus_files() -> list:
+    return sorted(glob.glob(os.path.join(CORPUS_DIR, '*.json')))
+
+@pytest.mark.parametrize('path', corpus_files(), ids=os.path.basename)
+def test_corpus_items_are_labels_or_bullets(path):
+    with open(path, encoding='utf-8') as f:
+        case = json.load(f)
+    sections = parse_analysis(case['analysis'])
+    assert set(sections) == set(SECTION_MAPPING.values())
+    for items in sections.values():
+        assert all(item.startswith(('# ', '- ')) for item in items)
+
+def test_well_formed_response():
+    sections = parse_analysis(load_case('01_well_formed')['analysis'])
+    assert sections['production_strategy'][:2] == ['# 촬영 팁', '- 세로 9:16 구도, 눈높이 앵글, 자연광 활용']
+    assert all(len(items) == 8 for items in sections.values())
+
+def test_blank_lines_do_not_change_result():
+    assert parse_analysis(load_case('02_extra_blank_lines')['analysis']) == parse_analysis(load_case('01_well_formed')['analysis'])
+
+def test_missing_section_is_empty():
+    sections = parse_analysis(load_case('03_missing_section')['analysis'])
+    assert sections['production_strategy']
+    assert sections['growth_strategy'] == []
+
+def test_unlabelled_items_are_kept_as_bullets():
+    sections = parse_analysis(load_case('04_no_colon_items')['analysis'])
+    assert sections['growth_strategy'][0] == '- 30일 챌린지로 연속 시청 유도'
+    assert not any(item.startswith('# ') for item in sections['growth_strategy'])
+
+def test_unknown_headers_are_ignored():
+    sections = parse_analysis(load_case('05_markdown_h2_headers')['analysis'])
+    assert all(items == [] for items in sections.values())
+
+def test_empty_response():
+    assert all(items == [] for items in parse_analysis(load_case('08_empty')['analysis']).values())
+    assert parse_section_content('') == []
+
+def test_colons_in_values_split_on_first_colon_only():
+    sections = parse_analysis(load_case('11_colons_in_values')['analysis'])
+    assert '- 세로 9:16 구도, 눈높이 앵글, 자연광 활용' in sections['production_strategy']
+
+def test_section_content_without_dash_prefix():
+    assert parse_section_content("첫 줄\n\n- 라벨: 값\n- 항목") == ['- 첫 줄', '# 라벨', '- 값', '- 항목']
@@ -0,0 +1,127 @@
+"""분석 요청 스케줄러 테스트"""
+
+import asyncio
+
+import pytest
+
+import database
+from services import scheduler as scheduler_module
+from services.scheduler import AdmissionRejected, FairScheduler
+from services.tracing import Tracer
+
+def test_round_robin_between_users():
+    async def scenario():
+        scheduler = FairScheduler(max_concurrency=1)
+        gate = asyncio.Event()
+        order = []
+
+        def job(name, wait=False):
+            async def run():
+                if wait:
+                    await gate.wait()
+                order.append(name)
+                return name
+            return run
+
+        first = asyncio.ensure_future(scheduler.run('a', job('a1', wait=True)))
+        await asyncio.sleep(0)
+        rest = [
+            asyncio.ensure_future(scheduler.run('a', job('a2'))),
+            asyncio.ensure_future(scheduler.run('a', job('a3'))),
+            asyncio.ensure_future(scheduler.run('b', job('b1')))
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.snapshot()['queued'] == 3
+        gate.set()
+        results = await asyncio.gather(first, *rest)
+        return scheduler, order, results
+
+    scheduler, order, results = asyncio.run(scenario())
+    assert results == ['a1', 'a2', 'a3', 'b1']
+    # 사용자 a의 요청이 먼저 쌓여 있어도 b가 a의 마지막 요청보다 먼저 실행
+    assert order.index('b1') < order.index('a3')
+    assert scheduler.snapshot()['running'] == 0
+
+def test_concurrency_limit():
+    async def scenario():
+        scheduler = FairScheduler(max_concurrency=2)
+        running = peak = 0
+
+        async def work():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        await asyncio.gather(*(scheduler.run(f"user{i % 3}", work) for i in range(9)))
+        return peak
+
+    assert asyncio.run(scenario()) == 2
+
+def test_job_exception_is_propagated():
+    async def fail():
+        raise ValueError('boom')
+
+    async def scenario():
+        scheduler = FairScheduler(max_concurrency=1)
+        with pytest.raises(ValueError):
+            await scheduler.run('a', fail)
+        # 실패한 뒤에도 다음 작업은 실행
+        return await scheduler.run('a', lambda: asyncio.sleep(0, result='ok'))
+
+    assert asyncio.run(scenario()) == 'ok'
+
+def test_admit_rejects_when_quota_exhausted(monkeypatch):
+    monkeypatch.setattr(database, 'consume_quota', lambda *args: (False, 'daily_quota'))
+    scheduler = FairScheduler()
+    with pytest.raises(AdmissionRejected) as rejected:
+        asyncio.run(scheduler.admit(1))
+    assert rejected.value.reason == 'daily_quota'
+    assert scheduler.stats['daily_quota'] == 1
+
+def test_admit_sheds_load_before_checking_quota(monkeypatch):
+    monkeypatch.setattr(database, 'consume_quota', lambda *args: pytest.fail('한도 확인 전에 거절되어야 함'))
+    monkeypatch.setattr(scheduler_module, 'SHED_WAIT_SECONDS', 10)
+    scheduler = FairScheduler(max_concurrency=1)
+    scheduler._running = 1
+    scheduler._avg_service_time = 60.0
+    with pytest.raises(AdmissionRejected) as rejected:
+        asyncio.run(scheduler.admit('a'))
+    assert rejected.value.reason == 'overloaded'
+    assert rejected.value.estimated_wait > 10
+
+def test_queue_wait_is_recorded_on_each_jobs_own_span(monkeypatch):
+    tracer = Tracer(enabled=True, sample_rate=0.0, slow_ms=float('inf'))
+    monkeypatch.setattr(scheduler_module, 'tracer', tracer)
+
+    async def scenario():
+        scheduler = FairScheduler(max_concurrency=1)
+        gate = asyncio.Event()
+        spans = {}
+
+        async def request(user_id, wait):
+            with tracer.start_trace(f"request.{user_id}") as span:
+                spans[user_id] = span
+
+                async def work():
+                    if wait:
+                        await gate.wait()
+                    await asyncio.sleep(0.01)
+
+                await scheduler.run(user_id, work)
+
+        first = asyncio.ensure_future(request('a', True))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(request('b', False))
+        await asyncio.sleep(0.02)
+        gate.set()
+        await asyncio.gather(first, second)
+        return spans
+
+    spans = asyncio.run(scenario())
+    wait_a = spans['a'].attributes['scheduler.queue_wait_ms']
+    wait_b = spans['b'].attributes['scheduler.queue_wait_ms']
+    # b는 a가 끝날 때까지 대기열에 있었으므로 더 오래 기다림
+    assert wait_a < 5
+    assert wait_b >= 20